@@ -0,0 +1,36 @@
+"""
+Compares scoring the drawings of several people one by one with scoring them all at
+once with a `DrawnModelEnsemble`.
+
+    python benchmarks/bench_ensemble.py
+"""
+
+import time
+
+import numpy as np
+
+from hulearn.classification import DrawnModelEnsemble, InteractiveClassifier
+
+from polygons import random_drawing, random_points
+
+
+def timed(func, repeats=3):
+    func()  # builds the index, the grid or the partition once
+    tic = time.perf_counter()
+    for _ in range(repeats):
+        out = func()
+    return (time.perf_counter() - tic) / repeats, out
+
+
+if __name__ == "__main__":
+    X = random_points(200_000)
+    print(f"{'models':>6} {'mode':>9} {'separate':>9} {'ensemble':>9}")
+    for n_models in [2, 5, 10]:
+        drawings = [random_drawing(100, seed=seed) for seed in range(n_models)]
+        for mode in ["direct", "grid"]:
+            clfs = [InteractiveClassifier(d, mode=mode).fit(X, None) for d in drawings]
+            ens = DrawnModelEnsemble(drawings, mode=mode).fit(X, None)
+            separate, probas = timed(lambda: [c.predict_proba(X) for c in clfs])
+            together, proba = timed(lambda: ens.model_proba(X))
+            assert np.allclose(proba, np.stack(probas))
+            print(f"{n_models:>6} {mode:>9} {separate:>8.3f}s {together:>8.3f}s")
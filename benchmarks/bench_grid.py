@@ -0,0 +1,37 @@
+"""
+Compares the direct scoring mode with the lookup grid for drawings with many vertices.
+
+    python benchmarks/bench_grid.py
+"""
+
+import time
+
+from hulearn.engine import PolygonScorer, compile_drawing
+
+from polygons import random_drawing, random_points
+
+
+def timed(scorer, X, repeats=5):
+    scorer.hits(X.head(10))  # builds the grid once
+    tic = time.perf_counter()
+    for _ in range(repeats):
+        hits = scorer.hits(X)
+    return (time.perf_counter() - tic) / repeats, hits
+
+
+if __name__ == "__main__":
+    X = random_points(100_000)
+    print(
+        f"{'polygons':>8} {'vertices':>8} {'direct':>9} {'grid-64':>9} {'grid-256':>9}"
+    )
+    for n_polygons, n_vertices in [(10, 12), (10, 200), (100, 200), (1_000, 50)]:
+        compiled = compile_drawing(random_drawing(n_polygons, n_vertices=n_vertices))
+        direct, expected = timed(PolygonScorer(compiled, backend="numpy"), X)
+        timings = []
+        for grid_size in [64, 256]:
+            scorer = PolygonScorer(compiled, mode="grid", grid_size=grid_size)
+            seconds, hits = timed(scorer, X)
+            assert (hits == expected).all()
+            timings.append(seconds)
+        grids = " ".join(f"{t:>8.4f}s" for t in timings)
+        print(f"{n_polygons:>8} {n_vertices:>8} {direct:>8.4f}s {grids}")
@@ -0,0 +1,43 @@
+"""
+Compares `GridSearchCV` with `HumanGridSearchCV` for a `FunctionClassifier` whose rule
+is expensive to evaluate.
+
+    python benchmarks/bench_grid_search.py
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import GridSearchCV
+
+from hulearn.classification import FunctionClassifier
+from hulearn.model_selection import HumanGridSearchCV
+
+
+def rolling_rule(dataf, window=5, limit=0.0):
+    """A row-wise rule that does a fair amount of work per row."""
+    smooth = dataf[[f"x{i}" for i in range(window)]].mean(axis=1)
+    return (np.tanh(smooth) + np.sin(dataf["x0"]) ** 2 > limit).astype(int).values
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(42)
+    X = pd.DataFrame(
+        rng.normal(size=(500_000, 10)), columns=[f"x{i}" for i in range(10)]
+    )
+    y = (X["x0"] + X["x1"] > 0).astype(int)
+    params = {"window": [2, 5, 10], "limit": [0.0, 0.5, 1.0]}
+    print(f"{'folds':>5} {'sklearn':>9} {'human':>9}")
+    for cv in [3, 5]:
+        mod = FunctionClassifier(rolling_rule)
+        tic = time.perf_counter()
+        theirs = GridSearchCV(mod, params, cv=cv).fit(X, y)
+        slow = time.perf_counter() - tic
+        tic = time.perf_counter()
+        ours = HumanGridSearchCV(mod, params, cv=cv).fit(X, y)
+        fast = time.perf_counter() - tic
+        assert np.allclose(
+            theirs.cv_results_["mean_test_score"], ours.cv_results_["mean_test_score"]
+        )
+        print(f"{cv:>5} {slow:>8.3f}s {fast:>8.3f}s")
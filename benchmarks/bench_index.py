@@ -0,0 +1,36 @@
+"""
+Compares scoring with and without the spatial index for a growing number of polygons.
+
+    python benchmarks/bench_index.py
+"""
+
+import time
+
+from hulearn.engine import PolygonScorer, compile_drawing
+from hulearn.engine.backends import NumpyBackend, ShapelyBackend
+
+from polygons import random_drawing, random_points
+
+
+def timed(scorer, X):
+    tic = time.perf_counter()
+    hits = scorer.hits(X)
+    return time.perf_counter() - tic, hits
+
+
+if __name__ == "__main__":
+    X = random_points(100_000)
+    print(f"{'polygons':>8} {'backend':>8} {'linear':>9} {'indexed':>9}")
+    for n_polygons in [10, 100, 1_000, 10_000]:
+        compiled = compile_drawing(random_drawing(n_polygons))
+        for backend_cls in [NumpyBackend, ShapelyBackend]:
+            linear, expected = timed(
+                PolygonScorer(compiled, backend_cls(index=False)), X
+            )
+            scorer = PolygonScorer(compiled, backend_cls(index=True))
+            scorer.hits(X.head(10))  # builds the index once
+            indexed, hits = timed(scorer, X)
+            assert (hits == expected).all()
+            print(
+                f"{n_polygons:>8} {backend_cls.name:>8} {linear:>8.3f}s {indexed:>8.3f}s"
+            )
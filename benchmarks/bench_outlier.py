@@ -0,0 +1,56 @@
+"""
+Compares counting every polygon with `hits` against stopping at the threshold with
+`reaches`, the path of `InteractiveOutlierDetector.predict`. Outlier drawings tend to
+be a few large, overlapping polygons that contain most rows.
+
+    python benchmarks/bench_outlier.py
+"""
+
+import time
+
+import numpy as np
+
+from hulearn.engine import PolygonScorer, compile_drawing
+
+from polygons import random_points
+
+
+def outlier_drawing(n_polygons, n_vertices, seed=42):
+    """Large, overlapping blobs around the center of the `[0, 100]` square."""
+    rng = np.random.default_rng(seed)
+    polygons = {"inlier": {"x": [], "y": []}}
+    for _ in range(n_polygons):
+        cx, cy = rng.uniform(40, 60, 2)
+        angles = np.sort(rng.uniform(0, 2 * np.pi, n_vertices))
+        radius = rng.uniform(30, 50) * rng.uniform(0.8, 1.0, n_vertices)
+        polygons["inlier"]["x"].append(list(cx + radius * np.cos(angles)))
+        polygons["inlier"]["y"].append(list(cy + radius * np.sin(angles)))
+    return [{"chart_id": "bench", "x": "x", "y": "y", "polygons": polygons}]
+
+
+def timed(func, repeats=5):
+    func()
+    tic = time.perf_counter()
+    for _ in range(repeats):
+        out = func()
+    return (time.perf_counter() - tic) / repeats, out
+
+
+if __name__ == "__main__":
+    X = random_points(200_000)
+    print(
+        f"{'polygons':>8} {'vertices':>8} {'backend':>8} {'threshold':>9} "
+        f"{'hits':>8} {'reaches':>8}"
+    )
+    for n_polygons, n_vertices in [(4, 50), (8, 200)]:
+        compiled = compile_drawing(outlier_drawing(n_polygons, n_vertices))
+        for backend in ["numpy", "shapely"]:
+            scorer = PolygonScorer(compiled, backend=backend)
+            for threshold in [1, 2]:
+                full, expected = timed(lambda: scorer.hits(X).sum(axis=1) >= threshold)
+                short, reached = timed(lambda: scorer.reaches(X, threshold))
+                assert np.array_equal(reached, expected)
+                print(
+                    f"{n_polygons:>8} {n_vertices:>8} {backend:>8} {threshold:>9} "
+                    f"{full:>7.3f}s {short:>7.3f}s"
+                )
@@ -0,0 +1,44 @@
+"""
+Compares scoring one event at a time with `predict_proba_one` against the old way of
+wrapping every event in a one-row dataframe and calling `predict_proba`.
+
+    python benchmarks/bench_record.py
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from hulearn.classification import InteractiveClassifier
+
+from polygons import random_drawing, random_points
+
+
+def per_call(func, records):
+    tic = time.perf_counter()
+    for record in records:
+        func(record)
+    return (time.perf_counter() - tic) / len(records) * 1e6
+
+
+if __name__ == "__main__":
+    records = random_points(2_000).to_dict(orient="records")
+    print(
+        f"{'polygons':>8} {'vertices':>8} {'backend':>8} {'dataframe':>11} {'record':>11}"
+    )
+    for n_polygons, n_vertices in [(3, 12), (10, 50), (100, 50), (1_000, 50)]:
+        drawing = random_drawing(n_polygons, n_vertices=n_vertices)
+        for backend in ["numpy", "shapely"]:
+            clf = InteractiveClassifier(drawing, backend=backend).fit(None, None)
+            for record in records[:100]:
+                expected = clf.predict_proba(pd.DataFrame([record]))[0]
+                assert np.array_equal(clf.predict_proba_one(record), expected)
+            frame = per_call(
+                lambda r: clf.predict_proba(pd.DataFrame([r])), records[:200]
+            )
+            record = per_call(clf.predict_proba_one, records)
+            print(
+                f"{n_polygons:>8} {n_vertices:>8} {backend:>8} "
+                f"{frame:>9.1f}us {record:>9.1f}us"
+            )
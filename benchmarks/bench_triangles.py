@@ -0,0 +1,42 @@
+"""
+Compares the direct Shapely path with the triangulated drawing on concave polygons
+with many vertices, the kind of shapes that are drawn by hand.
+
+    python benchmarks/bench_triangles.py
+"""
+
+import time
+
+from hulearn.engine import PolygonScorer, compile_drawing
+
+from polygons import random_drawing, random_points
+
+
+def timed(scorer, X, repeats=5):
+    tic = time.perf_counter()
+    scorer.hits(X.head(10))  # builds the index or the triangles once
+    build = time.perf_counter() - tic
+    tic = time.perf_counter()
+    for _ in range(repeats):
+        hits = scorer.hits(X)
+    return build, (time.perf_counter() - tic) / repeats, hits
+
+
+if __name__ == "__main__":
+    X = random_points(100_000)
+    print(
+        f"{'polygons':>8} {'vertices':>8} {'shapely':>9} {'numpy':>9} "
+        f"{'triangles':>9} {'build':>9}"
+    )
+    for n_polygons, n_vertices in [(10, 50), (10, 500), (100, 200), (1_000, 50)]:
+        compiled = compile_drawing(random_drawing(n_polygons, n_vertices=n_vertices))
+        _, shapely, expected = timed(PolygonScorer(compiled, backend="shapely"), X)
+        _, numpy, hits = timed(PolygonScorer(compiled, backend="numpy"), X)
+        assert (hits == expected).all()
+        scorer = PolygonScorer(compiled, backend="shapely", mode="triangles")
+        build, triangles, hits = timed(scorer, X)
+        assert (hits == expected).all()
+        print(
+            f"{n_polygons:>8} {n_vertices:>8} {shapely:>8.4f}s {numpy:>8.4f}s "
+            f"{triangles:>8.4f}s {build:>8.4f}s"
+        )
@@ -0,0 +1,32 @@
+"""
+Helpers that generate synthetic drawings for the benchmarks in this folder.
+"""
+
+import numpy as np
+
+
+def random_drawing(n_polygons, n_vertices=12, labels=("a", "b", "c"), seed=42):
+    """
+    Generates a drawing with `n_polygons` small, concave, star-shaped polygons that
+    are scattered over the `[0, 100] x [0, 100]` square of columns `x` and `y`.
+    """
+    rng = np.random.default_rng(seed)
+    polygons = {lab: {"x": [], "y": []} for lab in labels}
+    for i in range(n_polygons):
+        cx, cy = rng.uniform(0, 100, 2)
+        angles = np.sort(rng.uniform(0, 2 * np.pi, n_vertices))
+        radius = rng.uniform(0.5, 3.0) * rng.uniform(0.5, 1.0, n_vertices)
+        lab = labels[i % len(labels)]
+        polygons[lab]["x"].append(list(cx + radius * np.cos(angles)))
+        polygons[lab]["y"].append(list(cy + radius * np.sin(angles)))
+    return [{"chart_id": "bench", "x": "x", "y": "y", "polygons": polygons}]
+
+
+def random_points(n_rows, seed=0):
+    """Generates a dataframe with `n_rows` uniform points in the drawing's square."""
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {"x": rng.uniform(0, 100, n_rows), "y": rng.uniform(0, 100, n_rows)}
+    )
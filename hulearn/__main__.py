@@ -0,0 +1,71 @@
+import argparse
+import sys
+
+from hulearn.engine.parallel import PREFER
+
+
+def main(argv=None):
+    """The `python -m hulearn` command line, with a `score` and a `serve` command."""
+    parser = argparse.ArgumentParser(
+        prog="python -m hulearn",
+        description="Score files with, or serve, drawn and function models.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    score = commands.add_parser(
+        "score", help="stream a file through a model and write the predictions"
+    )
+    score.add_argument("model", help="drawn model (json or binary) or a pickled model")
+    score.add_argument("input", help="csv or parquet file with the rows to score")
+    score.add_argument("output", help="csv or parquet file to write the output to")
+    score.add_argument(
+        "--proba", action="store_true", help="write probabilities instead of labels"
+    )
+    score.add_argument("--batch-size", type=int, default=100_000)
+    score.add_argument("--n-jobs", type=int, default=None)
+    score.add_argument("--prefer", choices=PREFER, default="threads")
+    score.add_argument(
+        "--progress",
+        action="store_true",
+        help="report the throughput while scoring, not only at the end",
+    )
+
+    serve = commands.add_parser(
+        "serve", help="serve a model over HTTP, with micro-batching"
+    )
+    serve.add_argument("model", help="drawn model (json or binary) or a pickled model")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8000)
+    serve.add_argument("--max-batch-size", type=int, default=256)
+    serve.add_argument("--max-wait-ms", type=float, default=2.0)
+
+    args = parser.parse_args(argv)
+    if args.command == "score":
+        from hulearn.scoring import score_file
+
+        score_file(
+            args.model,
+            args.input,
+            args.output,
+            proba=args.proba,
+            batch_size=args.batch_size,
+            n_jobs=args.n_jobs,
+            prefer=args.prefer,
+            progress=sys.stderr,
+            interval=5.0 if args.progress else float("inf"),
+        )
+    else:
+        from hulearn.serving import serve
+
+        serve(
+            args.model,
+            host=args.host,
+            port=args.port,
+            max_batch_size=args.max_batch_size,
+            max_wait_ms=args.max_wait_ms,
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,5 @@
 from .functionclassifier import FunctionClassifier
 from .interactiveclassifier import InteractiveClassifier
+from .drawnensemble import DrawnModelEnsemble
 
-__all__ = ["FunctionClassifier", "InteractiveClassifier"]
+__all__ = ["FunctionClassifier", "InteractiveClassifier", "DrawnModelEnsemble"]
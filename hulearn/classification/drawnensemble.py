@@ -0,0 +1,161 @@
+import numpy as np
+
+from sklearn.base import BaseEstimator, ClassifierMixin
+from sklearn.utils.validation import check_is_fitted
+
+from hulearn.engine import compile_drawing, stack_drawings, PolygonScorer
+
+VOTING = ("soft", "hard")
+
+
+class DrawnModelEnsemble(BaseEstimator, ClassifierMixin):
+    """
+    This tool allows you to combine the drawn models of several people into a single
+    classifier.
+
+    Instead of scoring every drawing separately, the drawings are stacked into one
+    compiled drawing. Every column is read from `X` once and every `(x, y)` column pair
+    is scored once, against the polygons of all drawings at the same time, after which
+    the counts are split per drawing again. The `hits(X)` method returns them as an
+    array of shape `(n_models, n_rows, n_labels)`.
+
+    Arguments:
+        json_descs: a list of drawings, each as chart data in dictionary form or as a `CompiledDrawing`
+        smoothing: smoothing to apply to the poly-counts of every drawing
+        voting: `"soft"` averages the probabilities of the drawings, `"hard"` lets every drawing vote for its most likely class
+        weights: the weight of every drawing when averaging, `None` weighs them equally
+        refit: if `True`, you no longer need to call `.fit(X, y)` in order to `.predict(X)`
+        backend: the point-in-polygon backend to score with, `"auto"`, `"numpy"`, `"shapely"` or `"numba"`
+        mode: the scoring strategy, `"direct"` tests each polygon, `"grid"` uses a lookup grid, `"partition"` overlays them, `"triangles"` triangulates them
+        grid_size: the number of cells along each axis of the lookup grid when `mode="grid"`
+        batch_size: score `X` in chunks of this many rows to bound the memory usage, `None` scores all rows at once
+        n_jobs: the number of workers that score chunks of rows in parallel, `-1` uses all cores
+        prefer: score on `"threads"` (Shapely and NumPy release the GIL) or on `"processes"`
+        cache: a `HitCache`, such that repeated calls on the same data only score it once
+
+    Usage:
+
+    ```python
+    from hulearn.classification import DrawnModelEnsemble
+
+    # Assuming the variables `alice`, `bob` and `carol` that contain drawn polygons.
+    ens = DrawnModelEnsemble([alice, bob, carol], voting="soft").fit(X, y)
+
+    # The polygon counts of every drawing, of shape (3, n_rows, n_labels).
+    ens.hits(X)
+
+    # The averaged probabilities and the resulting predictions.
+    ens.predict_proba(X)
+    ens.predict(X)
+    ```
+    """
+
+    def __init__(
+        self,
+        json_descs,
+        smoothing=0.001,
+        voting="soft",
+        weights=None,
+        refit=True,
+        backend="auto",
+        mode="direct",
+        grid_size=256,
+        batch_size=None,
+        n_jobs=None,
+        prefer="threads",
+        cache=None,
+    ):
+        self.json_descs = json_descs
+        self.smoothing = smoothing
+        self.voting = voting
+        self.weights = weights
+        self.refit = refit
+        self.backend = backend
+        self.mode = mode
+        self.grid_size = grid_size
+        self.batch_size = batch_size
+        self.n_jobs = n_jobs
+        self.prefer = prefer
+        self.cache = cache
+
+    def fit(self, X, y):
+        """
+        Fit the ensemble. Bit of a formality, it only compiles and stacks the drawn
+        polygons such that they can be reused by every call to `.predict(X)`.
+        """
+        if self.voting not in VOTING:
+            raise ValueError(
+                f"Unknown voting '{self.voting}', choose from {list(VOTING)}."
+            )
+        drawings = [compile_drawing(d) for d in self.json_descs]
+        if self.weights is not None and len(self.weights) != len(drawings):
+            raise ValueError(
+                f"Got {len(self.weights)} weights for {len(drawings)} drawings."
+            )
+        self.compiled_ = stack_drawings(drawings)
+        self.n_models_ = len(drawings)
+        self.classes_ = [c for m, c in self.compiled_.classes if m == 0]
+        # Every drawing only smooths the labels that it was drawn with.
+        self.label_mask_ = np.array(
+            [[c in d.classes for c in self.classes_] for d in drawings]
+        )
+        return self
+
+    def set_params(self, **params):
+        """
+        Set the parameters of this estimator. Changing `json_descs` invalidates the
+        compiled drawing.
+        """
+        if "json_descs" in params and hasattr(self, "compiled_"):
+            del self.compiled_
+        return super().set_params(**params)
+
+    def hits(self, X):
+        """
+        Counts, for every drawing and every label, how many polygons contain each item
+        in `X`. The result has shape `(n_models, n_rows, n_labels)`.
+        """
+        if self.refit and not hasattr(self, "compiled_"):
+            self.fit(X, None)
+        check_is_fitted(self, ["classes_", "compiled_"])
+        count_arr = PolygonScorer.from_estimator(self).hits(X)
+        count_arr = count_arr.reshape(
+            len(count_arr), self.n_models_, len(self.classes_)
+        )
+        return count_arr.transpose(1, 0, 2)
+
+    def model_proba(self, X):
+        """
+        Predicts the probabilities of every drawing separately, an array of shape
+        `(n_models, n_rows, n_labels)`. A drawing assigns no probability to the labels
+        that it was not drawn with, otherwise it matches an `InteractiveClassifier`.
+        """
+        return self._normalize(self.hits(X))
+
+    def _normalize(self, count_arr):
+        count_arr = count_arr + self.smoothing * self.label_mask_[:, None, :]
+        return count_arr / count_arr.sum(axis=2, keepdims=True)
+
+    def _aggregate(self, proba):
+        if self.voting == "hard":
+            votes = proba.argmax(axis=2)
+            proba = (votes[..., None] == np.arange(proba.shape[2])).astype(float)
+        weights = np.ones(len(proba)) if self.weights is None else self.weights
+        weights = np.asarray(weights, dtype=float)
+        # Unlike `np.average` this also works when there are no rows.
+        return np.tensordot(weights / weights.sum(), proba, axes=1)
+
+    def predict_proba(self, X):
+        """
+        Predicts the associated probabilities for each class. With `voting="soft"` these
+        are the (weighted) average of the probabilities of the drawings, with
+        `voting="hard"` they are the (weighted) share of the drawings that vote for it.
+        """
+        return self._aggregate(self.model_proba(X))
+
+    def predict(self, X):
+        """
+        Predicts the class for each item in `X`.
+        """
+        proba = self.predict_proba(X)
+        return np.array(self.classes_)[proba.argmax(axis=1)]
@@ -2,6 +2,8 @@ from sklearn.base import BaseEstimator, ClassifierMixin
 from sklearn.utils.validation import check_is_fitted
 from sklearn.utils.multiclass import unique_labels
 
+from hulearn.common import check_function
+
 
 class FunctionClassifier(BaseEstimator, ClassifierMixin):
     """
@@ -9,9 +11,12 @@ class FunctionClassifier(BaseEstimator, ClassifierMixin):
 
     Arguments:
         func: the function that can make predictions
+        fit_check: check `func` on `"full"` data, a `"sample"` or `"none"`, `None` is `"full"` in `fit` and `"sample"` in `partial_fit`, not passed to `func`
         kwargs: extra keyword arguments will be pass to the function, can be grid-search-able
 
     The functions that are passed need to be pickle-able. That means no lambda functions!
+    The data is passed to the function as-is, without converting e.g. a Polars dataframe
+    or a PyArrow table to pandas first.
 
     **Usage:**
 
@@ -37,8 +42,9 @@ class FunctionClassifier(BaseEstimator, ClassifierMixin):
     ```
     """
 
-    def __init__(self, func, **kwargs):
+    def __init__(self, func, fit_check=None, **kwargs):
         self.func = func
+        self.fit_check = fit_check
         self.kwargs = kwargs
 
     def fit(self, X, y):
@@ -46,7 +52,7 @@ class FunctionClassifier(BaseEstimator, ClassifierMixin):
         Fit the classifier. No-Op.
         """
         # Run it to confirm no error happened.
-        _ = self.func(X, **self.kwargs)
+        check_function(self.func, X, self.kwargs, self.fit_check or "full")
         self.classes_ = unique_labels(y)
         self.fitted_ = True
         return self
@@ -55,8 +61,8 @@ class FunctionClassifier(BaseEstimator, ClassifierMixin):
         """
         Fit the classifier partially. No-Op.
         """
-        # Run it to confirm no error happened.
-        _ = self.func(X, **self.kwargs)
+        # Streams arrive in many chunks, so by default only a sample of each is checked.
+        check_function(self.func, X, self.kwargs, self.fit_check or "sample")
         self.classes_ = classes
         self.fitted_ = True
         return self
@@ -70,13 +76,15 @@ class FunctionClassifier(BaseEstimator, ClassifierMixin):
 
     def get_params(self, deep=True):
         """ """
-        return {**self.kwargs, "func": self.func}
+        return {**self.kwargs, "func": self.func, "fit_check": self.fit_check}
 
     def set_params(self, **params):
         """ """
         for k, v in params.items():
             if k == "func":
                 self.func = v
+            elif k == "fit_check":
+                self.fit_check = v
             else:
                 self.kwargs[k] = v
         return self
@@ -2,22 +2,31 @@ import json
 import pathlib
 
 import numpy as np
-import pandas as pd
-from shapely.geometry import Point
-from shapely.geometry.polygon import Polygon
 
 from sklearn.base import BaseEstimator, ClassifierMixin
 from sklearn.utils.validation import check_is_fitted
 
+from hulearn.engine import PolygonScorer
+from hulearn.engine.estimator import DrawnEstimatorMixin
+from hulearn.engine.record import RecordScorer
 
-class InteractiveClassifier(BaseEstimator, ClassifierMixin):
+
+class InteractiveClassifier(DrawnEstimatorMixin, BaseEstimator, ClassifierMixin):
     """
     This tool allows you to take a drawn model and use it as a classifier.
 
     Arguments:
-        json_desc: chart data in dictionary form
+        json_desc: chart data in dictionary form, or a `CompiledDrawing`
         smoothing: smoothing to apply to poly-counts
         refit: if `True`, you no longer need to call `.fit(X, y)` in order to `.predict(X)`
+        backend: the point-in-polygon backend to score with, `"auto"`, `"numpy"`, `"shapely"` or `"numba"`
+        mode: the scoring strategy, `"direct"` tests each polygon, `"grid"` uses a lookup grid, `"partition"` overlays them, `"triangles"` triangulates them
+        grid_size: the number of cells along each axis of the lookup grid when `mode="grid"`
+        batch_size: score `X` in chunks of this many rows to bound the memory usage, `None` scores all rows at once
+        n_jobs: the number of workers that score chunks of rows in parallel, `-1` uses all cores
+        prefer: score on `"threads"` (Shapely and NumPy release the GIL) or on `"processes"`
+        cache: a `HitCache`, such that repeated calls on the same data only score it once
+        simplify_tolerance: if set, polygons are simplified with this tolerance when the model is fitted, see `simplify_report_`
 
     Usage:
 
@@ -50,13 +59,34 @@ class InteractiveClassifier(BaseEstimator, ClassifierMixin):
     ```
     """
 
-    def __init__(self, json_desc, smoothing=0.001, refit=True):
+    def __init__(
+        self,
+        json_desc,
+        smoothing=0.001,
+        refit=True,
+        backend="auto",
+        mode="direct",
+        grid_size=256,
+        batch_size=None,
+        n_jobs=None,
+        prefer="threads",
+        cache=None,
+        simplify_tolerance=None,
+    ):
         self.json_desc = json_desc
         self.smoothing = smoothing
         self.refit = refit
+        self.backend = backend
+        self.mode = mode
+        self.grid_size = grid_size
+        self.batch_size = batch_size
+        self.n_jobs = n_jobs
+        self.prefer = prefer
+        self.cache = cache
+        self.simplify_tolerance = simplify_tolerance
 
     @classmethod
-    def from_json(cls, path, smoothing=0.001, refit=True):
+    def from_json(cls, path, smoothing=0.001, refit=True, **kwargs):
         """
         Load the classifier from json stored on disk.
 
@@ -64,6 +94,7 @@ class InteractiveClassifier(BaseEstimator, ClassifierMixin):
             path: path of the json file
             smoothing: smoothing to apply to poly-counts
             refit: if `True`, you no longer need to call `.fit(X, y)` in order to `.predict(X)`
+            kwargs: other arguments, like `backend` or `mode`, are passed to the constructor
 
         Usage:
 
@@ -75,47 +106,19 @@ class InteractiveClassifier(BaseEstimator, ClassifierMixin):
         """
         json_desc = json.loads(pathlib.Path(path).read_text())
         return InteractiveClassifier(
-            json_desc=json_desc, smoothing=smoothing, refit=refit
+            json_desc=json_desc, smoothing=smoothing, refit=refit, **kwargs
         )
 
     def _clean_poly_data(self, json_desc):
         """TODO: we need to prevent poly data with only two datapoints"""
         return json_desc
 
-    @property
-    def poly_data(self):
-        for chart in self.json_desc:
-            chard_id = chart["chart_id"]
-            labels = chart["polygons"].keys()
-            coords = chart["polygons"].values()
-            for lab, p in zip(labels, coords):
-                x_lab, y_lab = p.keys()
-                x_coords, y_coords = list(p.values())
-                for i in range(len(x_coords)):
-                    poly_data = list(zip(x_coords[i], y_coords[i]))
-                    if len(poly_data) >= 3:
-                        poly = Polygon(poly_data)
-                        yield {
-                            "x_lab": x_lab,
-                            "y_lab": y_lab,
-                            "poly": poly,
-                            "label": lab,
-                            "chart_id": chard_id,
-                        }
-
-    def _count_hits(self, clf_data, data_in):
-        counts = {k: 0 for k in self.classes_}
-        for c in clf_data:
-            point = Point(data_in[c["x_lab"]], data_in[c["y_lab"]])
-            if c["poly"].contains(point):
-                counts[c["label"]] += 1
-        return counts
-
     def fit(self, X, y):
         """
-        Fit the classifier. Bit of a formality, it's not doing anything specifically.
+        Fit the classifier. It learns nothing from `X` and `y`, it only compiles the drawn
+        polygons such that every call to `.predict(X)` can reuse them.
         """
-        self.classes_ = list(self.json_desc[0]["polygons"].keys())
+        self._compile(X)
         self.fitted_ = True
         return self
 
@@ -140,24 +143,97 @@ class InteractiveClassifier(BaseEstimator, ClassifierMixin):
         # Because we're not doing anything during training, for convenience this
         # method can formally "fit" during the predict call. This is a scikit-learn
         # anti-pattern so we allow you to turn this off.
-        if self.refit:
-            if not self.fitted_:
-                self.fit(X)
-        check_is_fitted(self, ["classes_", "fitted_"])
-        if isinstance(X, pd.DataFrame):
-            hits = [
-                self._count_hits(self.poly_data, x[1].to_dict()) for x in X.iterrows()
-            ]
-        else:
-            hits = [
-                self._count_hits(self.poly_data, {k: v for k, v in enumerate(x)})
-                for x in X
-            ]
-        count_arr = (
-            np.array([[h[c] for c in self.classes_] for h in hits]) + self.smoothing
-        )
+        if self.refit and not hasattr(self, "compiled_"):
+            self.fit(X, None)
+        check_is_fitted(self, ["classes_", "compiled_"])
+        scorer = PolygonScorer.from_estimator(self)
+        if self.batch_size is None:
+            return self._normalize(scorer.hits(X))
+        proba = np.empty((len(X), len(self.classes_)))
+        for rows, count_arr in scorer.batches(X):
+            proba[rows] = self._normalize(count_arr)
+        return proba
+
+    def predict_proba_iter(self, X):
+        """
+        Same as `.predict_proba(X)`, but yields the probabilities in chunks of `batch_size`
+        rows such that the output of very large datasets never has to fit in memory at once.
+
+        Usage:
+
+        ```python
+        from hulearn.classification import InteractiveClassifier
+        clf = InteractiveClassifier(clf_data, batch_size=100_000).fit(X, y)
+
+        for chunk in clf.predict_proba_iter(X):
+            store(chunk)
+        ```
+        """
+        if self.refit and not hasattr(self, "compiled_"):
+            self.fit(X, None)
+        check_is_fitted(self, ["classes_", "compiled_"])
+        for _, count_arr in PolygonScorer.from_estimator(self).batches(X):
+            yield self._normalize(count_arr)
+
+    def predict_proba_one(self, record):
+        """
+        Predicts the probabilities for a single record, a dictionary that maps the column
+        names to their values. The record is scored against the compiled polygons without
+        building a dataframe, which makes it suited for scoring events one at a time. The
+        result equals the row that `.predict_proba(X)` returns for the same record.
+
+        Usage:
+
+        ```python
+        from hulearn.classification import InteractiveClassifier
+        clf = InteractiveClassifier(clf_data).fit(X, y)
+
+        clf.predict_proba_one({"bill_length_mm": 39.1, "bill_depth_mm": 18.7})
+        ```
+        """
+        return np.array(self._proba_one(record))
+
+    def predict_one(self, record):
+        """
+        Predicts the class of a single record, a dictionary that maps the column names to
+        their values. The result equals the prediction of `.predict(X)` for that record.
+
+        Usage:
+
+        ```python
+        from hulearn.classification import InteractiveClassifier
+        clf = InteractiveClassifier(clf_data).fit(X, y)
+
+        clf.predict_one({"bill_length_mm": 39.1, "bill_depth_mm": 18.7})
+        ```
+        """
+        proba = self._proba_one(record)
+        return self.classes_[proba.index(max(proba))]
+
+    def _proba_one(self, record):
+        # `check_is_fitted` costs more than scoring a record, so only call it when needed.
+        if not hasattr(self, "compiled_"):
+            if self.refit:
+                self.fit(None, None)
+            check_is_fitted(self, ["classes_", "compiled_"])
+        counts = RecordScorer.for_drawing(self.compiled_, self.backend).hits(record)
+        counts = [c + self.smoothing for c in counts]
+        # NumPy sums fewer than 8 numbers one by one, which plain `sum` mirrors exactly.
+        total = sum(counts) if len(counts) < 8 else np.sum(counts)
+        return [c / total for c in counts]
+
+    def _normalize(self, count_arr):
+        count_arr = count_arr + self.smoothing
         return count_arr / count_arr.sum(axis=1).reshape(-1, 1)
 
+    def _outputs_from_hits(self, count_arr):
+        """The outputs for a hit matrix, used to sweep `smoothing` without rescoring."""
+        proba = self._normalize(count_arr)
+        return {
+            "predict_proba": proba,
+            "predict": np.array(self.classes_)[proba.argmax(axis=1)],
+        }
+
     def predict(self, X):
         """
         Predicts the class for each item in `X`.
@@ -177,6 +253,4 @@ class InteractiveClassifier(BaseEstimator, ClassifierMixin):
         ```
         """
         check_is_fitted(self, ["classes_", "fitted_"])
-        return np.array(
-            [self.classes_[i] for i in self.predict_proba(X).argmax(axis=1)]
-        )
+        return np.array(self.classes_)[self.predict_proba(X).argmax(axis=1)]
@@ -45,3 +45,54 @@ def df_to_dictlist(dataf):
     """
     data = dataf.iterrows()
     return [dict(d) for i, d in data]
+
+
+FIT_CHECK = ("full", "sample", "none")
+
+# The number of rows that `fit_check="sample"` runs the function on.
+FIT_CHECK_SAMPLE_SIZE = 100
+
+
+def _head(X, n_rows):
+    if hasattr(X, "iloc"):
+        return X.iloc[:n_rows]
+    if hasattr(X, "num_rows") and hasattr(X, "slice"):
+        return X.slice(0, n_rows)
+    return X[:n_rows]
+
+
+def check_function(func, X, kwargs, fit_check="full"):
+    """
+    Helper function, runs the function of a function based estimator on the data that
+    it is fitted on, to confirm that no error happens. Since the output is discarded,
+    a sample of the rows is often enough to catch e.g. a misspelled column name.
+
+    Arguments:
+        func: the function of the estimator
+        X: the data that the estimator is fitted on
+        kwargs: the keyword arguments for the function
+        fit_check: `"full"` runs the function on all rows, `"sample"` only on the first
+          `FIT_CHECK_SAMPLE_SIZE` rows and `"none"` skips the check
+
+    Usage:
+
+    ```python
+    import pandas as pd
+    from hulearn.common import check_function
+
+    def fare_rule(dataf, limit=100):
+        return dataf['fare'] > limit
+
+    df = pd.DataFrame({"fare": [10.0, 200.0]})
+    check_function(fare_rule, df, {"limit": 50}, fit_check="sample")
+    ```
+    """
+    if fit_check not in FIT_CHECK:
+        raise ValueError(
+            f"Unknown fit_check '{fit_check}', choose from {list(FIT_CHECK)}."
+        )
+    if fit_check == "none":
+        return
+    if fit_check == "sample":
+        X = _head(X, FIT_CHECK_SAMPLE_SIZE)
+    func(X, **kwargs)
@@ -0,0 +1,18 @@
+from .compiled import CompiledDrawing, compile_drawing, stack_drawings
+from .backends import Backend, register_backend, get_backend
+from .scorer import PolygonScorer
+from .binary import save_drawing, load_drawing
+from .cache import HitCache
+
+__all__ = [
+    "CompiledDrawing",
+    "compile_drawing",
+    "stack_drawings",
+    "Backend",
+    "register_backend",
+    "get_backend",
+    "PolygonScorer",
+    "save_drawing",
+    "load_drawing",
+    "HitCache",
+]
@@ -0,0 +1,200 @@
+import warnings
+
+import numpy as np
+import shapely
+
+from hulearn.engine.index import BucketIndex
+from hulearn.engine.jit import HAS_NUMBA, jit_query
+from hulearn.engine.kernels import (
+    HAS_SHAPELY_VECTORIZED,
+    points_in_polygon,
+    points_in_polygons,
+    shapely_contains,
+)
+
+
+class Backend:
+    """
+    Base class for point-in-polygon backends used by `PolygonScorer`.
+
+    A backend only needs to implement `contains`. Backends that can do better than
+    testing one polygon at a time (e.g. by using a spatial index) can override `query`.
+
+    A backend that decides points with the even-odd ray casting of `hulearn.engine.kernels`
+    sets `ray_casting`, such that e.g. a `LookupGrid` can run that kernel itself on the
+    points near an edge and still agree with the backend.
+
+    Arguments:
+        index: use a spatial index when a column pair has at least `index_threshold` polygons
+    """
+
+    name = None
+    index_threshold = 16
+    ray_casting = False
+
+    def __init__(self, index=True):
+        self.index = index
+
+    def _use_index(self, poly_idx):
+        return self.index and len(poly_idx) >= self.index_threshold
+
+    def contains(self, compiled, i, xs, ys):
+        """
+        Returns the indices of the points that lie strictly inside polygon `i`.
+
+        Arguments:
+            compiled: a `CompiledDrawing`
+            i: the index of the polygon
+            xs: float array with the x-coordinates of the points
+            ys: float array with the y-coordinates of the points
+        """
+        raise NotImplementedError
+
+    def query(self, compiled, poly_idx, xs, ys):
+        """
+        Tests all points against the polygons in `poly_idx`, which all share the same
+        column pair. Returns a tuple `(rows, polys)` of equal length integer arrays with
+        one entry for every (row, polygon) combination that is a hit.
+        """
+        rows, polys = [], []
+        for i in poly_idx:
+            hit = self.contains(compiled, i, xs, ys)
+            rows.append(hit)
+            polys.append(np.full(hit.shape[0], i, dtype=np.int64))
+        if not rows:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        return np.concatenate(rows), np.concatenate(polys)
+
+    def __repr__(self):
+        return f"{type(self).__name__}(index={self.index})"
+
+
+class NumpyBackend(Backend):
+    """
+    Pure NumPy even-odd ray casting, after a bounding box prefilter.
+
+    The spatial index is a `BucketIndex`, a uniform grid over the polygons of a column
+    pair. It yields the (point, polygon) candidates for all points at once, which are
+    then tested in a single pairwise ray casting pass.
+    """
+
+    name = "numpy"
+    ray_casting = True
+
+    def contains(self, compiled, i, xs, ys):
+        xmin, ymin, xmax, ymax = compiled.bounds[i]
+        rows = np.flatnonzero((xs > xmin) & (xs < xmax) & (ys > ymin) & (ys < ymax))
+        return rows[points_in_polygon(compiled.polygon(i), xs[rows], ys[rows])]
+
+    def query(self, compiled, poly_idx, xs, ys):
+        if not self._use_index(poly_idx):
+            return super().query(compiled, poly_idx, xs, ys)
+        index = compiled.memoize(
+            ("buckets", poly_idx.tobytes()),
+            lambda: BucketIndex(compiled.bounds[poly_idx], poly_idx),
+        )
+        rows, polys = index.candidates(xs, ys)
+        inside = points_in_polygons(
+            compiled.vertices,
+            compiled.offsets,
+            polys,
+            xs[rows],
+            ys[rows],
+            edges=compiled.edges,
+        )
+        return rows[inside], polys[inside]
+
+
+class ShapelyBackend(Backend):
+    """
+    Uses the vectorized `shapely.contains_xy` on prepared geometries, requires Shapely 2.
+
+    The spatial index is a `shapely.STRtree` over the polygons of a column pair. It is
+    built once per compiled drawing and every point is only tested against the polygons
+    whose bounding box contains it.
+    """
+
+    name = "shapely"
+
+    def __init__(self, index=True):
+        if not HAS_SHAPELY_VECTORIZED:
+            raise ImportError("The 'shapely' backend requires shapely>=2.0.")
+        super().__init__(index=index)
+
+    def contains(self, compiled, i, xs, ys):
+        return np.flatnonzero(shapely_contains(compiled.geometries[i], xs, ys))
+
+    def query(self, compiled, poly_idx, xs, ys):
+        if not self._use_index(poly_idx):
+            return super().query(compiled, poly_idx, xs, ys)
+        tree = compiled.memoize(
+            ("strtree", poly_idx.tobytes()),
+            lambda: shapely.STRtree([compiled.geometries[i].context for i in poly_idx]),
+        )
+        rows, tree_idx = tree.query(shapely.points(xs, ys), predicate="within")
+        return rows.astype(np.int64), poly_idx[tree_idx]
+
+
+class NumbaBackend(Backend):
+    """
+    A parallel Numba kernel that runs the even-odd ray casting of the NumPy backend
+    over the flat vertex buffers, one point per thread. Every point only visits the
+    polygons in its cell of a `BucketIndex`. The compiled kernel is cached on disk, so
+    only the very first process pays for the JIT compilation.
+
+    When Numba is not installed this backend warns and falls back to `NumpyBackend`.
+    """
+
+    name = "numba"
+    ray_casting = True
+
+    def __new__(cls, index=True):
+        if not HAS_NUMBA:
+            warnings.warn(
+                "Numba is not installed, falling back to the 'numpy' backend.",
+                RuntimeWarning,
+            )
+            return NumpyBackend(index=index)
+        return super().__new__(cls)
+
+    def contains(self, compiled, i, xs, ys):
+        rows, _ = self.query(compiled, np.array([i]), xs, ys)
+        return rows
+
+    def query(self, compiled, poly_idx, xs, ys):
+        # Without an index all polygons share a single bucket.
+        n_cells = None if self._use_index(poly_idx) else 1
+        index = compiled.memoize(
+            ("buckets", poly_idx.tobytes(), n_cells),
+            lambda: BucketIndex(compiled.bounds[poly_idx], poly_idx, n_cells=n_cells),
+        )
+        return jit_query(compiled, index, xs, ys)
+
+
+BACKENDS = {"numpy": NumpyBackend, "shapely": ShapelyBackend, "numba": NumbaBackend}
+
+
+def register_backend(name, backend_cls):
+    """
+    Makes a `Backend` subclass available under `name`, such that it can be selected
+    via the `backend` argument of the interactive estimators.
+    """
+    BACKENDS[name] = backend_cls
+
+
+def get_backend(backend="auto"):
+    """
+    Resolves a backend name (or instance) into a `Backend` instance.
+
+    With `"auto"` the Shapely backend is used when Shapely 2 is installed, otherwise
+    the NumPy backend is used.
+    """
+    if isinstance(backend, Backend):
+        return backend
+    if backend == "auto":
+        backend = "shapely" if HAS_SHAPELY_VECTORIZED else "numpy"
+    if backend not in BACKENDS:
+        raise ValueError(
+            f"Unknown backend '{backend}', choose from {['auto'] + list(BACKENDS)}."
+        )
+    return BACKENDS[backend]()
@@ -0,0 +1,129 @@
+import json
+import pathlib
+import struct
+
+import numpy as np
+
+from hulearn.engine.compiled import CompiledDrawing
+
+MAGIC = b"HULEARN\x00"
+VERSION = 1
+ALIGN = 64
+ARRAYS = ("vertices", "offsets", "labels")
+
+
+def _aligned(n):
+    return -(-n // ALIGN) * ALIGN
+
+
+def save_drawing(compiled, path):
+    """
+    Writes a `CompiledDrawing` to disk in a compact binary format.
+
+    The file starts with a magic string and the length of a JSON header. The header
+    holds the classes, the column keys and the chart ids together with the dtype,
+    shape and position of the flat vertex, offset and label buffers. These buffers are
+    stored as raw little-endian bytes, each aligned to 64 bytes, such that
+    `load_drawing` can memory-map them without copying or parsing anything.
+
+    Arguments:
+        compiled: a `CompiledDrawing`
+        path: the file to write
+    """
+    arrays = {name: np.ascontiguousarray(getattr(compiled, name)) for name in ARRAYS}
+    arrays = {k: v.astype(v.dtype.newbyteorder("<")) for k, v in arrays.items()}
+    layout, position = {}, 0
+    for name, arr in arrays.items():
+        layout[name] = {
+            "dtype": arr.dtype.str,
+            "shape": list(arr.shape),
+            "offset": position,
+        }
+        position = _aligned(position + arr.nbytes)
+    header = json.dumps(
+        {
+            "version": VERSION,
+            "classes": list(compiled.classes),
+            "x_keys": list(compiled.x_keys),
+            "y_keys": list(compiled.y_keys),
+            "chart_ids": list(compiled.chart_ids),
+            "arrays": layout,
+        }
+    ).encode("utf-8")
+    start = _aligned(len(MAGIC) + 8 + len(header))
+    with open(path, "wb") as f:
+        f.write(MAGIC + struct.pack("<Q", len(header)) + header)
+        for name, arr in arrays.items():
+            f.seek(start + layout[name]["offset"])
+            f.write(arr.tobytes())
+        f.truncate(start + position)
+
+
+def load_drawing(path, mmap=True):
+    """
+    Reads a `CompiledDrawing` that was written by `save_drawing`.
+
+    With `mmap=True` the vertex, offset and label buffers are memory-mapped read-only.
+    Loading is then nearly instant regardless of the size of the model and processes
+    that load the same file share a single copy of it in the page cache.
+
+    Arguments:
+        path: the file to read
+        mmap: memory-map the buffers instead of reading them into memory
+
+    Usage:
+
+    ```python
+    import tempfile
+    from hulearn.engine import compile_drawing
+    from hulearn.engine.binary import save_drawing, load_drawing
+
+    json_desc = [{
+        "chart_id": "example",
+        "x": "a",
+        "y": "b",
+        "polygons": {
+            "pos": {"a": [[0.0, 1.0, 1.0]], "b": [[0.0, 0.0, 1.0]]},
+            "neg": {"a": [], "b": []},
+        },
+    }]
+    with tempfile.TemporaryDirectory() as folder:
+        save_drawing(compile_drawing(json_desc), f"{folder}/model.hul")
+        compiled = load_drawing(f"{folder}/model.hul")
+        assert compiled.classes == ("pos", "neg")
+    ```
+    """
+    path = pathlib.Path(path)
+    with open(path, "rb") as f:
+        magic = f.read(len(MAGIC))
+        if magic != MAGIC:
+            raise ValueError(f"The file {path} is not a compiled hulearn drawing.")
+        (size,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(size).decode("utf-8"))
+        if header["version"] > VERSION:
+            raise ValueError(
+                f"The file {path} has format version {header['version']}, this version of hulearn reads up to {VERSION}."
+            )
+        start = _aligned(len(MAGIC) + 8 + size)
+        arrays = {}
+        for name, spec in header["arrays"].items():
+            dtype, shape = np.dtype(spec["dtype"]), tuple(spec["shape"])
+            count = int(np.prod(shape))
+            if mmap and count > 0:
+                arrays[name] = np.memmap(
+                    path,
+                    dtype=dtype,
+                    mode="r",
+                    offset=start + spec["offset"],
+                    shape=shape,
+                )
+            else:
+                f.seek(start + spec["offset"])
+                arrays[name] = np.fromfile(f, dtype=dtype, count=count).reshape(shape)
+    return CompiledDrawing(
+        classes=header["classes"],
+        x_keys=header["x_keys"],
+        y_keys=header["y_keys"],
+        chart_ids=header["chart_ids"],
+        **arrays,
+    )
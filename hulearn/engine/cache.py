@@ -0,0 +1,112 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+class HitCache:
+    """
+    A bounded LRU cache of hit matrices, such that calling `predict_proba` and then
+    `predict` (or `score` and then `predict`) on the same data only scores it once.
+
+    An entry is keyed on the compiled drawing, the shape of `X` and a hash of the
+    contents of the columns that the drawing uses. Hashing the columns is much cheaper
+    than scoring them and it makes sure that a changed dataset is never served stale
+    results. When the cache holds more than `max_entries` matrices or `max_bytes` bytes,
+    the least recently used entries are evicted. Cached matrices are read-only.
+
+    The cache is shared, not copied, when an estimator is cloned, which means that
+    e.g. all candidates in a grid search can make use of it.
+
+    Arguments:
+        max_entries: the maximum number of hit matrices to keep
+        max_bytes: the maximum total size of the hit matrices to keep, `None` means no limit
+
+    Usage:
+
+    ```python
+    from hulearn.engine import HitCache
+    from hulearn.classification import InteractiveClassifier
+
+    cache = HitCache(max_entries=4)
+    clf = InteractiveClassifier(clf_data, cache=cache).fit(X, y)
+
+    # The second call re-uses the hits of the first one.
+    proba = clf.predict_proba(X)
+    preds = clf.predict(X)
+    ```
+    """
+
+    def __init__(self, max_entries=8, max_bytes=None):
+        if max_entries < 1:
+            raise ValueError(f"max_entries must be at least 1, got {max_entries}.")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __getstate__(self):
+        return {"max_entries": self.max_entries, "max_bytes": self.max_bytes}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return f"HitCache(max_entries={self.max_entries}, max_bytes={self.max_bytes})"
+
+    @property
+    def nbytes(self):
+        """The total size of all cached hit matrices."""
+        return sum(arr.nbytes for arr in self._entries.values())
+
+    def key(self, compiled, X, columns):
+        """
+        Returns the fingerprint of `X` for a compiled drawing.
+
+        Arguments:
+            compiled: a `CompiledDrawing`
+            X: the data that is scored
+            columns: the float arrays of the columns of `X` that the drawing uses
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        for col in columns:
+            digest.update(col.tobytes())
+        # A unique token per compiled drawing, ids can be reused after garbage collection.
+        token = compiled.memoize("cache_token", object)
+        return token, tuple(X.shape), digest.hexdigest()
+
+    def get(self, key):
+        """Returns the cached hit matrix for `key`, or `None`."""
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key, hits):
+        """Stores a hit matrix, evicting the least recently used ones when needed."""
+        hits.flags.writeable = False
+        if self.max_bytes is not None and hits.nbytes > self.max_bytes:
+            return hits
+        with self._lock:
+            self._entries[key] = hits
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self.nbytes > self.max_bytes
+            ):
+                self._entries.popitem(last=False)
+        return hits
+
+    def clear(self):
+        """Removes all entries."""
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,120 @@
+import numbers
+import sys
+
+import numpy as np
+import pandas as pd
+
+
+def is_polars_frame(X):
+    """Checks for a `polars.DataFrame`, without importing Polars when it is not in use."""
+    pl = sys.modules.get("polars")
+    return pl is not None and isinstance(X, pl.DataFrame)
+
+
+def is_arrow_table(X):
+    """Checks for a `pyarrow.Table` or `RecordBatch`, without importing PyArrow."""
+    pa = sys.modules.get("pyarrow")
+    return pa is not None and isinstance(X, (pa.Table, pa.RecordBatch))
+
+
+def column_position(X, key):
+    """
+    Resolves the key of a drawing into a column position of the array `X`.
+
+    Drawings made on an array use the positions as keys, which become strings when the
+    drawing is stored as json, so digit strings are accepted as well.
+    """
+    if isinstance(key, str) and key.isdigit():
+        key = int(key)
+    if not isinstance(key, numbers.Integral):
+        raise KeyError(
+            f"The drawing uses column '{key}', an array only has positional columns."
+        )
+    if not -X.shape[1] <= key < X.shape[1]:
+        raise KeyError(f"The drawing uses column {key}, X has {X.shape[1]} columns.")
+    return int(key)
+
+
+def read_column(X, key):
+    """
+    Reads a single column from `X` as a float array, without copying when possible.
+
+    For a `pd.DataFrame` the key is a column name and a float column is returned as-is.
+    Float columns of a `polars.DataFrame`, a `pyarrow.Table` or a `RecordBatch` without
+    missing values are read from their buffers without a copy, as read-only arrays. For an array the
+    key is a position and a float array yields a strided view. Other dtypes, like the
+    object arrays that `load_titanic` returns, are converted. Missing values become
+    `NaN`, which lies inside no polygon.
+    """
+    if isinstance(X, pd.DataFrame):
+        return X[key].to_numpy(dtype=np.float64, na_value=np.nan)
+    if is_polars_frame(X):
+        pl = sys.modules["polars"]
+        column = X.to_series(key) if isinstance(key, int) else X.get_column(key)
+        return column.cast(pl.Float64).to_numpy()
+    if is_arrow_table(X):
+        pa = sys.modules["pyarrow"]
+        column = X.column(key)
+        if column.type != pa.float64():
+            column = column.cast(pa.float64())
+        if isinstance(column, pa.Array) and column.null_count:
+            # The column of a `RecordBatch` only converts nulls when it may copy.
+            return column.to_numpy(zero_copy_only=False)
+        return column.to_numpy()
+    column = X[:, column_position(X, key)]
+    if column.dtype == np.float64:
+        return column
+    return column.astype(np.float64)
+
+
+class ColumnData:
+    """
+    The columns of `X` that a drawing uses, each read exactly once as a float array.
+
+    Scoring only ever touches these columns, so chunks of rows are taken from the
+    (often strided) column views directly instead of slicing the full dataframe or array,
+    and columns that are shared between charts are not read twice.
+
+    Arguments:
+        columns: a dictionary that maps every key of the drawing to a float array
+        n_rows: the number of rows in `X`
+    """
+
+    def __init__(self, columns, n_rows):
+        self.columns = columns
+        self.n_rows = n_rows
+
+    @classmethod
+    def from_data(cls, X, keys):
+        """
+        Reads the columns with the given `keys` from `X`, which can be a `pd.DataFrame`,
+        a `polars.DataFrame`, a `pyarrow.Table`, an array or anything that `np.asarray`
+        accepts.
+        """
+        if isinstance(X, cls):
+            return X
+        if is_polars_frame(X) or is_arrow_table(X):
+            return cls({k: read_column(X, k) for k in keys}, len(X))
+        if not isinstance(X, pd.DataFrame):
+            X = np.asarray(X)
+            if X.ndim != 2:
+                raise ValueError(
+                    f"Expected a 2D array, got an array of shape {X.shape}."
+                )
+        return cls({k: read_column(X, k) for k in keys}, X.shape[0])
+
+    @property
+    def shape(self):
+        return self.n_rows, len(self.columns)
+
+    def __len__(self):
+        return self.n_rows
+
+    def __getitem__(self, key):
+        return self.columns[key]
+
+    def take(self, rows):
+        """Returns the `ColumnData` of a subset of the rows, a slice yields views."""
+        columns = {k: col[rows] for k, col in self.columns.items()}
+        n_rows = len(range(self.n_rows)[rows]) if isinstance(rows, slice) else len(rows)
+        return ColumnData(columns, n_rows)
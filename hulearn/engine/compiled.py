@@ -0,0 +1,254 @@
+import numpy as np
+import shapely
+from shapely.geometry.polygon import Polygon
+from shapely.prepared import prep
+
+from hulearn.engine.kernels import ring_edges
+
+
+def _readonly(arr, dtype):
+    arr = np.ascontiguousarray(arr, dtype=dtype)
+    arr.flags.writeable = False
+    return arr
+
+
+class CompiledDrawing:
+    """
+    An immutable, scoring-ready version of the chart data that comes out of `InteractiveCharts`.
+
+    The drawn `json_desc` is parsed exactly once. All polygons are stored as one flat
+    vertex buffer with offsets, together with the label index and the column keys that
+    each polygon refers to. The (prepared) Shapely geometries are built from these
+    buffers the first time they are needed and are reused afterwards.
+
+    Arguments:
+        classes: the labels, in the order that they are counted
+        vertices: array of shape `(n_vertices, 2)` with the vertices of all polygons
+        offsets: array of shape `(n_polygons + 1,)`, polygon `i` uses `vertices[offsets[i]:offsets[i+1]]`
+        labels: array of shape `(n_polygons,)` with the index into `classes` for each polygon
+        x_keys: the column key used for the x-axis of each polygon
+        y_keys: the column key used for the y-axis of each polygon
+        chart_ids: the id of the chart that each polygon was drawn on
+
+    Besides these buffers the object exposes `bounds`, an array of shape `(n_polygons, 4)`
+    with `(xmin, ymin, xmax, ymax)` per polygon, and `pairs`, a dictionary that maps every
+    `(x_key, y_key)` column pair to the indices of the polygons that were drawn on it.
+    """
+
+    __slots__ = (
+        "classes",
+        "vertices",
+        "offsets",
+        "labels",
+        "x_keys",
+        "y_keys",
+        "chart_ids",
+        "bounds",
+        "pairs",
+        "_derived",
+    )
+
+    def __init__(self, classes, vertices, offsets, labels, x_keys, y_keys, chart_ids):
+        setter = object.__setattr__
+        setter(self, "classes", tuple(classes))
+        setter(self, "vertices", _readonly(vertices, np.float64).reshape(-1, 2))
+        setter(self, "offsets", _readonly(offsets, np.int64))
+        setter(self, "labels", _readonly(labels, np.int64))
+        setter(self, "x_keys", tuple(x_keys))
+        setter(self, "y_keys", tuple(y_keys))
+        setter(self, "chart_ids", tuple(chart_ids))
+        bounds = np.empty((len(self), 4))
+        if len(self):
+            starts = self.offsets[:-1]
+            bounds[:, :2] = np.minimum.reduceat(self.vertices, starts, axis=0)
+            bounds[:, 2:] = np.maximum.reduceat(self.vertices, starts, axis=0)
+        setter(self, "bounds", _readonly(bounds, np.float64))
+        pairs = {}
+        for i, key in enumerate(zip(self.x_keys, self.y_keys)):
+            pairs.setdefault(key, []).append(i)
+        setter(self, "pairs", {k: _readonly(v, np.int64) for k, v in pairs.items()})
+        setter(self, "_derived", {})
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable.")
+
+    def __reduce__(self):
+        return (
+            type(self),
+            (
+                self.classes,
+                self.vertices,
+                self.offsets,
+                self.labels,
+                self.x_keys,
+                self.y_keys,
+                self.chart_ids,
+            ),
+        )
+
+    def __len__(self):
+        return len(self.labels)
+
+    def polygon(self, i):
+        """Returns the vertices of polygon `i` as an array of shape `(n, 2)`."""
+        return self.vertices[self.offsets[i] : self.offsets[i + 1]]
+
+    def memoize(self, key, build):
+        """
+        Returns a structure that is derived from the polygons, like a spatial index.
+        It is built by calling `build()` the first time `key` is requested and it is
+        reused afterwards. Since the drawing is immutable the result never goes stale.
+        """
+        if key not in self._derived:
+            self._derived[key] = build()
+        return self._derived[key]
+
+    def _build_geometries(self):
+        polygons = [Polygon(self.polygon(i)) for i in range(len(self))]
+        if hasattr(shapely, "prepare"):
+            shapely.prepare(polygons)
+        return tuple(prep(p) for p in polygons)
+
+    @property
+    def edges(self):
+        """Array of shape `(n_vertices, 4)` with the ring edge `(x1, y1, x2, y2)` that ends in each vertex."""
+        return self.memoize("edges", lambda: ring_edges(self.vertices, self.offsets))
+
+    @property
+    def areas(self):
+        """The area of each polygon, computed from its ring with the shoelace formula."""
+        return self.memoize("areas", self._build_areas)
+
+    def _build_areas(self):
+        if not len(self):
+            return np.empty(0)
+        x1, y1, x2, y2 = self.edges.T
+        cross = np.add.reduceat(x1 * y2 - x2 * y1, self.offsets[:-1])
+        return np.abs(cross) / 2
+
+    @property
+    def geometries(self):
+        """The prepared Shapely geometries, one per polygon."""
+        return self.memoize("geometries", self._build_geometries)
+
+    def poly_data(self):
+        """
+        Yields a dictionary per polygon, in the same format that the `poly_data`
+        property on the interactive estimators has always used.
+        """
+        for i, geom in enumerate(self.geometries):
+            yield {
+                "x_lab": self.x_keys[i],
+                "y_lab": self.y_keys[i],
+                "poly": geom.context,
+                "label": self.classes[self.labels[i]],
+                "chart_id": self.chart_ids[i],
+            }
+
+
+def compile_drawing(json_desc):
+    """
+    Turns drawn chart data into a `CompiledDrawing`.
+
+    The labels of the first chart determine the classes. Polygons with fewer than
+    three vertices are ignored, these occur when a user double-clicks too quickly.
+    A drawing that is already compiled is returned as-is.
+
+    Arguments:
+        json_desc: chart data in dictionary form, or a `CompiledDrawing`
+
+    Usage:
+
+    ```python
+    from hulearn.engine import compile_drawing
+
+    json_desc = [{
+        "chart_id": "example",
+        "x": "a",
+        "y": "b",
+        "polygons": {
+            "pos": {"a": [[0.0, 1.0, 1.0]], "b": [[0.0, 0.0, 1.0]]},
+            "neg": {"a": [], "b": []},
+        },
+    }]
+    compiled = compile_drawing(json_desc)
+    assert compiled.classes == ("pos", "neg")
+    assert len(compiled) == 1
+    ```
+    """
+    if isinstance(json_desc, CompiledDrawing):
+        return json_desc
+    classes = list(json_desc[0]["polygons"].keys())
+    class_idx = {k: i for i, k in enumerate(classes)}
+    vertices, offsets, labels = [], [0], []
+    x_keys, y_keys, chart_ids = [], [], []
+    for chart in json_desc:
+        for lab, p in chart["polygons"].items():
+            x_lab, y_lab = p.keys()
+            x_coords, y_coords = list(p.values())
+            for xs, ys in zip(x_coords, y_coords):
+                poly_data = list(zip(xs, ys))
+                if len(poly_data) >= 3:
+                    vertices.extend(poly_data)
+                    offsets.append(len(vertices))
+                    labels.append(class_idx[lab])
+                    x_keys.append(x_lab)
+                    y_keys.append(y_lab)
+                    chart_ids.append(chart["chart_id"])
+    return CompiledDrawing(
+        classes=classes,
+        vertices=np.array(vertices, dtype=np.float64).reshape(-1, 2),
+        offsets=offsets,
+        labels=labels,
+        x_keys=x_keys,
+        y_keys=y_keys,
+        chart_ids=chart_ids,
+    )
+
+
+def stack_drawings(drawings):
+    """
+    Stacks several drawings into a single `CompiledDrawing`, such that they can be scored
+    in one pass. The classes of the stacked drawing are `(model, label)` tuples, with
+    every label that occurs in any drawing for every model, so its hits reshape into an
+    array of shape `(n_rows, n_models, n_labels)`.
+
+    Arguments:
+        drawings: a list of chart data in dictionary form, or of `CompiledDrawing`s
+
+    Usage:
+
+    ```python
+    from hulearn.engine import compile_drawing, stack_drawings
+
+    def drawing(labels):
+        polygons = {lab: {"a": [[0.0, 1.0, 1.0]], "b": [[0.0, 0.0, 1.0]]} for lab in labels}
+        return [{"chart_id": "example", "x": "a", "y": "b", "polygons": polygons}]
+
+    stacked = stack_drawings([drawing(["pos", "neg"]), drawing(["neg", "maybe"])])
+    assert stacked.classes[:3] == ((0, "pos"), (0, "neg"), (0, "maybe"))
+    assert stacked.labels.tolist() == [0, 1, 4, 5]
+    ```
+    """
+    compiled = [compile_drawing(d) for d in drawings]
+    if not compiled:
+        raise ValueError("Stacking requires at least one drawing.")
+    labels = list(dict.fromkeys(c for d in compiled for c in d.classes))
+    label_idx = {c: i for i, c in enumerate(labels)}
+    vertices, offsets, poly_labels = [], [np.zeros(1, dtype=np.int64)], []
+    start = 0
+    for m, d in enumerate(compiled):
+        remap = np.array([label_idx[c] for c in d.classes], dtype=np.int64)
+        vertices.append(d.vertices)
+        offsets.append(d.offsets[1:] + start)
+        poly_labels.append(remap[d.labels] + m * len(labels))
+        start += len(d.vertices)
+    return CompiledDrawing(
+        classes=[(m, c) for m in range(len(compiled)) for c in labels],
+        vertices=np.concatenate(vertices),
+        offsets=np.concatenate(offsets),
+        labels=np.concatenate(poly_labels),
+        x_keys=[k for d in compiled for k in d.x_keys],
+        y_keys=[k for d in compiled for k in d.y_keys],
+        chart_ids=[c for d in compiled for c in d.chart_ids],
+    )
@@ -0,0 +1,93 @@
+from hulearn.engine.binary import load_drawing, save_drawing
+from hulearn.engine.compiled import compile_drawing
+from hulearn.engine.scorer import PolygonScorer
+from hulearn.engine.simplify import simplify_drawing, simplification_report
+
+
+class DrawnEstimatorMixin:
+    """
+    The shared plumbing of the estimators that are built on the drawing in `json_desc`.
+    Fitting compiles the drawing into `compiled_`, optionally simplified when
+    `simplify_tolerance` is set, and changing either parameter invalidates it again.
+    The compiled drawing can be stored in, and loaded from, the binary format of
+    `save_drawing`.
+
+    The mixin goes before `BaseEstimator`, such that its `set_params` is used. An
+    estimator that defines `_outputs_from_hits` gets the rows whose prediction changed
+    in its `simplify_report_`, otherwise the rows whose hits changed are counted.
+    """
+
+    # Changing any of these parameters invalidates `compiled_`.
+    _drawing_params = ("json_desc", "simplify_tolerance")
+
+    @classmethod
+    def from_binary(cls, path, **kwargs):
+        """
+        Load the estimator from a compiled drawing that was stored with `.to_binary(path)`.
+        The polygons are memory-mapped, so loading is fast even for very large drawings.
+
+        Arguments:
+            path: path of the binary file
+            kwargs: the other arguments, like `smoothing`, `threshold` or `backend`, are passed to the constructor
+
+        Usage:
+
+        ```python
+        from hulearn.classification import InteractiveClassifier
+
+        InteractiveClassifier.from_binary("path/to/file.hul", smoothing=0.01)
+        ```
+        """
+        return cls(json_desc=load_drawing(path), **kwargs)
+
+    def to_binary(self, path):
+        """
+        Store the drawn polygons in a compact binary format that `.from_binary(path)` can load.
+
+        Arguments:
+            path: path of the binary file
+        """
+        if hasattr(self, "compiled_"):
+            save_drawing(self.compiled_, path)
+        else:
+            save_drawing(compile_drawing(self.json_desc), path)
+
+    @property
+    def poly_data(self):
+        return compile_drawing(self.json_desc).poly_data()
+
+    def _compile(self, X):
+        """
+        Compiles `json_desc` into `compiled_` and sets `classes_`. The data `X` is only
+        used to report the effect of the simplification, when there is one.
+        """
+        self.compiled_ = compile_drawing(self.json_desc)
+        self.classes_ = list(self.compiled_.classes)
+        if self.simplify_tolerance:
+            self._simplify(X)
+
+    def _simplify(self, X):
+        """
+        Simplifies the compiled polygons and stores a report in `simplify_report_` with
+        the number of removed vertices and, when `X` is given, the number of rows whose
+        output changed because of it.
+        """
+        simplified = simplify_drawing(self.compiled_, self.simplify_tolerance)
+        outputs = getattr(self, "_outputs_from_hits", None)
+        self.simplify_report_ = simplification_report(
+            self.compiled_,
+            simplified,
+            hits=None if X is None else lambda c: PolygonScorer(c).hits(X),
+            outputs=None if outputs is None else lambda hits: outputs(hits)["predict"],
+        )
+        self.compiled_ = simplified
+
+    def set_params(self, **params):
+        """
+        Set the parameters of this estimator. Changing `json_desc` or `simplify_tolerance`
+        invalidates the compiled drawing.
+        """
+        changed = set(self._drawing_params) & set(params)
+        if changed and hasattr(self, "compiled_"):
+            del self.compiled_
+        return super().set_params(**params)
@@ -0,0 +1,172 @@
+import numpy as np
+
+from hulearn.engine.kernels import points_in_polygon, points_in_edge_sets
+
+
+class LookupGrid:
+    """
+    A rasterized lookup table for the polygons that were drawn on a single column pair.
+
+    The bounding box of the polygons is split into `grid_size x grid_size` cells. A cell
+    that is not crossed by the boundary of a polygon is either completely inside or
+    completely outside of it, so its per-label hit counts can be stored up front. Cells
+    that are (nearly) crossed by a boundary are flagged and remember which polygons
+    crossed them. Looking up a point is two index computations and an array gather,
+    only points in flagged cells are tested exactly. That exact test only looks at the
+    edges of the polygon that overlap with the row of the cell, so its cost does not
+    grow with the number of vertices either.
+
+    Arguments:
+        compiled: a `CompiledDrawing`
+        poly_idx: the polygons, all drawn on the same column pair, to rasterize
+        grid_size: the number of cells along each axis, more cells cost more memory but
+          flag a smaller fraction of the points for an exact test
+    """
+
+    def __init__(self, compiled, poly_idx, grid_size=256):
+        self.compiled = compiled
+        self.grid_size = grid_size
+        bounds = compiled.bounds[poly_idx]
+        self.x0, self.y0 = bounds[:, 0].min(), bounds[:, 1].min()
+        self.x1, self.y1 = bounds[:, 2].max(), bounds[:, 3].max()
+        self.dx = max((self.x1 - self.x0) / grid_size, np.finfo(float).tiny)
+        self.dy = max((self.y1 - self.y0) / grid_size, np.finfo(float).tiny)
+
+        n_labels = len(compiled.classes)
+        self.counts = np.zeros((grid_size * grid_size, n_labels), dtype=np.int64)
+        flagged, flagged_strips = [], []
+        strip_edges, strip_sizes, strip_labels = [], [], []
+        for i in poly_idx:
+            edge_cells = self._boundary_cells(compiled.polygon(i))
+            (ix0, ix1), (iy0, iy1) = self._cell(compiled.bounds[i])
+            gx, gy = np.meshgrid(np.arange(ix0, ix1 + 1), np.arange(iy0, iy1 + 1))
+            cells = np.setdiff1d((gy * grid_size + gx).ravel(), edge_cells)
+            cx = self.x0 + (cells % grid_size + 0.5) * self.dx
+            cy = self.y0 + (cells // grid_size + 0.5) * self.dy
+            inside = points_in_polygon(compiled.polygon(i), cx, cy)
+            self.counts[cells[inside], compiled.labels[i]] += 1
+
+            # A flagged cell only needs the edges that can cross a ray in its row.
+            first_row, edges, sizes = self._row_strips(compiled, i)
+            strips = len(strip_sizes) + edge_cells // grid_size - first_row
+            flagged.append(edge_cells)
+            flagged_strips.append(strips)
+            strip_edges.append(edges)
+            strip_sizes.extend(sizes)
+            strip_labels.extend([compiled.labels[i]] * len(sizes))
+
+        flagged = np.concatenate(flagged)
+        order = np.argsort(flagged, kind="stable")
+        self.flagged_strips = np.concatenate(flagged_strips)[order]
+        self.flagged_ptr = np.searchsorted(
+            flagged[order], np.arange(grid_size * grid_size + 1)
+        )
+        self.strip_sizes = np.array(strip_sizes, dtype=np.int64)
+        self.strip_starts = np.cumsum(self.strip_sizes) - self.strip_sizes
+        self.strip_labels = np.array(strip_labels, dtype=np.int64)
+        self.strip_edges = compiled.edges[np.concatenate(strip_edges)]
+
+    def _row_strips(self, compiled, i):
+        """
+        Splits the edges of polygon `i` into one strip per grid row, a strip holds
+        the edges whose y-range overlaps with the row. Returns the first row, the edge
+        indices of all strips in order and the number of edges per strip.
+        """
+        eps = 1e-6
+        start, stop = compiled.offsets[i], compiled.offsets[i + 1]
+        edges = compiled.edges[start:stop]
+        v_lo = (np.minimum(edges[:, 1], edges[:, 3]) - self.y0) / self.dy
+        v_hi = (np.maximum(edges[:, 1], edges[:, 3]) - self.y0) / self.dy
+        lo = np.clip(np.floor(v_lo - eps), 0, self.grid_size - 1).astype(np.int64)
+        hi = np.clip(np.floor(v_hi + eps), 0, self.grid_size - 1).astype(np.int64)
+        sizes = hi - lo + 1
+        rows = np.repeat(lo - np.cumsum(sizes) + sizes, sizes)
+        rows = rows + np.arange(rows.shape[0])
+        edge_idx = np.repeat(np.arange(start, stop), sizes)
+        order = np.argsort(rows, kind="stable")
+        first, last = lo.min(), hi.max()
+        per_row = np.bincount(rows - first, minlength=last - first + 1)
+        return first, edge_idx[order], per_row
+
+    def _index(self, xs, ys):
+        ix = np.clip(np.floor((xs - self.x0) / self.dx), 0, self.grid_size - 1)
+        iy = np.clip(np.floor((ys - self.y0) / self.dy), 0, self.grid_size - 1)
+        return ix.astype(np.int64), iy.astype(np.int64)
+
+    def _cell(self, bounds):
+        ix, iy = self._index(np.array(bounds[0::2]), np.array(bounds[1::2]))
+        return tuple(ix), tuple(iy)
+
+    def _boundary_cells(self, vertices):
+        """
+        All cells that a polygon edge passes through (a "supercover"). Cells are widened
+        by a tiny margin, such that a point that is rounded into a neighbouring cell can
+        never end up on the wrong side of an edge.
+        """
+        eps = 1e-6
+        u = (vertices[:, 0] - self.x0) / self.dx
+        v = (vertices[:, 1] - self.y0) / self.dy
+        u1, v1, u2, v2 = u, v, np.roll(u, -1), np.roll(v, -1)
+        cells = []
+        for a, b, c, d in zip(u1, v1, u2, v2):
+            cols = np.arange(np.floor(min(a, c) - eps), np.floor(max(a, c) + eps) + 1)
+            if a == c:
+                lo, hi = np.full(cols.shape, min(b, d)), np.full(cols.shape, max(b, d))
+            else:
+                ua = np.clip(cols - eps, min(a, c), max(a, c))
+                ub = np.clip(cols + 1 + eps, min(a, c), max(a, c))
+                va, vb = b + (ua - a) * (d - b) / (c - a), b + (ub - a) * (d - b) / (
+                    c - a
+                )
+                lo, hi = np.minimum(va, vb), np.maximum(va, vb)
+            rows_lo = np.floor(lo - eps).astype(np.int64)
+            rows_hi = np.floor(hi + eps).astype(np.int64)
+            sizes = rows_hi - rows_lo + 1
+            col = np.repeat(cols.astype(np.int64), sizes)
+            row = np.repeat(rows_lo - np.cumsum(sizes) + sizes, sizes)
+            row = row + np.arange(col.shape[0])
+            cells.append((col, row))
+        col = np.clip(np.concatenate([c for c, _ in cells]), 0, self.grid_size - 1)
+        row = np.clip(np.concatenate([r for _, r in cells]), 0, self.grid_size - 1)
+        return np.unique(row * self.grid_size + col)
+
+    def hits(self, xs, ys, exact=None):
+        """
+        Returns the per-label hit counts for all points, an array of shape `(n_points, n_labels)`.
+
+        Arguments:
+            xs: float array with the x-coordinates of the points
+            ys: float array with the y-coordinates of the points
+            exact: function that returns the exact `(rows, polys)` hits for a subset of the
+              points, such that points near an edge are decided like the backend does, `None`
+              tests them with the NumPy ray casting against the edges in their row
+        """
+        hits = np.zeros((xs.shape[0], self.counts.shape[1]), dtype=np.int64)
+        rows = np.flatnonzero(
+            (xs > self.x0) & (xs < self.x1) & (ys > self.y0) & (ys < self.y1)
+        )
+        ix, iy = self._index(xs[rows], ys[rows])
+        cell = iy * self.grid_size + ix
+        hits[rows] = self.counts[cell]
+
+        # Points in flagged cells are tested exactly, against the edges in their row.
+        start, stop = self.flagged_ptr[cell], self.flagged_ptr[cell + 1]
+        sizes = stop - start
+        if exact is not None:
+            near = rows[sizes > 0]
+            hits[near] = 0
+            found, polys = exact(xs[near], ys[near])
+            np.add.at(hits, (near[found], self.compiled.labels[polys]), 1)
+            return hits
+        check = np.repeat(rows, sizes)
+        shift = np.repeat(start - np.cumsum(sizes) + sizes, sizes)
+        strips = self.flagged_strips[shift + np.arange(check.shape[0])]
+        inside = points_in_edge_sets(
+            self.strip_edges,
+            self.strip_starts[strips],
+            self.strip_sizes[strips],
+            xs[check],
+            ys[check],
+        )
+        np.add.at(hits, (check[inside], self.strip_labels[strips[inside]]), 1)
+        return hits
@@ -0,0 +1,73 @@
+import numpy as np
+
+
+class BucketIndex:
+    """
+    A uniform grid over the bounding box of a set of polygons. Every cell knows which
+    polygons have a bounding box that overlaps it, which makes it cheap to find the
+    candidate polygons for a large batch of points at once.
+
+    Arguments:
+        bounds: array of shape `(n_polygons, 4)` with `(xmin, ymin, xmax, ymax)` per polygon
+        poly_idx: the index of each polygon in the compiled drawing
+        n_cells: the number of cells along each axis, defaults to roughly `sqrt(n_polygons)`
+    """
+
+    def __init__(self, bounds, poly_idx, n_cells=None):
+        self.bounds = np.asarray(bounds, dtype=np.float64)
+        self.poly_idx = np.asarray(poly_idx, dtype=np.int64)
+        if n_cells is None:
+            n_cells = int(np.clip(np.ceil(np.sqrt(len(self.poly_idx))), 1, 1024))
+        self.n_cells = n_cells
+        self.x0, self.y0 = self.bounds[:, 0].min(), self.bounds[:, 1].min()
+        self.x1, self.y1 = self.bounds[:, 2].max(), self.bounds[:, 3].max()
+        self.dx = max((self.x1 - self.x0) / n_cells, np.finfo(float).tiny)
+        self.dy = max((self.y1 - self.y0) / n_cells, np.finfo(float).tiny)
+        ix0, iy0 = self._cell(self.bounds[:, 0], self.bounds[:, 1])
+        ix1, iy1 = self._cell(self.bounds[:, 2], self.bounds[:, 3])
+        # Every polygon covers a rectangle of cells, enumerated without a Python loop.
+        width, height = ix1 - ix0 + 1, iy1 - iy0 + 1
+        sizes = width * height
+        members = np.repeat(np.arange(len(self.poly_idx)), sizes)
+        local = np.arange(sizes.sum()) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+        gx = ix0[members] + local % width[members]
+        gy = iy0[members] + local // width[members]
+        cells = gy * n_cells + gx
+        order = np.argsort(cells, kind="stable")
+        self.cell_members = members[order]
+        self.cell_ptr = np.searchsorted(cells[order], np.arange(n_cells * n_cells + 1))
+
+    def _cell(self, xs, ys):
+        ix = np.clip(np.floor((xs - self.x0) / self.dx), 0, self.n_cells - 1)
+        iy = np.clip(np.floor((ys - self.y0) / self.dy), 0, self.n_cells - 1)
+        return ix.astype(np.int64), iy.astype(np.int64)
+
+    def candidates(self, xs, ys, inclusive=False):
+        """
+        Returns a tuple `(rows, polys)` with every combination of a point and a polygon
+        whose bounding box strictly contains the point. With `inclusive=True` points on
+        the bounding box count too, which matters for shapes that a point on their
+        boundary can belong to, like the triangles that share an edge.
+        """
+        if inclusive:
+            inside = (
+                (xs >= self.x0) & (xs <= self.x1) & (ys >= self.y0) & (ys <= self.y1)
+            )
+        else:
+            inside = (xs > self.x0) & (xs < self.x1) & (ys > self.y0) & (ys < self.y1)
+        rows = np.flatnonzero(inside)
+        ix, iy = self._cell(xs[rows], ys[rows])
+        cell = iy * self.n_cells + ix
+        start, stop = self.cell_ptr[cell], self.cell_ptr[cell + 1]
+        sizes = stop - start
+        rows = np.repeat(rows, sizes)
+        # Positions within each cell's member list, without a Python loop.
+        shift = np.repeat(start - np.cumsum(sizes) + sizes, sizes)
+        members = self.cell_members[shift + np.arange(rows.shape[0])]
+        xmin, ymin, xmax, ymax = self.bounds[members].T
+        px, py = xs[rows], ys[rows]
+        if inclusive:
+            keep = (px >= xmin) & (px <= xmax) & (py >= ymin) & (py <= ymax)
+        else:
+            keep = (px > xmin) & (px < xmax) & (py > ymin) & (py < ymax)
+        return rows[keep], self.poly_idx[members[keep]]
@@ -0,0 +1,120 @@
+import numpy as np
+
+try:
+    from numba import njit, prange
+
+    HAS_NUMBA = True
+except ImportError:  # pragma: no cover
+    HAS_NUMBA = False
+    prange = range
+
+
+def _point_in_ring(vertices, start, stop, px, py):
+    """
+    Even-odd ray casting for a single point, with the exact same arithmetic (and thus
+    the same treatment of boundary points) as `kernels.points_in_polygon`.
+    """
+    inside = False
+    j = stop - 1
+    for i in range(start, stop):
+        x1, y1 = vertices[j, 0], vertices[j, 1]
+        x2, y2 = vertices[i, 0], vertices[i, 1]
+        if y1 == y2:
+            if py == y1 and px >= min(x1, x2) and px <= max(x1, x2):
+                return False
+        elif (y1 > py) != (y2 > py):
+            orient = (x2 - x1) * (py - y1) - (px - x1) * (y2 - y1)
+            if y2 < y1:
+                orient = -orient
+            if orient == 0:
+                return False
+            if orient > 0:
+                inside = not inside
+        if px == x2 and py == y2:
+            return False
+        j = i
+    return inside
+
+
+def _contains(vertices, offsets, bounds, poly, px, py):
+    xmin, ymin, xmax, ymax = (
+        bounds[poly, 0],
+        bounds[poly, 1],
+        bounds[poly, 2],
+        bounds[poly, 3],
+    )
+    if not (px > xmin and px < xmax and py > ymin and py < ymax):
+        return False
+    return _point_in_ring(vertices, offsets[poly], offsets[poly + 1], px, py)
+
+
+def _candidates(grid, cell_ptr, px, py):
+    """The range in the cell member list of the bucket that contains the point."""
+    x0, y0, x1, y1, dx, dy, n_cells = grid
+    if not (px > x0 and px < x1 and py > y0 and py < y1):
+        return 0, 0
+    ix = min(max(int(np.floor((px - x0) / dx)), 0), int(n_cells) - 1)
+    iy = min(max(int(np.floor((py - y0) / dy)), 0), int(n_cells) - 1)
+    cell = iy * int(n_cells) + ix
+    return cell_ptr[cell], cell_ptr[cell + 1]
+
+
+def _query(vertices, offsets, bounds, grid, cell_ptr, cell_polys, xs, ys):
+    """
+    Tests every point against the polygons in its bucket, in parallel over the points.
+    The first pass counts the hits per point, the second pass only revisits the points
+    with at least one hit to write out the `(rows, polys)` pairs.
+    """
+    n = xs.shape[0]
+    counts = np.zeros(n, dtype=np.int64)
+    for k in prange(n):
+        start, stop = _candidates(grid, cell_ptr, xs[k], ys[k])
+        for m in range(start, stop):
+            if _contains(vertices, offsets, bounds, cell_polys[m], xs[k], ys[k]):
+                counts[k] += 1
+    ends = np.cumsum(counts)
+    rows = np.empty(ends[-1] if n else 0, dtype=np.int64)
+    polys = np.empty_like(rows)
+    for k in prange(n):
+        if counts[k] == 0:
+            continue
+        pos = ends[k] - counts[k]
+        start, stop = _candidates(grid, cell_ptr, xs[k], ys[k])
+        for m in range(start, stop):
+            if _contains(vertices, offsets, bounds, cell_polys[m], xs[k], ys[k]):
+                rows[pos] = k
+                polys[pos] = cell_polys[m]
+                pos += 1
+    return rows, polys
+
+
+if HAS_NUMBA:
+    # Compiled code is cached on disk, later processes skip the JIT compilation.
+    _point_in_ring = njit(cache=True)(_point_in_ring)
+    _contains = njit(cache=True)(_contains)
+    _candidates = njit(cache=True)(_candidates)
+    _query = njit(parallel=True, cache=True)(_query)
+
+
+def jit_query(compiled, index, xs, ys):
+    """
+    Returns a tuple `(rows, polys)` with every combination of a point and a polygon in
+    the `BucketIndex` that contains it. Uses a parallel Numba kernel when Numba is installed.
+
+    Arguments:
+        compiled: a `CompiledDrawing`
+        index: a `BucketIndex` over the polygons to test
+        xs: float array with the x-coordinates of the points
+        ys: float array with the y-coordinates of the points
+    """
+    grid = (index.x0, index.y0, index.x1, index.y1, index.dx, index.dy, index.n_cells)
+    return _query(
+        compiled.vertices,
+        compiled.offsets,
+        compiled.bounds,
+        tuple(float(g) for g in grid),
+        index.cell_ptr,
+        index.poly_idx[index.cell_members],
+        np.ascontiguousarray(xs, dtype=np.float64),
+        np.ascontiguousarray(ys, dtype=np.float64),
+    )
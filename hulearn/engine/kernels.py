@@ -0,0 +1,157 @@
+import numpy as np
+import shapely
+
+HAS_SHAPELY_VECTORIZED = hasattr(shapely, "contains_xy")
+
+
+def points_in_polygon(vertices, xs, ys):
+    """
+    Vectorized even-odd ray casting. Returns a boolean array that tells for every
+    point `(xs[i], ys[i])` if it lies strictly inside the polygon.
+
+    Points on the boundary are not considered to be inside, which is the same
+    convention that `shapely` uses for `Polygon.contains`.
+
+    Arguments:
+        vertices: array of shape `(n, 2)` with the (unclosed) polygon ring
+        xs: array with the x-coordinates of the points
+        ys: array with the y-coordinates of the points
+
+    Usage:
+
+    ```python
+    import numpy as np
+    from hulearn.engine.kernels import points_in_polygon
+
+    square = np.array([[0.0, 0.0], [1.0, 0.0], [1.0, 1.0], [0.0, 1.0]])
+    xs, ys = np.array([0.5, 2.0, 1.0]), np.array([0.5, 0.5, 0.5])
+    assert points_in_polygon(square, xs, ys).tolist() == [True, False, False]
+    ```
+    """
+    inside = np.zeros(xs.shape, dtype=bool)
+    boundary = np.zeros(xs.shape, dtype=bool)
+    vx, vy = vertices[:, 0], vertices[:, 1]
+    j = len(vertices) - 1
+    for i in range(len(vertices)):
+        x1, y1, x2, y2 = vx[j], vy[j], vx[i], vy[i]
+        if y1 == y2:
+            # Horizontal edges never cross the ray, but points on them are boundary.
+            boundary |= (ys == y1) & (xs >= min(x1, x2)) & (xs <= max(x1, x2))
+        else:
+            crosses = (y1 > ys) != (y2 > ys)
+            orient = (x2 - x1) * (ys - y1) - (xs - x1) * (y2 - y1)
+            if y2 < y1:
+                orient = -orient
+            inside ^= crosses & (orient > 0)
+            boundary |= crosses & (orient == 0)
+        boundary |= (xs == x2) & (ys == y2)
+        j = i
+    return inside & ~boundary
+
+
+def shapely_contains(geometry, xs, ys):
+    """
+    Vectorized containment check that uses `shapely.contains_xy`, requires Shapely 2.
+
+    Arguments:
+        geometry: a (prepared) Shapely polygon
+        xs: array with the x-coordinates of the points
+        ys: array with the y-coordinates of the points
+    """
+    return shapely.contains_xy(getattr(geometry, "context", geometry), xs, ys)
+
+
+def ring_edges(vertices, offsets):
+    """
+    Returns an array of shape `(n_vertices, 4)` where row `i` holds `(x1, y1, x2, y2)`,
+    the edge of the polygon ring that ends in vertex `i`.
+    """
+    prev = np.arange(-1, len(vertices) - 1)
+    prev[offsets[:-1]] = offsets[1:] - 1
+    return np.column_stack([vertices[prev], vertices])
+
+
+def distances_to_edges(edges, xs, ys):
+    """
+    Returns an array of shape `(n_points, n_edges)` with the Euclidean distance from every
+    point `(xs[i], ys[i])` to every line segment in `edges`.
+
+    Arguments:
+        edges: array of shape `(n_edges, 4)` with a segment `(x1, y1, x2, y2)` per row
+        xs: array with the x-coordinates of the points
+        ys: array with the y-coordinates of the points
+
+    Usage:
+
+    ```python
+    import numpy as np
+    from hulearn.engine.kernels import distances_to_edges
+
+    edges = np.array([[0.0, 0.0, 1.0, 0.0]])
+    xs, ys = np.array([0.5, 2.0]), np.array([1.0, 0.0])
+    assert distances_to_edges(edges, xs, ys).tolist() == [[1.0], [1.0]]
+    ```
+    """
+    x1, y1, x2, y2 = edges.T
+    dx, dy = x2 - x1, y2 - y1
+    length = dx * dx + dy * dy
+    px, py = xs[:, None] - x1, ys[:, None] - y1
+    # The projection of the point on the segment, as a fraction of its length. The
+    # arithmetic happens in place, which matters for these `(n_points, n_edges)` arrays.
+    t = px * dx
+    t += py * dy
+    t *= 1.0 / np.where(length > 0, length, 1.0)
+    np.clip(t, 0.0, 1.0, out=t)
+    px -= t * dx
+    py -= t * dy
+    px *= px
+    py *= py
+    px += py
+    return np.sqrt(px, out=px)
+
+
+def points_in_edge_sets(edges, starts, sizes, xs, ys):
+    """
+    Even-odd ray casting where point `(xs[k], ys[k])` is tested against its own set
+    of edges, `edges[starts[k]:starts[k] + sizes[k]]`. The edge set can be a complete
+    polygon ring or only the edges that can possibly cross the ray of the point.
+
+    The loop runs over the edge positions instead of over the points or polygons, so
+    the Python overhead does not grow with the number of polygons. Every edge uses the
+    same arithmetic as `points_in_polygon`, which means the results are identical.
+    """
+    # Sorting on size makes the points that still have an edge left a prefix.
+    order = np.argsort(-sizes, kind="stable")
+    starts, xs, ys = starts[order], xs[order], ys[order]
+    n_edges = np.arange(1, sizes.max(initial=0) + 1)
+    n_active = np.searchsorted(-sizes[order], -n_edges, side="right")
+    inside = np.zeros(xs.shape, dtype=bool)
+    boundary = np.zeros(xs.shape, dtype=bool)
+    for k, n in enumerate(n_active):
+        px, py = xs[:n], ys[:n]
+        x1, y1, x2, y2 = edges[starts[:n] + k].T
+        flat = y1 == y2
+        boundary[:n] |= (
+            flat & (py == y1) & (px >= np.minimum(x1, x2)) & (px <= np.maximum(x1, x2))
+        )
+        crosses = ~flat & ((y1 > py) != (y2 > py))
+        orient = (x2 - x1) * (py - y1) - (px - x1) * (y2 - y1)
+        orient = np.where(y2 < y1, -orient, orient)
+        inside[:n] ^= crosses & (orient > 0)
+        boundary[:n] |= (crosses & (orient == 0)) | ((px == x2) & (py == y2))
+    result = np.empty(xs.shape, dtype=bool)
+    result[order] = inside & ~boundary
+    return result
+
+
+def points_in_polygons(vertices, offsets, polys, xs, ys, edges=None):
+    """
+    Pairwise version of `points_in_polygon`: tests point `(xs[k], ys[k])` against
+    polygon `polys[k]` for every `k` at once. The polygons are given as the flat
+    `vertices` and `offsets` buffers of a `CompiledDrawing`, the `edges` can be passed
+    along when they were already computed with `ring_edges`.
+    """
+    if edges is None:
+        edges = ring_edges(vertices, offsets)
+    starts = offsets[polys]
+    return points_in_edge_sets(edges, starts, offsets[polys + 1] - starts, xs, ys)
@@ -0,0 +1,94 @@
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+PREFER = ("threads", "processes")
+
+# The function of a worker process, it is shipped once when the worker starts.
+_WORKER_FUNC = None
+
+
+def effective_n_jobs(n_jobs=None):
+    """
+    Resolves `n_jobs` the way scikit-learn does: `None` means one job and negative
+    numbers count back from the number of cores, such that `-1` uses all of them.
+    """
+    if n_jobs is None:
+        return 1
+    if n_jobs == 0:
+        raise ValueError("n_jobs == 0 has no meaning, use None or a non-zero integer.")
+    if n_jobs < 0:
+        return max(os.cpu_count() + 1 + n_jobs, 1)
+    return n_jobs
+
+
+def mp_context():
+    """
+    The multiprocessing context for process pools. Forking a process after a threading
+    layer (e.g. the TBB pool of Numba) started can leave the child in a broken state, a
+    fork server starts workers from a clean process that already imported the engine.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context("forkserver")
+        ctx.set_forkserver_preload(["hulearn.engine"])
+        return ctx
+    return multiprocessing.get_context()
+
+
+def _init_worker(func):
+    global _WORKER_FUNC
+    _WORKER_FUNC = func
+
+
+def _call_in_worker(chunk):
+    return _WORKER_FUNC(chunk)
+
+
+def parallel_map(func, chunks, n_jobs, prefer="threads"):
+    """
+    Applies `func` to every chunk on a pool of `n_jobs` workers and yields the results
+    in order. At most two chunks per worker are in flight, so memory use stays bounded
+    for long iterators of chunks.
+
+    Threads share `func` directly, which pays off when the heavy lifting happens in
+    NumPy and Shapely code that releases the GIL. Processes receive a pickled copy of
+    `func` once, when they start, after which only the chunks are sent over.
+
+    Arguments:
+        func: a function of a single chunk, it must pickle for `prefer="processes"`
+        chunks: an iterable of chunks
+        n_jobs: the number of workers
+        prefer: either `"threads"` or `"processes"`
+    """
+    if prefer == "threads":
+        pool, call = ThreadPoolExecutor(max_workers=n_jobs), func
+    else:
+        pool = ProcessPoolExecutor(
+            max_workers=n_jobs,
+            mp_context=mp_context(),
+            initializer=_init_worker,
+            initargs=(func,),
+        )
+        call = _call_in_worker
+    with pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(call, chunk))
+            if len(pending) >= 2 * n_jobs:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def parallel_hits(scorer, chunks, n_jobs, prefer="threads"):
+    """
+    Scores the chunks of rows with `parallel_map` and yields the hits of each chunk in order.
+
+    Arguments:
+        scorer: a `PolygonScorer`
+        chunks: an iterable of row chunks of `X`
+        n_jobs: the number of workers
+        prefer: either `"threads"` or `"processes"`
+    """
+    return parallel_map(scorer._hits, chunks, n_jobs, prefer)
@@ -0,0 +1,120 @@
+import numpy as np
+import shapely
+
+from hulearn.engine.index import BucketIndex
+from hulearn.engine.kernels import (
+    HAS_SHAPELY_VECTORIZED,
+    points_in_edge_sets,
+    points_in_polygon,
+)
+
+
+def _segments(geometries):
+    """
+    Returns the straight segments of a set of (linear) geometries as an array of shape
+    `(n_segments, 4)` with `(x1, y1, x2, y2)` per row and the geometry of every segment.
+    """
+    coords, which = shapely.get_coordinates(geometries, return_index=True)
+    same = which[1:] == which[:-1]
+    return np.column_stack([coords[:-1], coords[1:]])[same], which[:-1][same]
+
+
+class PlanarPartition:
+    """
+    Overlays all polygons that were drawn on a single column pair into disjoint faces.
+
+    The rings of all polygons are noded and polygonized, which splits the plane into
+    faces that do not overlap. Every point inside a drawn polygon falls into exactly one
+    face and every face carries a precomputed per-label count vector, so a point is
+    looked up in a single face no matter how many polygons overlap it. Noding can move
+    an intersection by a rounding error, which is why points within `tolerance` of an
+    edge of the overlay are tested exactly instead. Building the overlay requires
+    Shapely 2, looking points up is done in NumPy.
+
+    Arguments:
+        compiled: a `CompiledDrawing`
+        poly_idx: the polygons, all drawn on the same column pair, to overlay
+        tolerance: distance to an edge, relative to the size of the drawing, below which
+          points are tested exactly
+    """
+
+    def __init__(self, compiled, poly_idx, tolerance=1e-9):
+        if not HAS_SHAPELY_VECTORIZED:
+            raise ImportError("The 'partition' mode requires shapely>=2.0.")
+        self.compiled = compiled
+        rings = [
+            shapely.linestrings(np.vstack([p, p[:1]]))
+            for p in map(compiled.polygon, poly_idx)
+        ]
+        lines = shapely.get_parts(shapely.union_all(rings))
+        faces = shapely.get_parts(shapely.polygonize(lines))
+
+        # Every face is either completely inside or outside each drawn polygon, so a
+        # single interior point per face determines its count vector.
+        reps = shapely.get_coordinates(shapely.point_on_surface(faces))
+        self.counts = np.zeros((len(faces), len(compiled.classes)), dtype=np.int64)
+        for i in poly_idx:
+            self.counts[:, compiled.labels[i]] += points_in_polygon(
+                compiled.polygon(i), reps[:, 0], reps[:, 1]
+            )
+
+        # Faces can have holes, the edges of all their rings are tested together.
+        face_rings, ring_face = shapely.get_rings(faces, return_index=True)
+        self.face_edges, edge_ring = _segments(face_rings)
+        self.face_sizes = np.bincount(ring_face[edge_ring], minlength=len(faces))
+        self.face_starts = np.cumsum(self.face_sizes) - self.face_sizes
+        self.faces = BucketIndex(shapely.bounds(faces), np.arange(len(faces)))
+
+        self.segments, _ = _segments(lines)
+        xmin, ymin, xmax, ymax = shapely.total_bounds(lines)
+        self.tolerance = tolerance * max(xmax - xmin, ymax - ymin)
+        x1, y1, x2, y2 = self.segments.T
+        seg_bounds = np.column_stack(
+            [
+                np.minimum(x1, x2),
+                np.minimum(y1, y2),
+                np.maximum(x1, x2),
+                np.maximum(y1, y2),
+            ]
+        )
+        seg_bounds += np.array([-1, -1, 1, 1]) * self.tolerance
+        self.edges = BucketIndex(seg_bounds, np.arange(len(self.segments)))
+
+    def __len__(self):
+        return len(self.counts)
+
+    def _near_edge(self, xs, ys):
+        rows, seg = self.edges.candidates(xs, ys)
+        x1, y1, x2, y2 = self.segments[seg].T
+        px, py = xs[rows] - x1, ys[rows] - y1
+        dx, dy = x2 - x1, y2 - y1
+        length = dx * dx + dy * dy
+        t = np.clip((px * dx + py * dy) / np.where(length > 0, length, 1), 0, 1)
+        dist = (px - t * dx) ** 2 + (py - t * dy) ** 2
+        return np.unique(rows[dist <= self.tolerance**2])
+
+    def hits(self, xs, ys, exact):
+        """
+        Returns the per-label hit counts for all points, an array of shape `(n_points, n_labels)`.
+
+        Arguments:
+            xs: float array with the x-coordinates of the points
+            ys: float array with the y-coordinates of the points
+            exact: function that returns the exact `(rows, polys)` hits for a subset of the points
+        """
+        hits = np.zeros((xs.shape[0], self.counts.shape[1]), dtype=np.int64)
+        rows, face = self.faces.candidates(xs, ys)
+        inside = points_in_edge_sets(
+            self.face_edges,
+            self.face_starts[face],
+            self.face_sizes[face],
+            xs[rows],
+            ys[rows],
+        )
+        hits[rows[inside]] = self.counts[face[inside]]
+
+        near = self._near_edge(xs, ys)
+        hits[near] = 0
+        rows, polys = exact(xs[near], ys[near])
+        np.add.at(hits, (near[rows], self.compiled.labels[polys]), 1)
+        return hits
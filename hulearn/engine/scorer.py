@@ -0,0 +1,403 @@
+from functools import partial
+
+import numpy as np
+from scipy import sparse
+
+from hulearn.engine.backends import get_backend
+from hulearn.engine.columns import ColumnData
+from hulearn.engine.grid import LookupGrid
+from hulearn.engine.kernels import distances_to_edges
+from hulearn.engine.parallel import (
+    PREFER,
+    effective_n_jobs,
+    parallel_hits,
+    parallel_map,
+)
+from hulearn.engine.partition import PlanarPartition
+from hulearn.engine.triangles import TriangleMesh
+
+MODES = ("direct", "grid", "partition", "triangles")
+
+
+class PolygonScorer:
+    """
+    Scores data against a `CompiledDrawing`. This is the shared hot path behind
+    `InteractiveClassifier`, `InteractivePreprocessor` and `InteractiveOutlierDetector`.
+
+    The columns that the drawing uses are read from `X` once, as a `ColumnData` of float
+    views whenever the dtypes allow it, and every `(x, y)` column pair is handed to the
+    backend, which tests all rows against the polygons drawn on that pair.
+
+    Besides this `"direct"` mode there is a `"grid"` mode, which rasterizes the polygons
+    of every column pair into a `LookupGrid` once. Most rows are then scored with a
+    single array lookup and only rows near a polygon boundary are tested exactly.
+    The `"partition"` mode overlays the polygons of every column pair into a
+    `PlanarPartition` of disjoint faces, such that every row is looked up in exactly
+    one face regardless of how many polygons overlap. It requires Shapely 2. Since the
+    grid and the partition only keep counts per label, `pairs` uses the direct mode for them.
+    The `"triangles"` mode splits every polygon into triangles with ear clipping, such
+    that concave polygons with many vertices are scored with three orientation tests
+    per candidate triangle instead of a ray cast over all of their edges.
+
+    With a `batch_size` the rows of `X` are scored in chunks, such that the temporary
+    arrays (columns, candidate pairs) never grow beyond the size of a single chunk.
+    With `n_jobs` the chunks are scored in parallel, on threads or on processes.
+
+    Arguments:
+        compiled: a `CompiledDrawing`
+        backend: the point-in-polygon backend, one of `"auto"`, `"numpy"`, `"shapely"` or `"numba"`
+        mode: the scoring strategy, one of `"direct"`, `"grid"`, `"partition"` or `"triangles"`
+        grid_size: the number of cells along each axis of a lookup grid
+        batch_size: the number of rows to score at once, `None` scores all rows in one go
+          (or splits them evenly over the jobs)
+        n_jobs: the number of workers to score with, `None` means 1 and `-1` uses all cores
+        prefer: the kind of workers, `"threads"` or `"processes"`
+        cache: a `HitCache` that remembers the hits of recently scored data, or `None`
+
+    Usage:
+
+    ```python
+    import numpy as np
+    from hulearn.engine import compile_drawing, PolygonScorer
+
+    json_desc = [{
+        "chart_id": "example",
+        "x": 0,
+        "y": 1,
+        "polygons": {
+            "pos": {0: [[0.0, 2.0, 2.0, 0.0]], 1: [[0.0, 0.0, 2.0, 2.0]]},
+            "neg": {0: [], 1: []},
+        },
+    }]
+    scorer = PolygonScorer(compile_drawing(json_desc), backend="numpy")
+    hits = scorer.hits(np.array([[1.0, 1.0], [3.0, 3.0]]))
+    assert hits.tolist() == [[1, 0], [0, 0]]
+    ```
+    """
+
+    def __init__(
+        self,
+        compiled,
+        backend="auto",
+        mode="direct",
+        grid_size=256,
+        batch_size=None,
+        n_jobs=None,
+        prefer="threads",
+        cache=None,
+    ):
+        if mode not in MODES:
+            raise ValueError(f"Unknown mode '{mode}', choose from {list(MODES)}.")
+        if prefer not in PREFER:
+            raise ValueError(f"Unknown prefer '{prefer}', choose from {list(PREFER)}.")
+        if batch_size is not None and batch_size < 1:
+            raise ValueError(
+                f"The batch_size must be a positive integer, got {batch_size}."
+            )
+        self.compiled = compiled
+        self.backend = get_backend(backend)
+        self.mode = mode
+        self.grid_size = grid_size
+        self.batch_size = batch_size
+        self.n_jobs = effective_n_jobs(n_jobs)
+        self.prefer = prefer
+        self.cache = cache
+
+    @classmethod
+    def from_estimator(cls, estimator):
+        """
+        Creates a scorer for a fitted interactive estimator, using its scoring settings.
+        """
+        return cls(
+            estimator.compiled_,
+            backend=getattr(estimator, "backend", "auto"),
+            mode=getattr(estimator, "mode", "direct"),
+            grid_size=getattr(estimator, "grid_size", 256),
+            batch_size=getattr(estimator, "batch_size", None),
+            n_jobs=getattr(estimator, "n_jobs", None),
+            prefer=getattr(estimator, "prefer", "threads"),
+            cache=getattr(estimator, "cache", None),
+        )
+
+    def _prepare(self, X):
+        keys = dict.fromkeys(k for pair in self.compiled.pairs for k in pair)
+        return ColumnData.from_data(X, keys)
+
+    def _exact(self, poly_idx):
+        """
+        The exact test for points near a polygon edge, or `None` when the backend uses the
+        ray casting of `hulearn.engine.kernels` which the lookup structures can run directly.
+        """
+        if self.backend.ray_casting:
+            return None
+        return partial(self.backend.query, self.compiled, poly_idx)
+
+    def _grid(self, pair, poly_idx):
+        return self.compiled.memoize(
+            ("grid", pair, self.grid_size),
+            lambda: LookupGrid(self.compiled, poly_idx, grid_size=self.grid_size),
+        )
+
+    def _partition(self, pair, poly_idx):
+        return self.compiled.memoize(
+            ("partition", pair), lambda: PlanarPartition(self.compiled, poly_idx)
+        )
+
+    def _mesh(self, pair, poly_idx):
+        return self.compiled.memoize(
+            ("triangles", pair), lambda: TriangleMesh(self.compiled, poly_idx)
+        )
+
+    def pairs(self, X):
+        """
+        Returns a tuple `(rows, polys)` of integer arrays, with one entry for every
+        combination of a row in `X` and a polygon that contains it.
+        """
+        X = self._prepare(X)
+        rows, polys = [np.empty(0, dtype=np.int64)], [np.empty(0, dtype=np.int64)]
+        for (x_key, y_key), poly_idx in self.compiled.pairs.items():
+            xs, ys = X[x_key], X[y_key]
+            if self.mode == "triangles":
+                exact = partial(self.backend.query, self.compiled)
+                mesh = self._mesh((x_key, y_key), poly_idx)
+                r, p = mesh.query(xs, ys, exact)
+            else:
+                r, p = self.backend.query(self.compiled, poly_idx, xs, ys)
+            rows.append(r)
+            polys.append(p)
+        return np.concatenate(rows), np.concatenate(polys)
+
+    def _slices(self, X):
+        n_rows = X.shape[0]
+        size = self.batch_size or max(-(-n_rows // self.n_jobs), 1)
+        return [
+            slice(start, min(start + size, n_rows)) for start in range(0, n_rows, size)
+        ]
+
+    def _rows(self, X, rows):
+        return X.take(rows)
+
+    def memberships(self, X):
+        """
+        Returns a sparse indicator matrix of shape `(n_rows, n_polygons)` that tells which
+        polygons contain each row. It is built from the `(rows, polys)` pairs directly,
+        so no dense `(n_rows, n_polygons)` array is ever created.
+        """
+        X = self._prepare(X)
+        chunks = [self._membership(self._rows(X, s)) for s in self._slices(X)]
+        if len(chunks) == 1:
+            return chunks[0]
+        if not chunks:
+            return self._membership(X)
+        return sparse.vstack(chunks, format="csr")
+
+    def membership_batches(self, X):
+        """Same as `batches`, but yields a sparse `memberships` matrix per chunk."""
+        X = self._prepare(X)
+        for rows in self._slices(X):
+            yield rows, self._membership(self._rows(X, rows))
+
+    def _membership(self, X):
+        rows, polys = self.pairs(X)
+        data = np.ones(rows.shape[0], dtype=np.int64)
+        shape = (X.shape[0], len(self.compiled))
+        return sparse.csr_matrix((data, (rows, polys)), shape=shape)
+
+    def batches(self, X):
+        """
+        Scores `X` in chunks of `batch_size` rows. Yields a tuple `(rows, hits)` per
+        chunk, where `rows` is the slice of `X` that was scored and `hits` holds its counts.
+        """
+        X = self._prepare(X)
+        slices = self._slices(X)
+        chunks = (self._rows(X, s) for s in slices)
+        if self.n_jobs == 1 or len(slices) < 2:
+            yield from zip(slices, map(self._hits, chunks))
+            return
+        if self.prefer == "threads":
+            # Build indexes and lookup structures once, instead of once per thread.
+            self._hits(self._rows(X, slice(0, 1)))
+        yield from zip(slices, parallel_hits(self, chunks, self.n_jobs, self.prefer))
+
+    def hits(self, X):
+        """
+        Counts, for every row in `X` and every label, how many polygons contain the row.
+        With a `cache` the result is read-only and can be shared with earlier calls.
+
+        Returns:
+            an integer array of shape `(n_rows, n_labels)`
+        """
+        X = self._prepare(X)
+        if self.cache is None:
+            return self._score(X)
+        key = self.cache.key(self.compiled, X, list(X.columns.values()))
+        hits = self.cache.get(key)
+        if hits is None:
+            hits = self.cache.put(key, self._score(X))
+        return hits
+
+    def reaches(self, X, threshold):
+        """
+        Tells, for every row in `X`, whether at least `threshold` polygons contain it.
+        That is all an outlier detector needs, and it is cheaper to find out than the
+        full counts of `hits`: in the `"direct"` mode the polygons are tested in the
+        order of `cost_order` and rows are no longer tested once they reach the
+        threshold. With a `cache` that already holds the hits of `X` these are reused.
+
+        Returns:
+            a boolean array of shape `(n_rows,)`
+        """
+        X = self._prepare(X)
+        if self.cache is not None:
+            key = self.cache.key(self.compiled, X, list(X.columns.values()))
+            hits = self.cache.get(key)
+            if hits is not None:
+                return hits.sum(axis=1) >= threshold
+        func = partial(self._reaches, threshold=threshold)
+        if self.batch_size is None and self.n_jobs == 1:
+            return func(X)
+        slices = self._slices(X)
+        chunks = (self._rows(X, s) for s in slices)
+        if self.n_jobs == 1 or len(slices) < 2:
+            results = map(func, chunks)
+        else:
+            if self.prefer == "threads":
+                func(self._rows(X, slice(0, 1)))
+            results = parallel_map(func, chunks, self.n_jobs, self.prefer)
+        out = np.empty(X.shape[0], dtype=bool)
+        for rows, reached in zip(slices, results):
+            out[rows] = reached
+        return out
+
+    def _reaches(self, X, threshold):
+        if self.mode != "direct":
+            return self._hits(X).sum(axis=1) >= threshold
+        n_rows = X.shape[0]
+        counts = np.zeros(n_rows, dtype=np.int64)
+        active = np.arange(n_rows) if threshold > 0 else np.empty(0, dtype=np.int64)
+        for (x_key, y_key), poly_idx in self.cost_order():
+            if not len(active):
+                break
+            xs, ys = X[x_key], X[y_key]
+            if len(active) < n_rows:
+                xs, ys = xs[active], ys[active]
+            rows, _ = self.backend.query(self.compiled, poly_idx, xs, ys)
+            counts[active] += np.bincount(rows, minlength=len(active))
+            active = active[counts[active] < threshold]
+        return counts >= threshold
+
+    def cost_order(self):
+        """
+        The groups of polygons that `reaches` tests one after the other, as a list of
+        `(pair, poly_idx)` tuples. Column pairs that the backend scores without a spatial
+        index are split into single polygons. The groups are sorted on the area they
+        cover per vertex, largest first, such that most rows reach the threshold after
+        a few cheap tests.
+        """
+
+        def build():
+            groups = []
+            for pair, poly_idx in self.compiled.pairs.items():
+                if self.backend._use_index(poly_idx):
+                    groups.append((pair, poly_idx))
+                else:
+                    groups.extend(
+                        (pair, poly_idx[k : k + 1]) for k in range(len(poly_idx))
+                    )
+            areas, sizes = self.compiled.areas, np.diff(self.compiled.offsets)
+            ratio = [-areas[idx].sum() / sizes[idx].sum() for _, idx in groups]
+            return [groups[k] for k in np.argsort(ratio, kind="stable")]
+
+        key = ("cost_order", type(self.backend).__name__, self.backend.index)
+        return self.compiled.memoize(key, build)
+
+    def signed_distances(self, X, return_counts=False):
+        """
+        Returns, for every row in `X`, the signed distance to the nearest polygon boundary.
+        Inside a polygon it is the depth in the polygon that contains the row the deepest,
+        outside of all polygons it is minus the distance to the nearest polygon. Every
+        column pair is rescaled by the bounding box of its polygons, such that distances
+        on charts with different units are comparable. Rows with a missing value get `-inf`.
+
+        Every row is measured against every edge, in chunks that bound the memory usage,
+        so this is considerably more work than `hits` for drawings with many vertices.
+
+        Arguments:
+            X: the data to score
+            return_counts: also return the number of polygons that contain each row
+
+        Returns:
+            a float array of shape `(n_rows,)`, and with `return_counts` an integer array
+            of shape `(n_rows,)` with the counts
+        """
+        X = self._prepare(X)
+        out = np.full(X.shape[0], -np.inf)
+        counts = np.zeros(X.shape[0], dtype=np.int64)
+        for (x_key, y_key), poly_idx in self.compiled.pairs.items():
+            xs, ys = X[x_key], X[y_key]
+            dist, hit_rows = self._signed_distance(poly_idx, xs, ys)
+            out = np.fmax(out, dist)
+            counts += np.bincount(hit_rows, minlength=X.shape[0])
+        return (out, counts) if return_counts else out
+
+    def _signed_distance(self, poly_idx, xs, ys):
+        compiled = self.compiled
+        bounds = compiled.bounds[poly_idx]
+        origin = bounds[:, :2].min(axis=0)
+        scale = np.maximum(bounds[:, 2:].max(axis=0) - origin, np.finfo(float).tiny)
+        starts, sizes = compiled.offsets[poly_idx], np.diff(compiled.offsets)[poly_idx]
+        edges = np.concatenate(
+            [compiled.edges[a : a + n] for a, n in zip(starts, sizes)]
+        )
+        edges = (edges - np.tile(origin, 2)) / np.tile(scale, 2)
+        firsts = np.cumsum(sizes) - sizes
+        hit_rows, hit_polys = self.backend.query(compiled, poly_idx, xs, ys)
+        order = np.argsort(hit_rows, kind="stable")
+        hit_rows, hit_polys = hit_rows[order], np.searchsorted(
+            poly_idx, hit_polys[order]
+        )
+        out = np.full(xs.shape[0], -np.inf)
+        # Chunks of about 64k distances keep the temporary arrays in the CPU cache.
+        size = max(2**16 // len(edges), 1)
+        for start in range(0, xs.shape[0], size):
+            stop = min(start + size, xs.shape[0])
+            px = (xs[start:stop] - origin[0]) / scale[0]
+            py = (ys[start:stop] - origin[1]) / scale[1]
+            dist = np.minimum.reduceat(
+                distances_to_edges(edges, px, py), firsts, axis=1
+            )
+            lo, hi = np.searchsorted(hit_rows, [start, stop])
+            sign = np.full(dist.shape, -1.0)
+            sign[hit_rows[lo:hi] - start, hit_polys[lo:hi]] = 1.0
+            # NaN distances of missing values are ignored by `fmax`, leaving `-inf`.
+            dist *= sign
+            out[start:stop] = np.fmax.reduce(dist, axis=1, initial=-np.inf)
+        return out, hit_rows
+
+    def _score(self, X):
+        if self.batch_size is None and self.n_jobs == 1:
+            return self._hits(X)
+        out = np.empty((X.shape[0], len(self.compiled.classes)), dtype=np.int64)
+        for rows, hits in self.batches(X):
+            out[rows] = hits
+        return out
+
+    def _hits(self, X):
+        n_rows, n_labels = X.shape[0], len(self.compiled.classes)
+        if self.mode == "grid":
+            hits = np.zeros((n_rows, n_labels), dtype=np.int64)
+            for pair, poly_idx in self.compiled.pairs.items():
+                xs, ys = X[pair[0]], X[pair[1]]
+                hits += self._grid(pair, poly_idx).hits(xs, ys, self._exact(poly_idx))
+            return hits
+        if self.mode == "partition":
+            hits = np.zeros((n_rows, n_labels), dtype=np.int64)
+            for pair, poly_idx in self.compiled.pairs.items():
+                xs, ys = X[pair[0]], X[pair[1]]
+                exact = partial(self.backend.query, self.compiled, poly_idx)
+                hits += self._partition(pair, poly_idx).hits(xs, ys, exact)
+            return hits
+        rows, polys = self.pairs(X)
+        flat = rows * n_labels + self.compiled.labels[polys]
+        counts = np.bincount(flat, minlength=n_rows * n_labels)
+        return counts.astype(np.int64).reshape(n_rows, n_labels)
@@ -0,0 +1,112 @@
+import numpy as np
+from shapely.geometry.polygon import Polygon
+
+from hulearn.engine.compiled import CompiledDrawing
+
+
+def simplify_ring(vertices, tolerance):
+    """
+    Removes (nearly) collinear vertices from a polygon ring with the topology preserving
+    Douglas-Peucker algorithm of Shapely. No vertex moves further than `tolerance` and
+    the polygon never becomes invalid because of it. Rings that would collapse to fewer
+    than three vertices are returned as-is.
+
+    Arguments:
+        vertices: array of shape `(n, 2)` with the (unclosed) polygon ring
+        tolerance: the maximum distance between the original and the simplified ring
+
+    Usage:
+
+    ```python
+    import numpy as np
+    from hulearn.engine.simplify import simplify_ring
+
+    ring = np.array([[0.0, 0.0], [1.0, 0.001], [2.0, 0.0], [2.0, 2.0], [0.0, 2.0]])
+    assert len(simplify_ring(ring, tolerance=0.01)) == 4
+    ```
+    """
+    vertices = np.asarray(vertices, dtype=np.float64)
+    simple = Polygon(vertices).simplify(tolerance, preserve_topology=True)
+    if simple.is_empty or simple.geom_type != "Polygon":
+        return vertices
+    coords = np.asarray(simple.exterior.coords)[:-1]
+    return coords if len(coords) >= 3 else vertices
+
+
+def simplify_drawing(compiled, tolerance):
+    """
+    Returns a new `CompiledDrawing` where every polygon is simplified with `simplify_ring`.
+
+    Arguments:
+        compiled: a `CompiledDrawing`
+        tolerance: the maximum distance between an original and a simplified ring
+    """
+    rings = [
+        simplify_ring(compiled.polygon(i), tolerance) for i in range(len(compiled))
+    ]
+    return CompiledDrawing(
+        classes=compiled.classes,
+        vertices=np.concatenate(rings) if rings else np.empty((0, 2)),
+        offsets=np.cumsum([0] + [len(r) for r in rings]),
+        labels=compiled.labels,
+        x_keys=compiled.x_keys,
+        y_keys=compiled.y_keys,
+        chart_ids=compiled.chart_ids,
+    )
+
+
+def simplify_json(json_desc, tolerance):
+    """
+    Simplifies the polygons of drawn chart data, the result has the same format as
+    the input. Polygons with fewer than three vertices are kept as they are.
+
+    Arguments:
+        json_desc: chart data in dictionary form
+        tolerance: the maximum distance between an original and a simplified ring
+    """
+    charts = []
+    for chart in json_desc:
+        polygons = {}
+        for lab, p in chart["polygons"].items():
+            x_lab, y_lab = p.keys()
+            new_xs, new_ys = [], []
+            for xs, ys in zip(*p.values()):
+                if len(xs) >= 3:
+                    ring = simplify_ring(np.column_stack([xs, ys]), tolerance)
+                    xs, ys = ring[:, 0].tolist(), ring[:, 1].tolist()
+                new_xs.append(list(xs))
+                new_ys.append(list(ys))
+            polygons[lab] = {x_lab: new_xs, y_lab: new_ys}
+        charts.append({**chart, "polygons": polygons})
+    return charts
+
+
+def simplification_report(compiled, simplified, hits=None, outputs=None):
+    """
+    Summarizes the effect of a simplification.
+
+    Arguments:
+        compiled: the original `CompiledDrawing`
+        simplified: the simplified `CompiledDrawing`
+        hits: optionally a function that maps a `CompiledDrawing` to the hits of the training data
+        outputs: optionally a function that maps hits to the predictions that should be compared,
+          by default rows count as changed whenever any of their hits changes
+
+    Returns:
+        a dictionary with `vertices_before`, `vertices_after` and `vertices_removed`, and
+        `rows_changed` when `hits` is given
+    """
+    before, after = len(compiled.vertices), len(simplified.vertices)
+    report = {
+        "vertices_before": before,
+        "vertices_after": after,
+        "vertices_removed": before - after,
+    }
+    if hits is not None:
+        old, new = hits(compiled), hits(simplified)
+        if outputs is None:
+            changed = (old != new).any(axis=1)
+        else:
+            changed = outputs(old) != outputs(new)
+        report["rows_changed"] = int(changed.sum())
+    return report
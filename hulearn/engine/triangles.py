@@ -0,0 +1,226 @@
+import numpy as np
+from shapely.geometry.polygon import Polygon
+
+from hulearn.engine.index import BucketIndex
+
+# Relative rounding error bound of an orientation test, with a generous safety factor.
+_ERR = 64 * np.finfo(np.float64).eps
+
+
+def _cross(ax, ay, bx, by, px, py):
+    return (bx - ax) * (py - ay) - (px - ax) * (by - ay)
+
+
+def _runs(values):
+    """Yields `(start, stop)` for every run of equal values in a sorted array."""
+    bounds = np.flatnonzero(np.diff(values)) + 1
+    starts = np.r_[0, bounds] if len(values) else bounds
+    return zip(starts, np.r_[bounds, len(values)])
+
+
+def triangulate_ring(vertices):
+    """
+    Splits a simple polygon into triangles with ear clipping. Returns an integer array
+    of shape `(n_triangles, 3)` with the vertex indices of every triangle, in
+    counter-clockwise order, or `None` when the ring is not a simple polygon (or when
+    rounding errors keep ear clipping from finishing).
+
+    Arguments:
+        vertices: array of shape `(n, 2)` with the (unclosed) polygon ring
+
+    Usage:
+
+    ```python
+    import numpy as np
+    from hulearn.engine.triangles import triangulate_ring
+
+    # An L-shape with six vertices is split into four triangles.
+    ring = np.array([[0, 0], [2, 0], [2, 1], [1, 1], [1, 2], [0, 2]], dtype=float)
+    assert triangulate_ring(ring).shape == (4, 3)
+    ```
+    """
+    vertices = np.asarray(vertices, dtype=np.float64)
+    keep = np.flatnonzero((vertices != np.roll(vertices, 1, axis=0)).any(axis=1))
+    if len(keep) < 3:
+        return None
+    xs, ys = vertices[keep, 0], vertices[keep, 1]
+    area = np.dot(xs, np.roll(ys, -1)) - np.dot(ys, np.roll(xs, -1))
+    if area == 0:
+        return None
+    if area < 0:
+        keep, xs, ys = keep[::-1], xs[::-1], ys[::-1]
+
+    n = len(keep)
+    prev, nxt = np.roll(np.arange(n), 1).tolist(), np.roll(np.arange(n), -1).tolist()
+    alive = np.ones(n, dtype=bool)
+    # Python floats are much cheaper than NumPy scalars for the per-vertex tests.
+    fx, fy = xs.tolist(), ys.tolist()
+
+    def reflex(i):
+        a, c = prev[i], nxt[i]
+        return _cross(fx[a], fy[a], fx[i], fy[i], fx[c], fy[c]) < 0
+
+    def status(i):
+        # 0: not an ear, 1: an ear, 2: a collinear vertex that can be dropped.
+        a, c = prev[i], nxt[i]
+        turn = _cross(fx[a], fy[a], fx[i], fy[i], fx[c], fy[c])
+        if turn < 0:
+            return 0
+        if turn == 0:
+            forward = (fx[i] - fx[a]) * (fx[c] - fx[i]) + (fy[i] - fy[a]) * (
+                fy[c] - fy[i]
+            )
+            return 2 if forward > 0 else 0
+        # An ear may not contain (or touch) any other remaining reflex vertex.
+        if len(reflexes) > 64:
+            others = np.fromiter(reflexes, dtype=np.int64, count=len(reflexes))
+            others = others[(others != a) & (others != c)]
+            px, py = xs[others], ys[others]
+            ab = _cross(fx[a], fy[a], fx[i], fy[i], px, py) >= 0
+            bc = _cross(fx[i], fy[i], fx[c], fy[c], px, py) >= 0
+            ca = _cross(fx[c], fy[c], fx[a], fy[a], px, py) >= 0
+            inside = ab & bc & ca
+            return 0 if inside.any() else 1
+        for j in reflexes:
+            if j == a or j == c:
+                continue
+            px, py = fx[j], fy[j]
+            if _cross(fx[a], fy[a], fx[i], fy[i], px, py) < 0:
+                continue
+            if _cross(fx[i], fy[i], fx[c], fy[c], px, py) < 0:
+                continue
+            if _cross(fx[c], fy[c], fx[a], fy[a], px, py) >= 0:
+                return 0
+        return 1
+
+    reflexes = {i for i in range(n) if reflex(i)}
+    ears = [status(i) for i in range(n)]
+    triangles, remaining, misses, i, fresh = [], n, 0, 0, True
+    while remaining > 3:
+        if misses > remaining:
+            # Only the neighbours of a clipped ear are updated, which can miss an ear
+            # that was blocked by a reflex vertex elsewhere. Look again before giving up.
+            if fresh:
+                return None
+            for j in np.flatnonzero(alive).tolist():
+                ears[j] = status(j)
+            misses, fresh = 0, True
+            continue
+        if not ears[i]:
+            i, misses = nxt[i], misses + 1
+            continue
+        a, c = prev[i], nxt[i]
+        if ears[i] == 1:
+            triangles.append((a, i, c))
+        nxt[a], prev[c], alive[i] = c, a, False
+        remaining, misses, fresh = remaining - 1, 0, False
+        reflexes.discard(i)
+        for j in (a, c):
+            if reflex(j):
+                reflexes.add(j)
+            else:
+                reflexes.discard(j)
+        for j in (a, c):
+            ears[j] = status(j)
+        i = c
+    a, c = prev[i], nxt[i]
+    if _cross(fx[a], fy[a], fx[i], fy[i], fx[c], fy[c]) > 0:
+        triangles.append((a, i, c))
+    return keep[np.array(triangles, dtype=np.int64).reshape(-1, 3)]
+
+
+class TriangleMesh:
+    """
+    Triangulates all polygons that were drawn on a single column pair.
+
+    Every simple polygon is split into triangles with `triangulate_ring` when the mesh
+    is built and all triangles go into a single `BucketIndex`. Testing a point against
+    a triangle only takes three orientation tests, no matter how many vertices the
+    polygon has, and since the triangles of a polygon do not overlap a point lies in at
+    most one of them. Points that lie so close to an edge of a triangle that rounding
+    could flip the outcome are tested against the original polygon by the backend instead,
+    as are all polygons that intersect themselves and thus cannot be triangulated.
+
+    Arguments:
+        compiled: a `CompiledDrawing`
+        poly_idx: the polygons, all drawn on the same column pair, to triangulate
+    """
+
+    def __init__(self, compiled, poly_idx):
+        self.compiled = compiled
+        corners, tri_poly, exact = [], [], []
+        for i in poly_idx:
+            ring = compiled.polygon(i)
+            triangles = None
+            if len(ring) >= 3 and Polygon(ring).is_valid:
+                triangles = triangulate_ring(ring)
+            if triangles is None:
+                exact.append(i)
+                continue
+            corners.append(ring[triangles])
+            tri_poly.append(np.full(len(triangles), i, dtype=np.int64))
+        self.exact_idx = np.array(exact, dtype=np.int64)
+        corners = np.concatenate(corners) if corners else np.empty((0, 3, 2))
+        self.tri_poly = np.concatenate(tri_poly) if tri_poly else np.empty(0, np.int64)
+
+        # Per triangle and per edge: the start of the edge and its direction.
+        self.sx, self.sy = corners[:, :, 0], corners[:, :, 1]
+        self.dx = np.roll(self.sx, -1, axis=1) - self.sx
+        self.dy = np.roll(self.sy, -1, axis=1) - self.sy
+        self.index = None
+        if len(corners):
+            bounds = np.column_stack(
+                [corners.min(axis=1), corners.max(axis=1)]
+            )  # (xmin, ymin, xmax, ymax)
+            self.index = BucketIndex(bounds, np.arange(len(corners)))
+
+    @property
+    def n_triangles(self):
+        return len(self.tri_poly)
+
+    def query(self, xs, ys, exact):
+        """
+        Returns a tuple `(rows, polys)` with every combination of a point and a polygon
+        that contains it.
+
+        Arguments:
+            xs: float array with the x-coordinates of the points
+            ys: float array with the y-coordinates of the points
+            exact: a function `exact(poly_idx, xs, ys)` with the same output, it scores
+              the polygons that could not be triangulated and the points near an edge
+        """
+        rows, polys = [np.empty(0, np.int64)], [np.empty(0, np.int64)]
+        if self.index is not None:
+            # A point on an edge that two triangles share is inside neither of them,
+            # its bounds check must keep it such that it reaches the exact test below.
+            r, tris = self.index.candidates(xs, ys, inclusive=True)
+            px, py = xs[r][:, None], ys[r][:, None]
+            sx, sy, dx, dy = self.sx[tris], self.sy[tris], self.dx[tris], self.dy[tris]
+            left, right = dx * (py - sy), (px - sx) * dy
+            cross = left - right
+            bound = _ERR * (np.abs(left) + np.abs(right))
+            inside = (cross > bound).all(axis=1)
+            unsure = ~inside & (cross >= -bound).all(axis=1)
+            rows.append(r[inside])
+            polys.append(self.tri_poly[tris[inside]])
+
+            # A point near a triangle edge is tested once against the whole polygon,
+            # with the backend, such that boundary points agree with the direct mode.
+            n = len(self.compiled)
+            done = np.unique(rows[-1] * n + polys[-1])
+            todo = np.unique(r[unsure] * n + self.tri_poly[tris[unsure]])
+            todo = np.setdiff1d(todo, done, assume_unique=True)
+            r, p = todo // n, todo % n
+            order = np.argsort(p, kind="stable")
+            r, p = r[order], p[order]
+            for start, stop in _runs(p):
+                hit, _ = exact(
+                    p[start : start + 1], xs[r[start:stop]], ys[r[start:stop]]
+                )
+                rows.append(r[start:stop][hit])
+                polys.append(p[start:stop][hit])
+        if len(self.exact_idx):
+            r, p = exact(self.exact_idx, xs, ys)
+            rows.append(r)
+            polys.append(p)
+        return np.concatenate(rows), np.concatenate(polys)
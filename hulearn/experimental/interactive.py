@@ -14,12 +14,23 @@ from bokeh.layouts import row
 from bokeh.models.widgets import Div
 from bokeh.io import output_notebook
 
+from hulearn.engine.simplify import simplify_json
+
 
 def color_dot(name, color):
     dot = f"<span style='height: 15px; width: 15px; background-color: {color}; border-radius: 50%; display: inline-block;'></span>"
     return f"<p>{dot} {name}</p>"
 
 
+def _count_vertices(json_desc):
+    return sum(
+        len(xs)
+        for chart in json_desc
+        for p in chart["polygons"].values()
+        for xs in list(p.values())[0]
+    )
+
+
 class InteractiveCharts:
     """
     This tool allows you to interactively "draw" a model.
@@ -106,8 +117,29 @@ class InteractiveCharts:
     def data(self):
         return [c.data for c in self.charts]
 
-    def to_json(self, path):
-        return Clumper(self.data).write_json(path, indent=2)
+    def to_json(self, path, simplify_tolerance=None):
+        """
+        Writes the drawn polygons to a json file that the interactive estimators can load.
+
+        Arguments:
+            path: path of the json file
+            simplify_tolerance: if set, polygons are simplified with this tolerance before
+              they are written, which removes near-collinear vertices from hand-drawn shapes
+
+        Returns:
+            a dictionary with the number of vertices before and after simplification
+        """
+        data = self.data()
+        before = _count_vertices(data)
+        if simplify_tolerance:
+            data = simplify_json(data, simplify_tolerance)
+        Clumper(data).write_json(path, indent=2)
+        after = _count_vertices(data)
+        return {
+            "vertices_before": before,
+            "vertices_after": after,
+            "vertices_removed": before - after,
+        }
 
 
 class SingleInteractiveChart:
@@ -1,6 +1,13 @@
+import numpy as np
 import pandas as pd
 
 
+def _as_mask(predicate):
+    """Turns the output of a rule, e.g. a pandas, Polars or Arrow series, into a boolean array."""
+    mask = np.asarray(predicate)
+    return mask if mask.dtype == bool else mask.astype(bool)
+
+
 class CaseWhenRuler:
     """
     Helper class to construct "case when"-style FunctionClassifiers.
@@ -8,7 +15,8 @@ class CaseWhenRuler:
     This class allows you to write a system of rules using lambda functions.
     These functions cannot be pickled by scikit-learn however, so if you'd like
     to use this class in a GridSearch you will need to wrap it around a
-    FunctionClassifier.
+    FunctionClassifier. The rules receive `X` as-is, so they can be written against
+    a pandas or Polars dataframe just as well as a PyArrow table.
 
     Arguments:
         default: the default value to predict if no rules apply
@@ -85,13 +93,40 @@ class CaseWhenRuler:
         clf = FunctionClassifier(make_prediction)
         ```
         """
-        results = [self.default for x in range(len(X))]
+        results = np.full(len(X), self.default, dtype=object)
+        # Rows keep taking rules until one of them sets a value other than the default.
+        undecided = np.ones(len(X), dtype=bool)
         for rule in self.rules:
             when, then, name = rule
-            for idx, predicate in enumerate(when(X)):
-                if predicate and (results[idx] == self.default):
-                    results[idx] = then
-        return results
+            hit = undecided & _as_mask(when(X))
+            results[hit] = then
+            if then != self.default:
+                undecided &= ~hit
+        return results.tolist()
+
+    def predict_one(self, record):
+        """
+        Makes a prediction for a single record, a dictionary that maps the column names to
+        their values. The rules receive the record itself, so `d['fare'] > 100` compares
+        a plain value, and rules stop being evaluated as soon as one of them decides. The
+        result equals the prediction of `.predict(X)` for that record.
+
+        Usage:
+
+        ```python
+        from hulearn.experimental import CaseWhenRuler
+
+        ruler = (CaseWhenRuler(default=0)
+                 .add_rule(lambda d: (d['pclass'] < 3.0) & (d['sex'] == "female"), 1)
+                 .add_rule(lambda d: d['fare'] > 100, 1))
+
+        ruler.predict_one({"pclass": 1.0, "sex": "male", "fare": 120.0})
+        ```
+        """
+        for when, then, name in self.rules:
+            if then != self.default and when(record):
+                return then
+        return self.default
 
     def transform(self, X):
         """
@@ -129,5 +164,8 @@ class CaseWhenRuler:
         result = pd.DataFrame()
         for rule in self.rules:
             when, then, name = rule
-            result[name] = when(X)
+            predicate = when(X)
+            if not isinstance(predicate, pd.Series):
+                predicate = np.asarray(predicate)
+            result[name] = predicate
         return result
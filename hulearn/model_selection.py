@@ -0,0 +1,394 @@
+import time
+import warnings
+from collections.abc import Mapping
+
+import numpy as np
+from joblib import Parallel, delayed
+from scipy.stats import rankdata
+
+from sklearn.base import clone, is_classifier
+from sklearn.exceptions import FitFailedWarning
+from sklearn.metrics import check_scoring
+from sklearn.model_selection import GridSearchCV, ParameterGrid, check_cv
+from sklearn.model_selection import validation_curve as sklearn_validation_curve
+from sklearn.utils import indexable, _safe_indexing
+
+from hulearn.engine import PolygonScorer
+
+# Parameters that only change what happens *after* the polygons were counted.
+HIT_PARAMS = {
+    "InteractiveClassifier": ("smoothing",),
+    "InteractiveOutlierDetector": ("threshold",),
+}
+
+
+# Estimators whose `fit` learns nothing from the data, so that the predictions for a
+# test fold equal the predictions for all rows, sliced to that fold.
+STATELESS = ("FunctionClassifier", "FunctionRegressor", "FunctionOutlierDetector")
+
+
+def _sweepable(estimator, param_name):
+    return param_name in HIT_PARAMS.get(type(estimator).__name__, ())
+
+
+def _stateless(estimator):
+    return type(estimator).__name__ in STATELESS
+
+
+class _PrecomputedEstimator:
+    """
+    Stands in for a fitted estimator during scoring, it hands out outputs that were
+    computed up front for the rows that are being scored.
+    """
+
+    def __init__(self, estimator, outputs):
+        self.estimator = estimator
+        self.outputs = outputs
+        self._estimator_type = getattr(estimator, "_estimator_type", None)
+        if hasattr(estimator, "classes_"):
+            self.classes_ = np.asarray(estimator.classes_)
+
+    def _output(self, name, X):
+        if name not in self.outputs:
+            raise AttributeError(f"'{type(self.estimator).__name__}' has no {name}")
+        output = self.outputs[name]
+        if len(X) != len(output):
+            raise ValueError("The precomputed outputs do not match the rows of X.")
+        return output
+
+    def predict(self, X):
+        return self._output("predict", X)
+
+    def predict_proba(self, X):
+        return self._output("predict_proba", X)
+
+    def decision_function(self, X):
+        return self._output("decision_function", X)
+
+    def score_samples(self, X):
+        return self._output("score_samples", X)
+
+    def score(self, X, y, sample_weight=None):
+        return type(self.estimator).score(self, X, y, sample_weight=sample_weight)
+
+
+def validation_curve(
+    estimator,
+    X,
+    y=None,
+    *,
+    param_name,
+    param_range,
+    groups=None,
+    cv=None,
+    scoring=None,
+):
+    """
+    Drop-in replacement for `sklearn.model_selection.validation_curve` that is much faster
+    for parameters that only post-process the polygon hits, like `smoothing` on an
+    `InteractiveClassifier` or `threshold` on an `InteractiveOutlierDetector`.
+
+    Since fitting an interactive estimator does not depend on the data, the hit matrix
+    of `X` is computed once. Every fold and every candidate value is then evaluated on
+    slices of that matrix, which makes a sweep over 20 values about as expensive as a
+    single scoring pass instead of 20 of them. For any other parameter this function
+    defers to scikit-learn.
+
+    Arguments:
+        estimator: the (unfitted) estimator to evaluate
+        X: the data to score
+        y: the target, if any
+        param_name: the name of the parameter to sweep
+        param_range: the values of the parameter to try
+        groups: group labels, used by group-aware cross-validation splitters
+        cv: the cross-validation strategy, see `sklearn.model_selection.check_cv`
+        scoring: the scoring method, see `sklearn.metrics.check_scoring`
+
+    Returns:
+        a tuple `(train_scores, test_scores)` of arrays with shape `(len(param_range), n_folds)`
+
+    Usage:
+
+    ```python
+    from hulearn.classification import InteractiveClassifier
+    from hulearn.model_selection import validation_curve
+
+    clf = InteractiveClassifier(clf_data)
+    train_scores, test_scores = validation_curve(
+        clf, X, y, param_name="smoothing", param_range=[0.001, 0.01, 0.1, 1.0], scoring="neg_log_loss"
+    )
+    ```
+    """
+    if not _sweepable(estimator, param_name):
+        return sklearn_validation_curve(
+            estimator,
+            X,
+            y,
+            param_name=param_name,
+            param_range=param_range,
+            groups=groups,
+            cv=cv,
+            scoring=scoring,
+        )
+    if scoring is None and not is_classifier(estimator):
+        raise ValueError(f"Please pass `scoring` to sweep '{param_name}'.")
+    X, y, groups = indexable(X, y, groups)
+    cv = check_cv(cv, y, classifier=is_classifier(estimator))
+    scorer = check_scoring(estimator, scoring=scoring)
+
+    fitted = clone(estimator).fit(X, y)
+    hits = PolygonScorer.from_estimator(fitted).hits(X)
+    outputs = []
+    for value in param_range:
+        fitted.set_params(**{param_name: value})
+        outputs.append(fitted._outputs_from_hits(hits))
+
+    splits = list(cv.split(X, y, groups))
+    train_scores = np.zeros((len(outputs), len(splits)))
+    test_scores = np.zeros((len(outputs), len(splits)))
+    for j, (train, test) in enumerate(splits):
+        for scores, idx in [(train_scores, train), (test_scores, test)]:
+            X_part = _safe_indexing(X, idx)
+            y_part = None if y is None else _safe_indexing(y, idx)
+            for i, out in enumerate(outputs):
+                proxy = _PrecomputedEstimator(
+                    fitted, {k: v[idx] for k, v in out.items()}
+                )
+                scores[i, j] = scorer(proxy, X_part, y_part)
+    return train_scores, test_scores
+
+
+class _SlicedOutputs(Mapping):
+    """
+    The outputs of a fitted estimator for the rows `idx` of `X`. Every method is only
+    called once on all of `X`, the slices of the folds share that result.
+    """
+
+    METHODS = ("predict", "predict_proba", "decision_function", "score_samples")
+
+    def __init__(self, estimator, X, idx=None, cache=None):
+        self.estimator = estimator
+        self.X = X
+        self.idx = idx
+        self.cache = {} if cache is None else cache
+
+    def take(self, idx):
+        return _SlicedOutputs(self.estimator, self.X, idx, self.cache)
+
+    def __getitem__(self, name):
+        if name not in self:
+            raise KeyError(name)
+        if name not in self.cache:
+            self.cache[name] = getattr(self.estimator, name)(self.X)
+        return _safe_indexing(self.cache[name], self.idx)
+
+    def __contains__(self, name):
+        return name in self.METHODS and hasattr(self.estimator, name)
+
+    def __iter__(self):
+        return (name for name in self.METHODS if name in self)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+def _evaluate_candidate(estimator, params, X, y, splits, scorers, error_score, train):
+    """
+    Fits one candidate on all rows and scores every fold on slices of its outputs.
+    Returns the scores per metric, with shape `(n_splits,)`, and the timings.
+    """
+    sets = ["test", "train"] if train else ["test"]
+    scores = {f"{s}_{n}": np.zeros(len(splits)) for s in sets for n in scorers}
+    score_times = np.zeros(len(splits))
+    tic = time.perf_counter()
+    try:
+        # Predicting on all rows below runs the function anyway, no need to check it here.
+        fitted = clone(estimator).set_params(**params).set_params(fit_check="none")
+        fitted.fit(X, y)
+        fit_time = time.perf_counter() - tic
+        outputs = _SlicedOutputs(fitted, X)
+        for j, (train_idx, test_idx) in enumerate(splits):
+            tic = time.perf_counter()
+            for s, idx in zip(sets, [test_idx, train_idx]):
+                X_part = _safe_indexing(X, idx)
+                y_part = None if y is None else _safe_indexing(y, idx)
+                proxy = _PrecomputedEstimator(fitted, outputs.take(idx))
+                for name, scorer in scorers.items():
+                    scores[f"{s}_{name}"][j] = scorer(proxy, X_part, y_part)
+            score_times[j] = time.perf_counter() - tic
+    except Exception as e:
+        if error_score == "raise":
+            raise
+        warnings.warn(
+            f"Scoring failed for {params}, the score on all folds is set to "
+            f"{error_score}. Details: {type(e).__name__}: {e}",
+            FitFailedWarning,
+        )
+        for arr in scores.values():
+            arr[:] = error_score
+        fit_time = time.perf_counter() - tic
+    # The single fit and the single pass over all rows are shared by all folds.
+    fit_times = np.full(len(splits), fit_time / len(splits))
+    return scores, fit_times, score_times
+
+
+def _rank(means):
+    """Ranks the mean scores like scikit-learn, where a `nan` score ranks last."""
+    if np.isnan(means).all():
+        return np.ones_like(means, dtype=np.int32)
+    means = np.nan_to_num(means, nan=np.nanmin(means) - 1)
+    return rankdata(-means, method="min").astype(np.int32)
+
+
+def _cv_results(candidates, evaluated, n_splits, names, train):
+    """Formats the evaluated candidates into the `cv_results_` of scikit-learn."""
+    results = {}
+    for key, idx in [("fit_time", 1), ("score_time", 2)]:
+        times = np.array([out[idx] for out in evaluated])
+        results[f"mean_{key}"] = times.mean(axis=1)
+        results[f"std_{key}"] = times.std(axis=1)
+    for param in sorted({p for params in candidates for p in params}):
+        column = np.ma.MaskedArray(np.empty(len(candidates), dtype=object), mask=True)
+        for i, params in enumerate(candidates):
+            if param in params:
+                column[i] = params[param]
+        results[f"param_{param}"] = column
+    results["params"] = candidates
+    for s in ["test", "train"] if train else ["test"]:
+        for name in names:
+            scores = np.array([out[0][f"{s}_{name}"] for out in evaluated])
+            for j in range(n_splits):
+                results[f"split{j}_{s}_{name}"] = scores[:, j]
+            results[f"mean_{s}_{name}"] = scores.mean(axis=1)
+            results[f"std_{s}_{name}"] = scores.std(axis=1)
+            if s == "test":
+                results[f"rank_test_{name}"] = _rank(results[f"mean_test_{name}"])
+    return results
+
+
+class HumanGridSearchCV(GridSearchCV):
+    """
+    Drop-in replacement for `sklearn.model_selection.GridSearchCV` that is much faster
+    for the function based estimators, `FunctionClassifier`, `FunctionRegressor` and
+    `FunctionOutlierDetector`.
+
+    These estimators learn nothing in `fit`, so the predictions on a test fold equal the
+    predictions on all of `X`, sliced to that fold. Every candidate is therefore fitted
+    and predicted once on all rows, after which every fold is scored on slices of those
+    predictions. With 5 folds the function runs once per candidate instead of 10 times.
+    This assumes that the function predicts every row on its own, which holds for
+    typical rules like `dataf["fare"] > limit`. For any other estimator, or when
+    `fit_params` are passed, the search defers to scikit-learn.
+
+    The fitted search has the same attributes as `GridSearchCV`, like `cv_results_`,
+    `best_params_` and `best_estimator_`. The `mean_fit_time` is the time of the single
+    fit spread over the folds and the first fold's `score_time` includes the prediction
+    on all rows.
+
+    Arguments:
+        estimator: the (unfitted) estimator to evaluate
+        param_grid: the parameters to try, see `sklearn.model_selection.ParameterGrid`
+        scoring: a scoring method, a list or a dictionary of them, see `GridSearchCV`
+        n_jobs: the number of candidates that are evaluated in parallel
+        refit: refit the best candidate on all rows, the name of a metric to select it with, or a callable
+        cv: the cross-validation strategy, see `sklearn.model_selection.check_cv`
+        verbose: the verbosity of the search
+        pre_dispatch: the number of candidates that are dispatched to the workers up front
+        error_score: the score of a candidate whose function raises, `"raise"` raises the error instead
+        return_train_score: also store the scores on the train folds in `cv_results_`
+
+    Usage:
+
+    ```python
+    import numpy as np
+    from hulearn.datasets import load_titanic
+    from hulearn.classification import FunctionClassifier
+    from hulearn.model_selection import HumanGridSearchCV
+
+    def class_based(dataf, sex="male", pclass=1):
+        predicate = (dataf["sex"] == sex) & (dataf["pclass"] == pclass)
+        return np.array(predicate).astype(int)
+
+    df = load_titanic(as_frame=True)
+    X, y = df.drop(columns=["survived"]), df["survived"]
+
+    mod = FunctionClassifier(class_based)
+    params = {"pclass": [1, 2, 3], "sex": ["male", "female"]}
+    grid = HumanGridSearchCV(mod, cv=5, param_grid=params).fit(X, y)
+    assert set(grid.best_params_) == {"pclass", "sex"}
+    ```
+    """
+
+    def fit(self, X, y=None, *, groups=None, **fit_params):
+        """
+        Runs the search over `param_grid`.
+
+        Arguments:
+            X: the data to search on
+            y: the target, if any
+            groups: group labels, used by group-aware cross-validation splitters
+            fit_params: parameters for `fit`, the search defers to scikit-learn with these
+        """
+        if not _stateless(self.estimator) or fit_params:
+            return super().fit(X, y, groups=groups, **fit_params)
+        X, y, groups = indexable(X, y, groups)
+        cv = check_cv(self.cv, y, classifier=is_classifier(self.estimator))
+        splits = list(cv.split(X, y, groups))
+        scorers, self.multimetric_ = self._human_scorers()
+        refit_metric = self.refit if self.multimetric_ else "score"
+        if self.multimetric_ and not callable(self.refit):
+            if self.refit is not False and self.refit not in scorers:
+                raise ValueError(
+                    f"For multi-metric scoring, `refit` must be one of {list(scorers)}, "
+                    f"a callable or False, got '{self.refit}'."
+                )
+
+        candidates = list(ParameterGrid(self.param_grid))
+        evaluated = Parallel(n_jobs=self.n_jobs, pre_dispatch=self.pre_dispatch)(
+            delayed(_evaluate_candidate)(
+                self.estimator,
+                params,
+                X,
+                y,
+                splits,
+                scorers,
+                self.error_score,
+                self.return_train_score,
+            )
+            for params in candidates
+        )
+        results = _cv_results(
+            candidates, evaluated, len(splits), scorers, self.return_train_score
+        )
+
+        if self.refit or not self.multimetric_:
+            if callable(self.refit):
+                self.best_index_ = self.refit(results)
+            else:
+                self.best_index_ = results[f"rank_test_{refit_metric}"].argmin()
+                self.best_score_ = results[f"mean_test_{refit_metric}"][
+                    self.best_index_
+                ]
+            self.best_params_ = results["params"][self.best_index_]
+        if self.refit:
+            self.best_estimator_ = clone(self.estimator).set_params(**self.best_params_)
+            tic = time.perf_counter()
+            self.best_estimator_.fit(X, y)
+            self.refit_time_ = time.perf_counter() - tic
+        self.scorer_ = scorers if self.multimetric_ else scorers["score"]
+        self.cv_results_ = results
+        self.n_splits_ = len(splits)
+        return self
+
+    def _human_scorers(self):
+        """The scorers by name and whether there are several metrics."""
+        if self.scoring is None or isinstance(self.scoring, str):
+            return {"score": check_scoring(self.estimator, self.scoring)}, False
+        if callable(self.scoring):
+            return {"score": self.scoring}, False
+        if isinstance(self.scoring, dict):
+            scoring = self.scoring
+        else:
+            scoring = {name: name for name in self.scoring}
+        scorers = {n: check_scoring(self.estimator, s) for n, s in scoring.items()}
+        return scorers, True
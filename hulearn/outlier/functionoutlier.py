@@ -1,6 +1,9 @@
+import numpy as np
 from sklearn.base import BaseEstimator, OutlierMixin
 from sklearn.utils.validation import check_is_fitted
 
+from hulearn.common import check_function
+
 
 class FunctionOutlierDetector(BaseEstimator, OutlierMixin):
     """
@@ -9,13 +12,19 @@ class FunctionOutlierDetector(BaseEstimator, OutlierMixin):
 
     Arguments:
         func: the function that return an array of True/False
+        score_func: an optional function that returns a continuous score per row, higher is more normal and negative means outlier
+        fit_check: check `func` on `"full"` data, a `"sample"` or `"none"`, `None` is `"full"` in `fit` and `"sample"` in `partial_fit`, not passed to `func`
         kwargs: extra keyword arguments will be pass to the function, can be grid-search-able
 
     The functions that are passed need to be pickle-able. That means no lambda functions!
+    The data is passed to the function as-is, without converting e.g. a Polars dataframe
+    or a PyArrow table to pandas first.
     """
 
-    def __init__(self, func, **kwargs):
+    def __init__(self, func, score_func=None, fit_check=None, **kwargs):
         self.func = func
+        self.score_func = score_func
+        self.fit_check = fit_check
         self.kwargs = kwargs
 
     def fit(self, X, y=None):
@@ -23,17 +32,19 @@ class FunctionOutlierDetector(BaseEstimator, OutlierMixin):
         Fit the classifier. No-Op.
         """
         # Run it to confirm no error happened.
-        _ = self.func(X, **self.kwargs)
+        check_function(self.func, X, self.kwargs, self.fit_check or "full")
         self.fitted_ = True
+        self.offset_ = 0.0
         return self
 
     def partial_fit(self, X, y=None):
         """
         Fit the classifier partially. No-Op.
         """
-        # Run it to confirm no error happened.
-        _ = self.func(X, **self.kwargs)
+        # Streams arrive in many chunks, so by default only a sample of each is checked.
+        check_function(self.func, X, self.kwargs, self.fit_check or "sample")
         self.fitted_ = True
+        self.offset_ = 0.0
         self.ncol_ = 0 if len(X.shape) == 1 else X.shape[1]
         return self
 
@@ -44,15 +55,63 @@ class FunctionOutlierDetector(BaseEstimator, OutlierMixin):
         check_is_fitted(self, ["fitted_"])
         return self.func(X, **self.kwargs)
 
+    def score_samples(self, X):
+        """
+        Scores every row with `score_func`, which receives the same keyword arguments as
+        `func`, in a single call. Higher scores are more normal. Without a `score_func`
+        the predictions of `func` are used as scores, where a boolean prediction scores
+        -1 for `True`, the outliers, and 1 otherwise.
+
+        Usage:
+
+        ```python
+        import numpy as np
+        from hulearn.outlier import FunctionOutlierDetector
+
+        def too_far(X, limit=2.0):
+            return np.where(np.abs(X[:, 0]) > limit, -1, 1)
+
+        def margin(X, limit=2.0):
+            return limit - np.abs(X[:, 0])
+
+        X = np.array([[0.5], [1.5], [3.0]])
+        mod = FunctionOutlierDetector(too_far, score_func=margin).fit(X)
+        assert mod.score_samples(X).tolist() == [1.5, 0.5, -1.0]
+        ```
+        """
+        check_is_fitted(self, ["fitted_"])
+        if self.score_func is None:
+            out = np.asarray(self.func(X, **self.kwargs))
+            if out.dtype == bool:
+                return np.where(out, -1.0, 1.0)
+            return out.astype(float)
+        return np.asarray(self.score_func(X, **self.kwargs), dtype=float)
+
+    def decision_function(self, X):
+        """
+        The `score_samples(X)` minus `offset_`, which is zero because a `score_func` is
+        expected to be negative for outliers, as are the scores derived from `func`.
+        """
+        return self.score_samples(X) - self.offset_
+
     def get_params(self, deep=True):
         """ """
-        return {**self.kwargs, "func": self.func}
+        return {
+            **self.kwargs,
+            "func": self.func,
+            "score_func": self.score_func,
+            "fit_check": self.fit_check,
+        }
 
     def set_params(self, **params):
         """ """
         for k, v in params.items():
             if k == "func":
                 self.func = v
+            elif k == "score_func":
+                self.score_func = v
+            elif k == "fit_check":
+                self.fit_check = v
             else:
                 self.kwargs[k] = v
         return self
@@ -2,21 +2,31 @@ import json
 import pathlib
 
 import numpy as np
-import pandas as pd
-from shapely.geometry import Point
-from shapely.geometry.polygon import Polygon
 
 from sklearn.base import BaseEstimator, OutlierMixin
+from sklearn.utils.validation import check_is_fitted
 
+from hulearn.engine import PolygonScorer
+from hulearn.engine.estimator import DrawnEstimatorMixin
+from hulearn.engine.record import RecordScorer
 
-class InteractiveOutlierDetector(BaseEstimator, OutlierMixin):
+
+class InteractiveOutlierDetector(DrawnEstimatorMixin, BaseEstimator, OutlierMixin):
     """
     This tool allows you to take a drawn model and use it as an outlier detector. If a datapoint
     does not fit in any of the drawn polygons it becomes a candidate to become an outlier.
 
     Arguments:
-        json_desc: python dictionary that contains drawn data
+        json_desc: python dictionary that contains drawn data, or a `CompiledDrawing`
         threshold: the minimum number of polygons a point needs to be in to not be considered an outlier
+        backend: the point-in-polygon backend to score with, `"auto"`, `"numpy"`, `"shapely"` or `"numba"`
+        mode: the scoring strategy, `"direct"` tests each polygon, `"grid"` uses a lookup grid, `"partition"` overlays them, `"triangles"` triangulates them
+        grid_size: the number of cells along each axis of the lookup grid when `mode="grid"`
+        batch_size: score `X` in chunks of this many rows to bound the memory usage, `None` scores all rows at once
+        n_jobs: the number of workers that score chunks of rows in parallel, `-1` uses all cores
+        prefer: score on `"threads"` (Shapely and NumPy release the GIL) or on `"processes"`
+        cache: a `HitCache`, such that repeated calls on the same data only score it once
+        simplify_tolerance: if set, polygons are simplified with this tolerance when the model is fitted, see `simplify_report_`
 
     Usage:
 
@@ -49,18 +59,39 @@ class InteractiveOutlierDetector(BaseEstimator, OutlierMixin):
     ```
     """
 
-    def __init__(self, json_desc, threshold=1):
+    def __init__(
+        self,
+        json_desc,
+        threshold=1,
+        backend="auto",
+        mode="direct",
+        grid_size=256,
+        batch_size=None,
+        n_jobs=None,
+        prefer="threads",
+        cache=None,
+        simplify_tolerance=None,
+    ):
         self.json_desc = json_desc
         self.threshold = threshold
+        self.backend = backend
+        self.mode = mode
+        self.grid_size = grid_size
+        self.batch_size = batch_size
+        self.n_jobs = n_jobs
+        self.prefer = prefer
+        self.cache = cache
+        self.simplify_tolerance = simplify_tolerance
 
     @classmethod
-    def from_json(cls, path, threshold=1):
+    def from_json(cls, path, threshold=1, **kwargs):
         """
         Load the classifier from json stored on disk.
 
         Arguments:
             path: path of the json file
             threshold: the minimum number of polygons a point needs to be in to not be considered an outlier
+            kwargs: other arguments, like `backend` or `mode`, are passed to the constructor
 
         Usage:
 
@@ -71,55 +102,24 @@ class InteractiveOutlierDetector(BaseEstimator, OutlierMixin):
         ```
         """
         json_desc = json.loads(pathlib.Path(path).read_text())
-        return InteractiveOutlierDetector(json_desc=json_desc, threshold=threshold)
-
-    @property
-    def poly_data(self):
-        for chart in self.json_desc:
-            chard_id = chart["chart_id"]
-            labels = chart["polygons"].keys()
-            coords = chart["polygons"].values()
-            for lab, p in zip(labels, coords):
-                x_lab, y_lab = p.keys()
-                x_coords, y_coords = list(p.values())
-                for i in range(len(x_coords)):
-                    poly_data = list(zip(x_coords[i], y_coords[i]))
-                    if len(poly_data) >= 3:
-                        poly = Polygon(poly_data)
-                        yield {
-                            "x_lab": x_lab,
-                            "y_lab": y_lab,
-                            "poly": poly,
-                            "label": lab,
-                            "chart_id": chard_id,
-                        }
-
-    def _count_hits(self, clf_data, data_in):
-        counts = {k: 0 for k in self.classes_}
-        for c in clf_data:
-            point = Point(data_in[c["x_lab"]], data_in[c["y_lab"]])
-            if c["poly"].contains(point):
-                counts[c["label"]] += 1
-        return counts
+        return InteractiveOutlierDetector(
+            json_desc=json_desc, threshold=threshold, **kwargs
+        )
 
     def fit(self, X, y=None):
         """
-        Fit the classifier. Bit of a formality, it's not doing anything specifically.
+        Fit the outlier detector, which compiles the drawn polygons once for all later
+        calls to `.predict(X)`.
         """
-        self.classes_ = list(self.json_desc[0]["polygons"].keys())
+        self._compile(X)
         return self
 
     def score(self, X):
-        if isinstance(X, pd.DataFrame):
-            hits = [
-                self._count_hits(self.poly_data, x[1].to_dict()) for x in X.iterrows()
-            ]
-        else:
-            hits = [
-                self._count_hits(self.poly_data, {k: v for k, v in enumerate(x)})
-                for x in X
-            ]
-        return np.array([[h[c] for c in self.classes_] for h in hits])
+        """
+        Counts, for each label, how many drawn polygons contain each item in `X`.
+        """
+        check_is_fitted(self, ["classes_", "compiled_"])
+        return PolygonScorer.from_estimator(self).hits(X)
 
     def predict(self, X):
         """
@@ -140,5 +140,66 @@ class InteractiveOutlierDetector(BaseEstimator, OutlierMixin):
         clf.predict_proba(X)
         ```
         """
-        count_arr = self.score(X)
-        return np.where(count_arr.sum(axis=1) < self.threshold, -1, 1)
+        # Only whether a row reaches the threshold matters, not how many polygons contain it.
+        check_is_fitted(self, ["classes_", "compiled_"])
+        scorer = PolygonScorer.from_estimator(self)
+        return np.where(scorer.reaches(X, self.threshold), 1, -1)
+
+    def score_samples(self, X):
+        """
+        A continuous score for every item in `X`, where a higher score means more normal,
+        such that the detector can be used with e.g. ROC curves. It is the number of
+        polygons that contain the item, plus half the `tanh` of its signed distance to the
+        nearest polygon boundary (see `PolygonScorer.signed_distances`). Items in equally
+        many polygons are thus ranked on how deep inside, or how far outside, they lie.
+
+        Usage:
+
+        ```python
+        from sklearn.metrics import roc_auc_score
+        from hulearn.outlier import InteractiveOutlierDetector
+        clf = InteractiveOutlierDetector(clf_data).fit(X)
+
+        roc_auc_score(y_inlier, clf.score_samples(X))
+        ```
+        """
+        check_is_fitted(self, ["classes_", "compiled_"])
+        scorer = PolygonScorer.from_estimator(self)
+        dist, counts = scorer.signed_distances(X, return_counts=True)
+        return counts + np.tanh(dist) / 2
+
+    @property
+    def offset_(self):
+        """The offset between `score_samples` and `decision_function`, it follows `threshold`."""
+        return self.threshold - 0.5
+
+    def decision_function(self, X):
+        """
+        The `score_samples` of every item in `X` minus `offset_`, such that outliers get a
+        negative value: `.predict(X)` is `-1` exactly where this is negative.
+        """
+        return self.score_samples(X) - self.offset_
+
+    def predict_one(self, record):
+        """
+        Predicts whether a single record, a dictionary that maps the column names to their
+        values, is an outlier (`-1`) or not (`1`). The record is scored against the compiled
+        polygons without building a dataframe and the result equals that of `.predict(X)`.
+
+        Usage:
+
+        ```python
+        from hulearn.outlier import InteractiveOutlierDetector
+        clf = InteractiveOutlierDetector(clf_data).fit(X, y)
+
+        clf.predict_one({"bill_length_mm": 39.1, "bill_depth_mm": 18.7})
+        ```
+        """
+        if not hasattr(self, "compiled_"):
+            check_is_fitted(self, ["classes_", "compiled_"])
+        counts = RecordScorer.for_drawing(self.compiled_, self.backend).hits(record)
+        return -1 if sum(counts) < self.threshold else 1
+
+    def _outputs_from_hits(self, count_arr):
+        """The outputs for a hit matrix, used to sweep `threshold` without rescoring."""
+        return {"predict": np.where(count_arr.sum(axis=1) < self.threshold, -1, 1)}
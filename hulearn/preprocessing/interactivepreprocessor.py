@@ -3,34 +3,69 @@ import pathlib
 
 import numpy as np
 import pandas as pd
-from shapely.geometry import Point
-from shapely.geometry.polygon import Polygon
+from scipy import sparse
 
 from sklearn.base import BaseEstimator
 from sklearn.utils.validation import check_is_fitted
 
+from hulearn.engine import PolygonScorer
+from hulearn.engine.estimator import DrawnEstimatorMixin
+from hulearn.engine.record import RecordScorer
 
-class InteractivePreprocessor(BaseEstimator):
+
+class InteractivePreprocessor(DrawnEstimatorMixin, BaseEstimator):
     """
     This tool allows you to take a drawn model and use it as a featurizer.
 
     Arguments:
-        json_desc: chart da ta in dictionary form
+        json_desc: chart data in dictionary form, or a `CompiledDrawing`
         refit: if `True`, you no longer need to call `.fit(X, y)` in order to `.predict(X)`
+        backend: the point-in-polygon backend to score with, `"auto"`, `"numpy"`, `"shapely"` or `"numba"`
+        mode: the scoring strategy, `"direct"` tests each polygon, `"grid"` uses a lookup grid, `"partition"` overlays them, `"triangles"` triangulates them
+        grid_size: the number of cells along each axis of the lookup grid when `mode="grid"`
+        batch_size: score `X` in chunks of this many rows to bound the memory usage, `None` scores all rows at once
+        n_jobs: the number of workers that score chunks of rows in parallel, `-1` uses all cores
+        prefer: score on `"threads"` (Shapely and NumPy release the GIL) or on `"processes"`
+        cache: a `HitCache`, such that repeated calls on the same data only score it once
+        output: `"labels"` counts the polygons per label, `"polygons"` returns a sparse indicator column per polygon
+        simplify_tolerance: if set, polygons are simplified with this tolerance when the model is fitted, see `simplify_report_`
     """
 
-    def __init__(self, json_desc, refit=True):
+    def __init__(
+        self,
+        json_desc,
+        refit=True,
+        backend="auto",
+        mode="direct",
+        grid_size=256,
+        batch_size=None,
+        n_jobs=None,
+        prefer="threads",
+        cache=None,
+        output="labels",
+        simplify_tolerance=None,
+    ):
         self.json_desc = json_desc
         self.refit = refit
+        self.backend = backend
+        self.mode = mode
+        self.grid_size = grid_size
+        self.batch_size = batch_size
+        self.n_jobs = n_jobs
+        self.prefer = prefer
+        self.cache = cache
+        self.output = output
+        self.simplify_tolerance = simplify_tolerance
 
     @classmethod
-    def from_json(cls, path, refit=True):
+    def from_json(cls, path, refit=True, **kwargs):
         """
         Load the classifier from json stored on disk.
 
         Arguments:
             path: path of the json file
             refit: if `True`, you no longer need to call `.fit(X, y)` in order to `.predict(X)`
+            kwargs: other arguments, like `backend` or `mode`, are passed to the constructor
 
         Usage:
 
@@ -41,42 +76,14 @@ class InteractivePreprocessor(BaseEstimator):
         ```
         """
         json_desc = json.loads(pathlib.Path(path).read_text())
-        return InteractivePreprocessor(json_desc=json_desc, refit=refit)
-
-    @property
-    def poly_data(self):
-        for chart in self.json_desc:
-            chard_id = chart["chart_id"]
-            labels = chart["polygons"].keys()
-            coords = chart["polygons"].values()
-            for lab, p in zip(labels, coords):
-                x_lab, y_lab = p.keys()
-                x_coords, y_coords = list(p.values())
-                for i in range(len(x_coords)):
-                    poly_data = list(zip(x_coords[i], y_coords[i]))
-                    if len(poly_data) >= 3:
-                        poly = Polygon(poly_data)
-                        yield {
-                            "x_lab": x_lab,
-                            "y_lab": y_lab,
-                            "poly": poly,
-                            "label": lab,
-                            "chart_id": chard_id,
-                        }
-
-    def _count_hits(self, clf_data, data_in):
-        counts = {k: 0 for k in self.classes_}
-        for c in clf_data:
-            point = Point(data_in[c["x_lab"]], data_in[c["y_lab"]])
-            if c["poly"].contains(point):
-                counts[c["label"]] += 1
-        return counts
+        return InteractivePreprocessor(json_desc=json_desc, refit=refit, **kwargs)
 
     def fit(self, X, y=None):
         """
-        Fit the classifier. Bit of a formality, it's not doing anything specifically.
+        Fit the preprocessor by compiling the drawn polygons, `X` is only used for the
+        `simplify_report_`.
         """
-        self.classes_ = list(self.json_desc[0]["polygons"].keys())
+        self._compile(X)
         self.fitted_ = True
         return self
 
@@ -101,22 +108,90 @@ class InteractivePreprocessor(BaseEstimator):
         # Because we're not doing anything during training, for convenience this
         # method can formally "fit" during the predict call. This is a scikit-learn
         # anti-pattern so we allow you to turn this off.
-        if self.refit:
-            if not self.fitted_:
-                self.fit(X)
-        check_is_fitted(self, ["classes_", "fitted_"])
-        if isinstance(X, pd.DataFrame):
-            hits = [
-                self._count_hits(self.poly_data, x[1].to_dict()) for x in X.iterrows()
-            ]
-        else:
-            hits = [
-                self._count_hits(self.poly_data, {k: v for k, v in enumerate(x)})
-                for x in X
-            ]
-        count_arr = np.array([[h[c] for c in self.classes_] for h in hits])
+        if self.refit and not hasattr(self, "compiled_"):
+            self.fit(X)
+        check_is_fitted(self, ["classes_", "compiled_"])
+        scorer = PolygonScorer.from_estimator(self)
+        if self._check_output() == "polygons":
+            return scorer.memberships(X)
+        count_arr = scorer.hits(X)
         return count_arr
 
+    def transform_one(self, record):
+        """
+        Same as `.transform(X)` for a single record, a dictionary that maps the column names
+        to their values, without building a dataframe. It returns the counts per label, or
+        with `output="polygons"` a dense indicator per polygon.
+
+        Usage:
+
+        ```python
+        from hulearn.preprocessing import InteractivePreprocessor
+        tfm = InteractivePreprocessor(clf_data).fit(X)
+
+        tfm.transform_one({"bill_length_mm": 39.1, "bill_depth_mm": 18.7})
+        ```
+        """
+        if not hasattr(self, "compiled_"):
+            if self.refit:
+                self.fit(None)
+            check_is_fitted(self, ["classes_", "compiled_"])
+        scorer = RecordScorer.for_drawing(self.compiled_, self.backend)
+        if self._check_output() == "labels":
+            return np.array(scorer.hits(record), dtype=np.int64)
+        out = np.zeros(len(self.compiled_), dtype=np.int64)
+        out[scorer.polygons(record)] = 1
+        return out
+
+    def transform_iter(self, X):
+        """
+        Same as `.transform(X)`, but yields the counts in chunks of `batch_size` rows
+        such that the output of very large datasets never has to fit in memory at once.
+
+        Usage:
+
+        ```python
+        from hulearn.preprocessing import InteractivePreprocessor
+        tfm = InteractivePreprocessor(clf_data, batch_size=100_000)
+
+        for chunk in tfm.transform_iter(X):
+            store(chunk)
+        ```
+        """
+        if self.refit and not hasattr(self, "compiled_"):
+            self.fit(X)
+        check_is_fitted(self, ["classes_", "compiled_"])
+        scorer = PolygonScorer.from_estimator(self)
+        if self._check_output() == "polygons":
+            batches = scorer.membership_batches(X)
+        else:
+            batches = scorer.batches(X)
+        for _, count_arr in batches:
+            yield count_arr
+
+    def _check_output(self):
+        if self.output not in ("labels", "polygons"):
+            raise ValueError(
+                f"Unknown output '{self.output}', choose from ['labels', 'polygons']."
+            )
+        return self.output
+
+    def get_feature_names_out(self, input_features=None):
+        """
+        Returns the names of the generated features. With `output="labels"` these are the
+        labels, with `output="polygons"` every polygon is named `<chart_id>_<label>_<n>`,
+        where `n` counts the polygons of that label on that chart.
+        """
+        check_is_fitted(self, ["classes_", "compiled_"])
+        if self._check_output() == "labels":
+            return np.array(self.classes_, dtype=object)
+        compiled, seen, names = self.compiled_, {}, []
+        for chart_id, label in zip(compiled.chart_ids, compiled.labels):
+            key = (chart_id, compiled.classes[label])
+            names.append(f"{chart_id}_{key[1]}_{seen.get(key, 0)}")
+            seen[key] = seen.get(key, 0) + 1
+        return np.array(names, dtype=object)
+
     def pandas_pipe(self, dataf):
         """
         Use this transformer as part of a `.pipe()` method chain in pandas.
@@ -138,9 +213,12 @@ class InteractivePreprocessor(BaseEstimator):
         df.pipe(pandas_pipe)
         ```
         """
-        new_dataf = pd.DataFrame(
-            self.fit(dataf).transform(dataf), columns=self.classes_
-        )
+        features = self.fit(dataf).transform(dataf)
+        columns = self.get_feature_names_out()
+        if sparse.issparse(features):
+            new_dataf = pd.DataFrame.sparse.from_spmatrix(features, columns=columns)
+        else:
+            new_dataf = pd.DataFrame(features, columns=columns)
         return pd.concat(
             [dataf.copy().reset_index(drop=True), new_dataf.reset_index(drop=True)],
             axis=1,
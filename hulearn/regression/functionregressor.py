@@ -1,6 +1,8 @@
 from sklearn.base import BaseEstimator, RegressorMixin
 from sklearn.utils.validation import check_is_fitted
 
+from hulearn.common import check_function
+
 
 class FunctionRegressor(BaseEstimator, RegressorMixin):
     """
@@ -8,13 +10,17 @@ class FunctionRegressor(BaseEstimator, RegressorMixin):
 
     Arguments:
         func: the function that can make predictions
+        fit_check: check `func` on `"full"` data, a `"sample"` or `"none"`, `None` is `"full"` in `fit` and `"sample"` in `partial_fit`, not passed to `func`
         kwargs: extra keyword arguments will be pass to the function, can be grid-search-able
 
     The functions that are passed need to be pickle-able. That means no lambda functions!
+    The data is passed to the function as-is, without converting e.g. a Polars dataframe
+    or a PyArrow table to pandas first.
     """
 
-    def __init__(self, func, **kwargs):
+    def __init__(self, func, fit_check=None, **kwargs):
         self.func = func
+        self.fit_check = fit_check
         self.kwargs = kwargs
 
     def fit(self, X, y):
@@ -22,7 +28,7 @@ class FunctionRegressor(BaseEstimator, RegressorMixin):
         Fit the classifier. No-Op.
         """
         # Run it to confirm no error happened.
-        _ = self.func(X, **self.kwargs)
+        check_function(self.func, X, self.kwargs, self.fit_check or "full")
         self.fitted_ = True
         return self
 
@@ -30,8 +36,8 @@ class FunctionRegressor(BaseEstimator, RegressorMixin):
         """
         Fit the classifier partially. No-Op.
         """
-        # Run it to confirm no error happened.
-        _ = self.func(X, **self.kwargs)
+        # Streams arrive in many chunks, so by default only a sample of each is checked.
+        check_function(self.func, X, self.kwargs, self.fit_check or "sample")
         self.fitted_ = True
         return self
 
@@ -44,13 +50,15 @@ class FunctionRegressor(BaseEstimator, RegressorMixin):
 
     def get_params(self, deep=True):
         """ """
-        return {**self.kwargs, "func": self.func}
+        return {**self.kwargs, "func": self.func, "fit_check": self.fit_check}
 
     def set_params(self, **params):
         """ """
         for k, v in params.items():
             if k == "func":
                 self.func = v
+            elif k == "fit_check":
+                self.fit_check = v
             else:
                 self.kwargs[k] = v
         return self
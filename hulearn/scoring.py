@@ -0,0 +1,237 @@
+import pathlib
+import pickle
+import time
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from hulearn.classification import InteractiveClassifier
+from hulearn.engine import compile_drawing
+from hulearn.engine.binary import MAGIC
+from hulearn.engine.parallel import PREFER, effective_n_jobs, parallel_map
+from hulearn.outlier import InteractiveOutlierDetector
+from hulearn.preprocessing import InteractivePreprocessor
+
+PARQUET = (".parquet", ".pq")
+DRAWN = (InteractiveClassifier, InteractiveOutlierDetector, InteractivePreprocessor)
+
+
+def load_model(path):
+    """
+    Loads a model to score with. A drawn model, stored as json or in the binary format
+    of `save_drawing`, becomes an `InteractiveClassifier`. Any other file is unpickled,
+    e.g. a `FunctionClassifier` or a pipeline with an `InteractiveClassifier`.
+
+    Arguments:
+        path: path of the model file
+    """
+    path = pathlib.Path(path)
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) == MAGIC:
+            return InteractiveClassifier.from_binary(path)
+    if path.suffix.lower() == ".json":
+        return InteractiveClassifier.from_json(path)
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def prepare_model(model):
+    """
+    Loads the model when it is a path and fits a drawn model that was not fitted yet,
+    such that it is fitted once up front instead of once per batch (or per worker).
+    """
+    if isinstance(model, (str, pathlib.Path)):
+        model = load_model(model)
+    if isinstance(model, DRAWN) and not hasattr(model, "compiled_"):
+        model.fit(None, None)
+    return model
+
+
+def drawn_columns(model):
+    """
+    Returns the columns that a drawn model reads, or `None` when the model is not drawn
+    and thus needs every column.
+    """
+    if not isinstance(model, DRAWN):
+        return None
+    if hasattr(model, "compiled_"):
+        compiled = model.compiled_
+    else:
+        compiled = compile_drawing(model.json_desc)
+    keys = list(dict.fromkeys(k for pair in compiled.pairs for k in pair))
+    return keys if all(isinstance(k, str) for k in keys) else None
+
+
+def iter_batches(path, batch_size, columns=None):
+    """
+    Reads a csv or parquet file in batches of at most `batch_size` rows, such that the
+    file never has to fit in memory. With PyArrow installed the batches are Arrow record
+    batches that are streamed from a `pyarrow.dataset`, otherwise csv files are read in
+    chunks with pandas.
+
+    Arguments:
+        path: path of the csv or parquet file
+        batch_size: the maximum number of rows per batch
+        columns: only read these columns, `None` reads all of them
+    """
+    path = pathlib.Path(path)
+    try:
+        import pyarrow.dataset as ds
+    except ImportError:
+        if path.suffix.lower() in PARQUET:
+            raise ImportError("Reading parquet files requires pyarrow.")
+        yield from pd.read_csv(path, chunksize=batch_size, usecols=columns)
+        return
+    fmt = "parquet" if path.suffix.lower() in PARQUET else "csv"
+    dataset = ds.dataset(path, format=fmt)
+    for batch in dataset.to_batches(columns=columns, batch_size=batch_size):
+        if batch.num_rows:
+            yield batch
+
+
+def _predict(model, proba, native, batch):
+    if not native and not isinstance(batch, pd.DataFrame):
+        batch = batch.to_pandas()
+    if proba:
+        return np.asarray(model.predict_proba(batch))
+    if isinstance(model, InteractivePreprocessor):
+        out = model.transform(batch)
+        return out.toarray() if hasattr(out, "toarray") else np.asarray(out)
+    return np.asarray(model.predict(batch))
+
+
+class _Writer:
+    """Appends the output of every batch to a csv or parquet file."""
+
+    def __init__(self, path, columns):
+        self.path = pathlib.Path(path)
+        self.columns = columns
+        self.parquet = self.path.suffix.lower() in PARQUET
+        self.file = None
+
+    def write(self, out):
+        frame = pd.DataFrame(
+            out.reshape(len(out), len(self.columns)), columns=self.columns
+        )
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self.file is None:
+                self.file = pq.ParquetWriter(self.path, table.schema)
+            self.file.write_table(table)
+            return
+        header = self.file is None
+        if header:
+            self.file = open(self.path, "w", newline="")
+        frame.to_csv(self.file, header=header, index=False)
+
+    def finish(self):
+        if self.file is None:
+            # An empty input still produces a file with a header.
+            self.write(np.empty((0, len(self.columns))))
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+
+
+def _output_columns(model, proba):
+    if proba:
+        return [str(c) for c in model.classes_]
+    if isinstance(model, InteractivePreprocessor):
+        return [str(c) for c in model.get_feature_names_out()]
+    return ["prediction"]
+
+
+def score_file(
+    model,
+    input_path,
+    output_path,
+    proba=False,
+    batch_size=100_000,
+    n_jobs=None,
+    prefer="threads",
+    progress=None,
+    interval=5.0,
+):
+    """
+    Streams `input_path` through a model in batches and writes the predictions (or the
+    probabilities) to `output_path`, such that datasets that are much larger than memory
+    can be scored. Drawn models only read the columns that they use and receive the
+    Arrow batches as-is, other models receive every batch as a `pd.DataFrame`.
+
+    Arguments:
+        model: a fitted model, or the path of a model that `load_model` understands
+        input_path: a csv or parquet file with the rows to score
+        output_path: a csv or parquet file to write, with one row per input row
+        proba: write the output of `predict_proba`, one column per class, instead of `predict`
+        batch_size: the maximum number of rows to score at once
+        n_jobs: the number of workers that score batches in parallel, `-1` uses all cores
+        prefer: score on `"threads"` or on `"processes"`
+        progress: a stream, like `sys.stderr`, to report the throughput to every `interval` seconds
+        interval: the number of seconds between two progress reports
+
+    Returns:
+        a dictionary with the number of `rows` and `batches`, the `seconds` it took and the `rows_per_second`
+
+    Usage:
+
+    ```python
+    from hulearn.scoring import score_file
+
+    report = score_file("model.json", "events.parquet", "scores.parquet", proba=True)
+    print(f"{report['rows_per_second']:,.0f} rows/s")
+    ```
+    """
+    if prefer not in PREFER:
+        raise ValueError(f"Unknown prefer '{prefer}', choose from {list(PREFER)}.")
+    if batch_size < 1:
+        raise ValueError(
+            f"The batch_size must be a positive integer, got {batch_size}."
+        )
+    model = prepare_model(model)
+    columns = drawn_columns(model)
+    n_jobs = effective_n_jobs(n_jobs)
+    func = partial(_predict, model, proba, isinstance(model, DRAWN))
+    batches = iter_batches(input_path, batch_size, columns=columns)
+    if n_jobs == 1:
+        outputs = map(func, batches)
+    else:
+        outputs = parallel_map(func, batches, n_jobs, prefer)
+
+    writer = _Writer(output_path, _output_columns(model, proba))
+    rows, n_batches, start = 0, 0, time.perf_counter()
+    last = start
+    try:
+        for out in outputs:
+            writer.write(out)
+            rows, n_batches = rows + len(out), n_batches + 1
+            now = time.perf_counter()
+            if progress is not None and now - last >= interval:
+                _report(progress, rows, now - start)
+                last = now
+        writer.finish()
+    finally:
+        writer.close()
+    seconds = time.perf_counter() - start
+    if progress is not None:
+        _report(progress, rows, seconds, done=True)
+    return {
+        "rows": rows,
+        "batches": n_batches,
+        "seconds": seconds,
+        "rows_per_second": rows / seconds if seconds > 0 else float("inf"),
+    }
+
+
+def _report(stream, rows, seconds, done=False):
+    rate = rows / seconds if seconds > 0 else float("inf")
+    status = "scored" if done else "scoring"
+    print(
+        f"{status} {rows:,} rows in {seconds:.1f}s ({rate:,.0f} rows/s)",
+        file=stream,
+        flush=True,
+    )
@@ -0,0 +1,306 @@
+import asyncio
+import json
+import math
+import time
+from collections import deque
+from http import HTTPStatus
+
+import numpy as np
+import pandas as pd
+
+from hulearn.engine.columns import ColumnData
+from hulearn.scoring import drawn_columns, prepare_model
+
+ROUTES = {"/predict": "predict", "/predict_proba": "predict_proba"}
+
+
+class _Request:
+    def __init__(self, records, method):
+        self.records = records
+        self.method = method
+        self.future = asyncio.get_running_loop().create_future()
+        self.result = None
+        self.error = None
+
+
+class ModelServer:
+    """
+    A small asyncio HTTP server that scores JSON records with a drawn or function model.
+
+    The model is loaded once. Concurrent requests are coalesced into micro-batches:
+    the first request that arrives opens a batch, which is scored as soon as it holds
+    `max_batch_size` records or `max_wait_ms` milliseconds have passed. Every batch is
+    scored with a single vectorized call in a worker thread, such that the event loop
+    keeps accepting requests meanwhile. Drawn models receive the columns they use as
+    float arrays, read straight from the records, other models receive a single
+    `pd.DataFrame` per batch.
+
+    The endpoints are:
+
+    - `POST /predict` and `POST /predict_proba`, with a JSON record or a list of records
+    - `GET /metrics`, with the p50 and p99 latency, the throughput and the batch sizes
+    - `GET /health`
+
+    Arguments:
+        model: a fitted model, or the path of a model that `hulearn.scoring.load_model` understands
+        host: the interface to listen on
+        port: the port to listen on, `0` picks a free port (see `.port` after `start`)
+        max_batch_size: the maximum number of records to score at once
+        max_wait_ms: how long to wait for more requests before a batch is scored
+        window: the number of recent requests that the latency percentiles are computed over
+
+    Usage:
+
+    ```python
+    import asyncio
+    from hulearn.serving import ModelServer
+
+    async def main():
+        server = ModelServer("model.json", port=8000, max_batch_size=256, max_wait_ms=2)
+        await server.start()
+        await server.serve_forever()
+
+    asyncio.run(main())
+    ```
+    """
+
+    def __init__(
+        self,
+        model,
+        host="127.0.0.1",
+        port=8000,
+        max_batch_size=256,
+        max_wait_ms=2.0,
+        window=10_000,
+    ):
+        if max_batch_size < 1:
+            raise ValueError(
+                f"The max_batch_size must be a positive integer, got {max_batch_size}."
+            )
+        self.model = prepare_model(model)
+        self.host = host
+        self.port = port
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.columns = drawn_columns(self.model)
+        self.latencies = deque(maxlen=window)
+        self.n_requests = 0
+        self.n_records = 0
+        self.n_batches = 0
+        self.n_errors = 0
+        self._server = None
+        self._queue = None
+        self._batcher = None
+        self._started = None
+
+    async def start(self):
+        """Starts listening and batching, returns once the server accepts connections."""
+        self._queue = asyncio.Queue()
+        self._batcher = asyncio.create_task(self._batch_loop())
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._started = time.perf_counter()
+        return self
+
+    async def serve_forever(self):
+        await self._server.serve_forever()
+
+    async def stop(self):
+        """Stops accepting connections and cancels the batching loop."""
+        self._server.close()
+        await self._server.wait_closed()
+        self._batcher.cancel()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    def metrics(self):
+        """Returns the latency percentiles (in milliseconds) and the throughput so far."""
+        uptime = time.perf_counter() - self._started if self._started else 0.0
+        latencies = np.array(self.latencies) * 1000
+        p50, p99 = np.percentile(latencies, [50, 99]) if len(latencies) else (0, 0)
+        return {
+            "requests": self.n_requests,
+            "records": self.n_records,
+            "batches": self.n_batches,
+            "errors": self.n_errors,
+            "mean_batch_size": self.n_records / self.n_batches if self.n_batches else 0,
+            "latency_p50_ms": float(p50),
+            "latency_p99_ms": float(p99),
+            "requests_per_second": self.n_requests / uptime if uptime else 0,
+            "records_per_second": self.n_records / uptime if uptime else 0,
+            "uptime_s": uptime,
+        }
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            size = len(batch[0].records)
+            deadline = loop.time() + self.max_wait_ms / 1000
+            while size < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    request = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(request)
+                size += len(request.records)
+            try:
+                await loop.run_in_executor(None, self._score_batch, batch)
+            except Exception as error:
+                for request in batch:
+                    request.error = error
+            for request in batch:
+                if request.future.done():
+                    continue
+                if request.error is None:
+                    request.future.set_result(request.result)
+                else:
+                    request.future.set_exception(request.error)
+
+    def _frame(self, records):
+        if self.columns is None:
+            return pd.DataFrame.from_records(records)
+        # Drawn models only need their columns, no dataframe has to be built for them.
+        columns = {
+            k: np.array([r.get(k, math.nan) for r in records], dtype=np.float64)
+            for k in self.columns
+        }
+        return ColumnData(columns, len(records))
+
+    def _score(self, records, method):
+        out = getattr(self.model, method)(self._frame(records))
+        return out if isinstance(out, np.ndarray) else np.asarray(out)
+
+    def _score_batch(self, batch):
+        """Scores a batch with one call per method, requests that fail are retried alone."""
+        self.n_batches += 1
+        for method in dict.fromkeys(r.method for r in batch):
+            requests = [r for r in batch if r.method == method]
+            records = [rec for r in requests for rec in r.records]
+            try:
+                out = self._score(records, method)
+            except Exception:
+                out = None
+            start = 0
+            for request in requests:
+                stop = start + len(request.records)
+                try:
+                    if out is not None:
+                        request.result = out[start:stop]
+                    else:
+                        request.result = self._score(request.records, method)
+                except Exception as error:
+                    request.error = error
+                start = stop
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0))
+                body = await reader.readexactly(length) if length else b""
+                status, payload = await self._route(method, path, body)
+                data = json.dumps(payload).encode("utf-8")
+                keep_alive = headers.get("connection", "").lower() != "close"
+                header = (
+                    f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                    "Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+                ).encode("latin-1")
+                writer.write(header + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method, path, body):
+        path = path.split("?", 1)[0]
+        if method == "GET" and path == "/metrics":
+            return HTTPStatus.OK, self.metrics()
+        if method == "GET" and path == "/health":
+            return HTTPStatus.OK, {"status": "ok"}
+        if path not in ROUTES:
+            return HTTPStatus.NOT_FOUND, {"error": f"Unknown path '{path}'."}
+        if method != "POST":
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "Use POST."}
+        start = time.perf_counter()
+        try:
+            records = json.loads(body)
+        except ValueError:
+            self.n_errors += 1
+            return HTTPStatus.BAD_REQUEST, {"error": "The body is not valid JSON."}
+        records = [records] if isinstance(records, dict) else records
+        if not isinstance(records, list) or not all(
+            isinstance(r, dict) for r in records
+        ):
+            self.n_errors += 1
+            return HTTPStatus.BAD_REQUEST, {"error": "Send a record or a list of them."}
+        request = _Request(records, ROUTES[path])
+        await self._queue.put(request)
+        try:
+            out = await request.future
+        except Exception as error:
+            self.n_errors += 1
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": repr(error)}
+        self.latencies.append(time.perf_counter() - start)
+        self.n_requests += 1
+        self.n_records += len(records)
+        if request.method == "predict_proba":
+            classes = [_jsonable(c) for c in self.model.classes_]
+            return HTTPStatus.OK, {"classes": classes, "probabilities": out.tolist()}
+        return HTTPStatus.OK, {"predictions": [_jsonable(p) for p in out.tolist()]}
+
+
+def _jsonable(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def serve(model, host="127.0.0.1", port=8000, max_batch_size=256, max_wait_ms=2.0):
+    """
+    Runs a `ModelServer` until it is interrupted.
+
+    Usage:
+
+    ```python
+    from hulearn.serving import serve
+
+    serve("model.json", port=8000)
+    ```
+    """
+    server = ModelServer(
+        model,
+        host=host,
+        port=port,
+        max_batch_size=max_batch_size,
+        max_wait_ms=max_wait_ms,
+    )
+
+    async def run():
+        await server.start()
+        await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
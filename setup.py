@@ -29,6 +29,12 @@ test_packages = [
     "scikit-lego>=0.6.0",
     "matplotlib>=3.0.2",
     "mktestdocs==0.1.1",
+    "polars>=0.20.0",
+    "pyarrow>=12.0.0",
+]
+
+numba_packages = [
+    "numba>=0.50.0",
 ]
 
 util_packages = [
@@ -59,7 +65,12 @@ setup(
         ]
     },
     install_requires=base_packages,
-    extras_require={"docs": docs_packages, "dev": dev_packages, "test": test_packages},
+    extras_require={
+        "docs": docs_packages,
+        "dev": dev_packages,
+        "test": test_packages,
+        "numba": numba_packages,
+    },
     classifiers=[
         "Intended Audience :: Developers",
         "Intended Audience :: Science/Research",
@@ -0,0 +1,89 @@
+import json
+
+import pytest
+import numpy as np
+from sklearn.base import clone
+from sklego.datasets import load_penguins
+
+from hulearn.classification import DrawnModelEnsemble, InteractiveClassifier
+from hulearn.engine import compile_drawing, PolygonScorer
+
+
+def drawings():
+    with open("tests/test_classification/demo-data.json") as f:
+        full = json.load(f)
+    # A drawing with fewer labels, in another order.
+    partial = [
+        {
+            **chart,
+            "polygons": {k: chart["polygons"][k] for k in ["Chinstrap", "Adelie"]},
+        }
+        for chart in full
+    ]
+    return [full, full[:1], full[1:], partial]
+
+
+@pytest.fixture
+def X():
+    df = load_penguins(as_frame=True).dropna()
+    return df.drop(columns=["species"])
+
+
+@pytest.mark.parametrize("mode", ["direct", "grid", "partition", "triangles"])
+def test_hits_match_separate_drawings(X, mode):
+    ens = DrawnModelEnsemble(drawings(), mode=mode).fit(X, None)
+    assert ens.classes_ == ["Adelie", "Gentoo", "Chinstrap"]
+    hits = ens.hits(X)
+    assert hits.shape == (4, len(X), 3)
+    for m, drawing in enumerate(drawings()):
+        compiled = compile_drawing(drawing)
+        expected = PolygonScorer(compiled).hits(X)
+        columns = [ens.classes_.index(c) for c in compiled.classes]
+        assert np.array_equal(hits[m][:, columns], expected)
+        missing = [i for i, c in enumerate(ens.classes_) if c not in compiled.classes]
+        assert (hits[m][:, missing] == 0).all()
+
+
+def test_soft_voting_averages_classifiers(X):
+    ens = DrawnModelEnsemble(drawings()[:3], weights=[2, 1, 1]).fit(X, None)
+    probas = [
+        InteractiveClassifier(d).fit(X, None).predict_proba(X) for d in drawings()[:3]
+    ]
+    assert np.allclose(ens.model_proba(X), np.stack(probas))
+    assert np.allclose(
+        ens.predict_proba(X), np.average(probas, axis=0, weights=[2, 1, 1])
+    )
+    assert ens.predict(X).tolist() == [
+        ens.classes_[i] for i in ens.predict_proba(X).argmax(axis=1)
+    ]
+
+
+def test_hard_voting_counts_votes(X):
+    ens = DrawnModelEnsemble(drawings(), voting="hard").fit(X, None)
+    proba = ens.predict_proba(X)
+    assert np.allclose(proba.sum(axis=1), 1)
+    assert set(np.unique(proba * 4)) <= {0, 1, 2, 3, 4}
+    assert ens.model_proba(X)[3][:, 1].max() == 0
+
+
+def test_refit_clone_and_bad_params(X):
+    ens = DrawnModelEnsemble(drawings())
+    assert ens.predict(X).shape == (len(X),)
+    assert clone(ens).fit(X, None).predict(X).tolist() == ens.predict(X).tolist()
+    ens.set_params(json_descs=drawings()[:2])
+    assert ens.hits(X).shape[0] == 2
+    with pytest.raises(ValueError):
+        DrawnModelEnsemble(drawings(), voting="majority").fit(X, None)
+    with pytest.raises(ValueError):
+        DrawnModelEnsemble(drawings(), weights=[1, 2]).fit(X, None)
+
+
+@pytest.mark.parametrize("voting", ["soft", "hard"])
+def test_empty_input(X, voting):
+    ens = DrawnModelEnsemble(drawings(), voting=voting).fit(X, None)
+    empty = X.iloc[:0]
+    assert ens.hits(empty).shape == (4, 0, 3)
+    assert ens.predict_proba(empty).shape == (0, 3)
+    assert ens.predict(empty).shape == (0,)
+    single = InteractiveClassifier(drawings()[0]).fit(X, None)
+    assert single.predict_proba(empty).shape == ens.predict_proba(empty).shape
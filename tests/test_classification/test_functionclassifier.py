@@ -88,3 +88,56 @@ def test_smoke_partial_fit():
 
     mod = FunctionClassifier(class_based, pclass=10)
     assert mod.partial_fit(X, y, classes=np.unique(y)).predict(X).shape[0] == y.shape[0]
+
+
+def record_rows(X, seen):
+    seen.append(len(X))
+    return np.zeros(len(X), dtype=int)
+
+
+@pytest.mark.parametrize(
+    "fit_check,fit_rows,partial_rows",
+    [
+        (None, [1000], [100]),
+        ("full", [1000], [1000]),
+        ("sample", [100], [100]),
+        ("none", [], []),
+    ],
+)
+def test_fit_check_rows(fit_check, fit_rows, partial_rows):
+    X, y = np.random.normal(0, 1, (1000, 2)), np.random.randint(0, 2, 1000)
+    seen = []
+    FunctionClassifier(record_rows, fit_check=fit_check, seen=seen).fit(X, y)
+    assert seen == fit_rows
+    seen.clear()
+    mod = FunctionClassifier(record_rows, fit_check=fit_check, seen=seen)
+    mod.partial_fit(X, y, classes=[0, 1])
+    assert seen == partial_rows
+
+
+def test_fit_check_unknown_raises():
+    X, y = np.random.normal(0, 1, (10, 2)), np.random.randint(0, 2, 10)
+    with pytest.raises(ValueError):
+        FunctionClassifier(predict, fit_check="some").fit(X, y)
+
+
+def test_fit_check_sample_on_pandas():
+    df = load_titanic(as_frame=True)
+    X, y = df.drop(columns=["survived"]), df["survived"]
+    mod = FunctionClassifier(class_based, fit_check="sample").fit(X, y)
+    assert mod.get_params()["fit_check"] == "sample"
+    with pytest.raises(KeyError):
+        FunctionClassifier(class_based, fit_check="sample").fit(
+            X.drop(columns="sex"), y
+        )
+
+
+def flag_column(X, validate=False):
+    return np.full(len(X), int(validate))
+
+
+def test_validate_kwarg_reaches_func():
+    X, y = np.random.normal(0, 1, (10, 2)), np.random.randint(0, 2, 10)
+    mod = FunctionClassifier(flag_column, validate=True).fit(X, y)
+    assert mod.get_params()["validate"] is True
+    assert mod.predict(X).tolist() == [1] * 10
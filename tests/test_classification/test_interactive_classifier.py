@@ -1,8 +1,10 @@
 import pytest
+import numpy as np
 
 from sklearn.model_selection import GridSearchCV
 from sklego.datasets import load_penguins
 from sklearn.pipeline import Pipeline
+from sklearn.base import clone
 
 from hulearn.preprocessing import PipeTransformer
 from hulearn.classification import InteractiveClassifier
@@ -121,3 +123,92 @@ def test_ignore_bad_data():
 
     clf = InteractiveClassifier(json_desc=data)
     assert len(list(clf.poly_data)) == 0
+
+
+def test_compiled_drawing_reused_and_invalidated():
+    clf = InteractiveClassifier.from_json("tests/test_classification/demo-data.json")
+    df = load_penguins(as_frame=True).dropna()
+    X, y = df.drop(columns=["species"]), df["species"]
+
+    clf.fit(X, y)
+    compiled = clf.compiled_
+    preds = clf.predict_proba(X)
+    assert clf.compiled_ is compiled
+
+    clf.set_params(json_desc=clf.json_desc[:1])
+    assert not hasattr(clf, "compiled_")
+    new_preds = clf.predict_proba(X)
+    assert clf.compiled_ is not compiled
+    assert len(clf.compiled_) < len(compiled)
+    assert new_preds.shape == preds.shape
+
+
+def test_backends_agree():
+    df = load_penguins(as_frame=True).dropna()
+    X, y = df.drop(columns=["species"]), df["species"]
+    path = "tests/test_classification/demo-data.json"
+    preds = [
+        InteractiveClassifier.from_json(path, backend=b).fit(X, y).predict_proba(X)
+        for b in ["auto", "numpy", "shapely", "numba"]
+    ]
+    for pred in preds[1:]:
+        assert np.array_equal(preds[0], pred)
+
+
+@pytest.mark.parametrize("mode", ["partition", "triangles"])
+def test_mode_matches_direct(mode):
+    df = load_penguins(as_frame=True).dropna()
+    X, y = df.drop(columns=["species"]), df["species"]
+    path = "tests/test_classification/demo-data.json"
+    direct = InteractiveClassifier.from_json(path).fit(X, y).predict_proba(X)
+    clf = InteractiveClassifier.from_json(path, mode=mode).fit(X, y)
+    assert np.array_equal(clf.predict_proba(X), direct)
+
+
+def test_batch_size_and_predict_proba_iter():
+    df = load_penguins(as_frame=True).dropna()
+    X, y = df.drop(columns=["species"]), df["species"]
+    path = "tests/test_classification/demo-data.json"
+    clf = InteractiveClassifier.from_json(path).fit(X, y)
+    batched = InteractiveClassifier.from_json(path, batch_size=50).fit(X, y)
+    assert np.array_equal(batched.predict_proba(X), clf.predict_proba(X))
+    assert np.array_equal(batched.predict(X), clf.predict(X))
+    chunks = list(batched.predict_proba_iter(X))
+    assert [len(c) for c in chunks] == [50] * (len(X) // 50) + [len(X) % 50]
+    assert np.array_equal(np.concatenate(chunks), clf.predict_proba(X))
+
+
+def test_n_jobs_matches_single_job():
+    df = load_penguins(as_frame=True).dropna()
+    X, y = df.drop(columns=["species"]), df["species"]
+    path = "tests/test_classification/demo-data.json"
+    expected = InteractiveClassifier.from_json(path).fit(X, y).predict_proba(X)
+    for prefer in ["threads", "processes"]:
+        clf = InteractiveClassifier.from_json(path, n_jobs=2, prefer=prefer)
+        assert np.array_equal(clf.fit(X, y).predict_proba(X), expected)
+
+
+def test_binary_roundtrip(tmp_path):
+    df = load_penguins(as_frame=True).dropna()
+    X, y = df.drop(columns=["species"]), df["species"]
+    path = "tests/test_classification/demo-data.json"
+    clf = InteractiveClassifier.from_json(path).fit(X, y)
+    clf.to_binary(tmp_path / "model.hul")
+    loaded = InteractiveClassifier.from_binary(tmp_path / "model.hul", mode="grid")
+    assert loaded.mode == "grid"
+    assert np.array_equal(loaded.fit(X, y).predict_proba(X), clf.predict_proba(X))
+    assert np.array_equal(clone(loaded).fit(X, y).predict(X), clf.predict(X))
+
+
+@pytest.mark.parametrize("backend", ["numpy", "shapely"])
+def test_predict_one_matches_predict(backend):
+    df = load_penguins(as_frame=True).dropna()
+    X, y = df.drop(columns=["species"]), df["species"]
+    path = "tests/test_classification/demo-data.json"
+    clf = InteractiveClassifier.from_json(path, backend=backend).fit(X, y)
+    proba, preds = clf.predict_proba(X), clf.predict(X)
+    for i, record in enumerate(X.to_dict(orient="records")):
+        assert np.array_equal(clf.predict_proba_one(record), proba[i])
+        assert clf.predict_one(record) == preds[i]
+    unfitted = InteractiveClassifier.from_json(path)
+    assert np.array_equal(unfitted.predict_proba_one(record), proba[-1])
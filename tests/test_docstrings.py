@@ -3,13 +3,36 @@ from mktestdocs import check_docstring, get_codeblock_members
 
 from hulearn.datasets import load_titanic
 from hulearn.experimental import CaseWhenRuler
-from hulearn.common import flatten, df_to_dictlist
+from hulearn.common import flatten, df_to_dictlist, check_function
+from hulearn.engine import compile_drawing, load_drawing, stack_drawings, PolygonScorer
+from hulearn.engine.kernels import distances_to_edges, points_in_polygon
+from hulearn.engine.record import RecordScorer
+from hulearn.engine.simplify import simplify_ring
+from hulearn.engine.triangles import triangulate_ring
+from hulearn.model_selection import HumanGridSearchCV
 
 members = get_codeblock_members(CaseWhenRuler)
 
 
 @pytest.mark.parametrize(
-    "func", [load_titanic, flatten, df_to_dictlist], ids=lambda d: d.__name__
+    "func",
+    [
+        load_titanic,
+        flatten,
+        df_to_dictlist,
+        check_function,
+        compile_drawing,
+        stack_drawings,
+        points_in_polygon,
+        distances_to_edges,
+        PolygonScorer,
+        load_drawing,
+        simplify_ring,
+        triangulate_ring,
+        RecordScorer,
+        HumanGridSearchCV,
+    ],
+    ids=lambda d: d.__name__,
 )
 def test_docstring(func):
     check_docstring(obj=func)
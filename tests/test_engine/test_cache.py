@@ -0,0 +1,89 @@
+import copy
+import json
+import pickle
+import pathlib
+
+import pytest
+import numpy as np
+from sklearn.base import clone
+from sklego.datasets import load_penguins
+
+from hulearn.classification import InteractiveClassifier
+from hulearn.outlier import InteractiveOutlierDetector
+from hulearn.engine import compile_drawing, HitCache, PolygonScorer
+
+
+@pytest.fixture
+def json_desc():
+    return json.loads(
+        pathlib.Path("tests/test_classification/demo-data.json").read_text()
+    )
+
+
+@pytest.fixture
+def X():
+    return load_penguins(as_frame=True).dropna().drop(columns=["species"])
+
+
+def test_repeated_calls_hit_the_cache(json_desc, X):
+    cache = HitCache()
+    scorer = PolygonScorer(compile_drawing(json_desc), cache=cache)
+    first = scorer.hits(X)
+    assert scorer.hits(X) is first
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert not first.flags.writeable
+    assert np.array_equal(first, PolygonScorer(scorer.compiled).hits(X))
+
+
+def test_changed_data_misses_the_cache(json_desc, X):
+    cache = HitCache()
+    scorer = PolygonScorer(compile_drawing(json_desc), cache=cache)
+    first = scorer.hits(X)
+    changed = X.copy()
+    changed.iloc[0, changed.columns.get_loc("bill_length_mm")] += 1.0
+    assert scorer.hits(changed) is not first
+    # Columns that the drawing does not use do not matter.
+    unused = X.assign(island="nowhere")
+    assert scorer.hits(unused) is first
+    # Another compiled drawing never shares entries.
+    other = PolygonScorer(compile_drawing(json_desc), cache=cache)
+    assert other.hits(X) is not first
+
+
+def test_eviction(json_desc, X):
+    scorer = PolygonScorer(compile_drawing(json_desc), cache=HitCache(max_entries=2))
+    results = [scorer.hits(X.iloc[:n]) for n in [10, 20, 30]]
+    assert len(scorer.cache) == 2
+    assert scorer.hits(X.iloc[:30]) is results[2]
+    assert scorer.hits(X.iloc[:10]) is not results[0]
+
+    nbytes = results[2].nbytes
+    scorer.cache = HitCache(max_entries=10, max_bytes=nbytes)
+    scorer.hits(X.iloc[:30])
+    scorer.hits(X.iloc[:20])
+    assert scorer.cache.nbytes <= nbytes
+    assert len(scorer.cache) == 1
+
+
+def test_cache_is_shared_by_clones_and_not_pickled(json_desc, X):
+    cache = HitCache()
+    assert copy.deepcopy(cache) is cache
+    cache.put(("key",), np.zeros(3))
+    assert len(pickle.loads(pickle.dumps(cache))) == 0
+
+    clf = InteractiveClassifier(json_desc, cache=cache)
+    assert clone(clf).cache is cache
+
+
+def test_estimators_share_one_computation(json_desc, X):
+    cache = HitCache()
+    clf = InteractiveClassifier(json_desc, cache=cache).fit(X, None)
+    clf.predict_proba(X)
+    clf.predict(X)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    cache = HitCache()
+    det = InteractiveOutlierDetector(json_desc, cache=cache).fit(X)
+    det.score(X)
+    det.predict(X)
+    assert (cache.hits, cache.misses) == (1, 1)
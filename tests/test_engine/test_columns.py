@@ -0,0 +1,100 @@
+import json
+
+import pytest
+import numpy as np
+import pandas as pd
+
+from hulearn.datasets import load_titanic
+from hulearn.classification import InteractiveClassifier
+from hulearn.engine import compile_drawing, PolygonScorer
+from hulearn.engine.columns import ColumnData
+
+
+def titanic_drawing(x, y):
+    return [
+        {
+            "chart_id": "titanic",
+            "x": x,
+            "y": y,
+            "polygons": {
+                "survived": {
+                    x: [[0, 20, 20, 0], [10, 80, 80]],
+                    y: [[0, 0, 600, 600], [0, 0, 300]],
+                },
+                "died": {x: [[15, 80, 80, 15]], y: [[0, 0, 50, 50]]},
+            },
+        }
+    ]
+
+
+def test_float_columns_are_views():
+    X = np.random.default_rng(0).uniform(size=(100, 3))
+    data = ColumnData.from_data(X, [0, 2])
+    assert np.shares_memory(data[0], X) and np.shares_memory(data[2], X)
+    df = pd.DataFrame(X, columns=["a", "b", "c"])
+    assert np.shares_memory(ColumnData.from_data(df, ["a"])["a"], df.to_numpy())
+    chunk = data.take(slice(10, 20))
+    assert len(chunk) == 10 and np.shares_memory(chunk[0], X)
+
+
+def test_object_array_matches_dataframe():
+    df = load_titanic(as_frame=True)
+    X, y = load_titanic(return_X_y=True)
+    assert X.dtype == object
+    # Age and fare are the 4th and 5th column of the array.
+    from_array = InteractiveClassifier(titanic_drawing(3, 4)).fit(X, y)
+    from_frame = InteractiveClassifier(titanic_drawing("age", "fare")).fit(df, y)
+    assert np.array_equal(from_array.predict_proba(X), from_frame.predict_proba(df))
+
+
+def test_positional_keys_survive_json():
+    json_desc = json.loads(json.dumps(titanic_drawing(3, 4)))
+    assert list(json_desc[0]["polygons"]["died"]) == ["3", "4"]
+    X, _ = load_titanic(return_X_y=True)
+    expected = PolygonScorer(compile_drawing(titanic_drawing(3, 4))).hits(X)
+    assert np.array_equal(PolygonScorer(compile_drawing(json_desc)).hits(X), expected)
+
+
+def test_missing_values_are_outside():
+    df = pd.DataFrame(
+        {"x": pd.array([1, None, 1], dtype="Int64"), "y": [1.0, 1.0, 9.0]}
+    )
+    json_desc = titanic_drawing("x", "y")
+    hits = PolygonScorer(compile_drawing(json_desc)).hits(df)
+    assert hits.tolist() == [[1, 0], [0, 0], [1, 0]]
+
+
+def test_bad_keys_raise():
+    scorer = PolygonScorer(compile_drawing(titanic_drawing("age", 9)))
+    with pytest.raises(KeyError):
+        scorer.hits(np.zeros((3, 4)))
+    with pytest.raises(ValueError):
+        scorer.hits(np.zeros(3))
+
+
+@pytest.mark.parametrize("library", ["polars", "pyarrow"])
+def test_native_frames_match_pandas(library):
+    native = pytest.importorskip(library)
+    df = load_titanic(as_frame=True)
+    frame = native.from_pandas(df) if library == "polars" else native.table(df)
+    data = ColumnData.from_data(frame, ["age", "fare"])
+    assert len(data) == len(df)
+    # The float columns without missing values are read without a copy.
+    assert not data["fare"].flags.writeable
+    clf = InteractiveClassifier(titanic_drawing("age", "fare")).fit(df, df["survived"])
+    expected = clf.predict_proba(df)
+    assert np.array_equal(clf.predict_proba(frame), expected)
+    clf.set_params(batch_size=100)
+    assert np.array_equal(clf.predict_proba(frame), expected)
+
+
+@pytest.mark.parametrize("batch", [False, True])
+@pytest.mark.parametrize("x", [[1, None, 1], [1.0, None, 1.0]])
+def test_arrow_nulls_are_outside(x, batch):
+    pa = pytest.importorskip("pyarrow")
+    table = pa.table({"x": pa.array(x), "y": [1.0, 1.0, 9.0]})
+    if batch:
+        # The columns of a `RecordBatch` are arrays instead of chunked arrays.
+        table = table.to_batches()[0]
+    hits = PolygonScorer(compile_drawing(titanic_drawing("x", "y"))).hits(table)
+    assert hits.tolist() == [[1, 0], [0, 0], [1, 0]]
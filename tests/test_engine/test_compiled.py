@@ -0,0 +1,79 @@
+import json
+import pickle
+import pathlib
+
+import pytest
+import numpy as np
+
+from hulearn.engine import compile_drawing, save_drawing, load_drawing
+
+
+@pytest.fixture
+def json_desc():
+    return json.loads(
+        pathlib.Path("tests/test_classification/demo-data.json").read_text()
+    )
+
+
+def test_compile_matches_json(json_desc):
+    compiled = compile_drawing(json_desc)
+    assert compiled.classes == tuple(json_desc[0]["polygons"].keys())
+    assert len(compiled) == 6
+    assert compiled.offsets[-1] == compiled.vertices.shape[0]
+    assert set(compiled.x_keys) == {"bill_length_mm", "flipper_length_mm"}
+    assert len(list(compiled.poly_data())) == 6
+
+
+def test_compiled_is_immutable(json_desc):
+    compiled = compile_drawing(json_desc)
+    with pytest.raises(AttributeError):
+        compiled.classes = ("a",)
+    with pytest.raises(ValueError):
+        compiled.vertices[0, 0] = 1.0
+
+
+def test_compiled_pickles(json_desc):
+    compiled = compile_drawing(json_desc)
+    loaded = pickle.loads(pickle.dumps(compiled))
+    assert loaded.classes == compiled.classes
+    assert np.array_equal(loaded.vertices, compiled.vertices)
+    assert len(loaded.geometries) == len(compiled.geometries)
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_binary_roundtrip(json_desc, tmp_path, mmap):
+    compiled = compile_drawing(json_desc)
+    save_drawing(compiled, tmp_path / "model.hul")
+    loaded = load_drawing(tmp_path / "model.hul", mmap=mmap)
+    assert loaded.classes == compiled.classes
+    assert loaded.x_keys == compiled.x_keys
+    assert loaded.chart_ids == compiled.chart_ids
+    assert np.array_equal(loaded.vertices, compiled.vertices)
+    assert np.array_equal(loaded.offsets, compiled.offsets)
+    assert np.array_equal(loaded.bounds, compiled.bounds)
+    assert not loaded.vertices.flags.writeable
+    assert compile_drawing(loaded) is loaded
+
+
+def test_binary_roundtrip_empty(tmp_path):
+    json_desc = [{"chart_id": "a", "x": 0, "y": 1, "polygons": {"a": {0: [], 1: []}}}]
+    save_drawing(compile_drawing(json_desc), tmp_path / "model.hul")
+    loaded = load_drawing(tmp_path / "model.hul")
+    assert len(loaded) == 0
+    assert loaded.classes == ("a",)
+
+
+def test_binary_rejects_other_files(tmp_path):
+    (tmp_path / "model.json").write_text("[]")
+    with pytest.raises(ValueError):
+        load_drawing(tmp_path / "model.json")
+
+
+def test_areas_match_shapely(json_desc):
+    compiled = compile_drawing(json_desc)
+    expected = [geom.context.area for geom in compiled.geometries]
+    assert np.allclose(compiled.areas, expected)
+    empty = [
+        {"chart_id": "c", "x": "a", "y": "b", "polygons": {"p": {"a": [], "b": []}}}
+    ]
+    assert compile_drawing(empty).areas.shape == (0,)
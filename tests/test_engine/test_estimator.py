@@ -0,0 +1,54 @@
+import json
+import pathlib
+
+import pytest
+import numpy as np
+from sklego.datasets import load_penguins
+
+from hulearn.classification import InteractiveClassifier
+from hulearn.outlier import InteractiveOutlierDetector
+from hulearn.preprocessing import InteractivePreprocessor
+from hulearn.engine.estimator import DrawnEstimatorMixin
+
+ESTIMATORS = [
+    (InteractiveClassifier, {"smoothing": 0.1}, "predict_proba"),
+    (InteractiveOutlierDetector, {"threshold": 2}, "predict"),
+    (InteractivePreprocessor, {"refit": False}, "transform"),
+]
+
+
+@pytest.fixture
+def json_desc():
+    return json.loads(
+        pathlib.Path("tests/test_classification/demo-data.json").read_text()
+    )
+
+
+@pytest.fixture
+def X():
+    df = load_penguins(as_frame=True).dropna()
+    return df.drop(columns=["species"])
+
+
+@pytest.mark.parametrize("cls,kwargs,method", ESTIMATORS)
+def test_binary_roundtrip(tmp_path, json_desc, X, cls, kwargs, method):
+    mod = cls(json_desc, **kwargs).fit(X, None)
+    mod.to_binary(tmp_path / "model.hul")
+    loaded = cls.from_binary(tmp_path / "model.hul", mode="grid", **kwargs).fit(X, None)
+    assert isinstance(loaded, DrawnEstimatorMixin)
+    assert loaded.get_params()["mode"] == "grid"
+    for key, value in kwargs.items():
+        assert loaded.get_params()[key] == value
+    assert np.array_equal(getattr(loaded, method)(X), getattr(mod, method)(X))
+
+
+@pytest.mark.parametrize("cls,kwargs,method", ESTIMATORS)
+def test_drawing_params_invalidate(json_desc, X, cls, kwargs, method):
+    mod = cls(json_desc, **kwargs).fit(X, None)
+    mod.set_params(backend="numpy")
+    assert hasattr(mod, "compiled_")
+    mod.set_params(simplify_tolerance=0.5)
+    assert not hasattr(mod, "compiled_")
+    mod.fit(X, None)
+    assert mod.simplify_report_["vertices_removed"] >= 0
+    assert mod.simplify_report_["rows_changed"] <= len(X)
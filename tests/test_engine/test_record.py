@@ -0,0 +1,65 @@
+import pytest
+import numpy as np
+import pandas as pd
+
+from hulearn.engine import compile_drawing, PolygonScorer
+from hulearn.engine.record import RecordScorer
+from hulearn.classification import InteractiveClassifier
+from hulearn.outlier import InteractiveOutlierDetector
+from hulearn.preprocessing import InteractivePreprocessor
+from tests.test_engine.test_scorer import rounded_drawing, rounded_points
+from tests.test_engine.test_triangles import concave_drawing
+
+
+def with_boundary_points(compiled, n_points, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        {"x": rng.uniform(-1, 5, n_points), "y": rng.uniform(-1, 4, n_points)}
+    )
+    poly = np.concatenate([compiled.polygon(i) for i in range(len(compiled))])
+    middles = (poly + np.roll(poly, -1, axis=0)) / 2
+    points = np.concatenate([poly, middles, [[np.nan, 0.0]]])
+    return pd.concat([df, pd.DataFrame(points, columns=["x", "y"])], ignore_index=True)
+
+
+@pytest.mark.parametrize("backend", ["numpy", "shapely", "numba"])
+@pytest.mark.parametrize("n_polygons", [3, 40])
+def test_records_match_backend(n_polygons, backend):
+    compiled = compile_drawing(concave_drawing(n_polygons, 30))
+    df = with_boundary_points(compiled, 2000)
+    scorer = PolygonScorer(compiled, backend=backend)
+    hits, memberships = scorer.hits(df), scorer.memberships(df).toarray()
+
+    records = RecordScorer(compiled, backend=backend)
+    assert all(grid is None for *_, grid, _ in records.pairs) == (n_polygons < 16)
+    for i, record in enumerate(df.to_dict(orient="records")):
+        assert records.hits(record) == hits[i].tolist()
+        assert records.polygons(record) == np.flatnonzero(memberships[i]).tolist()
+
+
+def test_record_missing_values_and_keys():
+    compiled = compile_drawing(concave_drawing(3, 30))
+    records = RecordScorer.for_drawing(compiled)
+    assert RecordScorer.for_drawing(compiled) is records
+    assert RecordScorer.for_drawing(compiled, "numpy") is not records
+    assert records.hits({"x": None, "y": 0.0}) == [0, 0]
+    with pytest.raises(KeyError):
+        records.hits({"x": 0.0})
+
+
+@pytest.mark.parametrize("backend", ["auto", "numpy"])
+def test_single_records_match_batches_near_edges(backend):
+    # Vertices and records on one decimal, many records lie on or next to an edge.
+    json_desc = rounded_drawing(60, seed=5)
+    df = pd.concat(
+        [rounded_points(3000), pd.DataFrame({"x": [-0.3], "y": [1.2]})],
+        ignore_index=True,
+    )
+    clf = InteractiveClassifier(json_desc, backend=backend).fit(df, None)
+    out = InteractiveOutlierDetector(json_desc, backend=backend).fit(df)
+    tfm = InteractivePreprocessor(json_desc, backend=backend).fit(df)
+    proba, outliers, counts = clf.predict_proba(df), out.predict(df), tfm.transform(df)
+    for i, record in enumerate(df.to_dict(orient="records")):
+        assert np.allclose(clf.predict_proba_one(record), proba[i])
+        assert out.predict_one(record) == outliers[i]
+        assert np.array_equal(tfm.transform_one(record), counts[i])
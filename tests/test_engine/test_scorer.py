@@ -0,0 +1,335 @@
+import os
+import json
+import pathlib
+
+import pytest
+import numpy as np
+import pandas as pd
+from shapely.geometry import Point
+from shapely.geometry.polygon import Polygon
+from sklego.datasets import load_penguins
+
+from hulearn.engine import compile_drawing, HitCache, PolygonScorer
+from hulearn.engine import backends
+from hulearn.engine.backends import NumbaBackend, NumpyBackend, ShapelyBackend
+from hulearn.engine.kernels import points_in_polygon, points_in_polygons
+from hulearn.engine.parallel import effective_n_jobs
+
+
+@pytest.fixture
+def json_desc():
+    return json.loads(
+        pathlib.Path("tests/test_classification/demo-data.json").read_text()
+    )
+
+
+def rowwise_hits(json_desc, records):
+    """The reference implementation: one Shapely `Point` per row per polygon."""
+    classes = list(json_desc[0]["polygons"].keys())
+    result = []
+    for rec in records:
+        counts = {k: 0 for k in classes}
+        for chart in json_desc:
+            for lab, p in chart["polygons"].items():
+                x_lab, y_lab = p.keys()
+                for xs, ys in zip(*p.values()):
+                    if len(xs) >= 3:
+                        point = Point(rec[x_lab], rec[y_lab])
+                        counts[lab] += Polygon(list(zip(xs, ys))).contains(point)
+        result.append([counts[c] for c in classes])
+    return np.array(result)
+
+
+@pytest.mark.parametrize("backend", ["numpy", "shapely", "numba"])
+def test_hits_match_rowwise(json_desc, backend):
+    df = load_penguins(as_frame=True).dropna()
+    expected = rowwise_hits(json_desc, df.to_dict(orient="records"))
+    scorer = PolygonScorer(compile_drawing(json_desc), backend=backend)
+    assert np.array_equal(scorer.hits(df), expected)
+
+
+@pytest.mark.parametrize("backend", ["numpy", "shapely", "numba"])
+def test_hits_numpy_positions(backend):
+    json_desc = [
+        {
+            "chart_id": "c",
+            "x": 0,
+            "y": 2,
+            "polygons": {
+                "a": {0: [[0, 2, 2, 0]], 2: [[0, 0, 2, 2]]},
+                "b": {0: [[1, 3, 3, 1]], 2: [[1, 1, 3, 3]]},
+            },
+        }
+    ]
+    X = np.array([[0.5, 99, 0.5], [1.5, 99, 1.5], [2.5, 99, 2.5], [9.0, 99, 9.0]])
+    hits = PolygonScorer(compile_drawing(json_desc), backend=backend).hits(X)
+    assert hits.tolist() == [[1, 0], [1, 1], [0, 1], [0, 0]]
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_numpy_kernel_matches_shapely(seed):
+    rng = np.random.default_rng(seed)
+    # A concave, star-shaped polygon with many vertices.
+    angles = np.sort(rng.uniform(0, 2 * np.pi, 50))
+    radius = rng.uniform(0.2, 1.0, 50)
+    vertices = np.column_stack([radius * np.cos(angles), radius * np.sin(angles)])
+    xs, ys = rng.uniform(-1, 1, 2000), rng.uniform(-1, 1, 2000)
+    # Include the vertices themselves and a few NaNs, neither is "inside".
+    xs, ys = np.r_[xs, vertices[:, 0], np.nan], np.r_[ys, vertices[:, 1], 0.0]
+    poly = Polygon(vertices)
+    expected = np.array([poly.contains(Point(x, y)) for x, y in zip(xs, ys)])
+    assert np.array_equal(points_in_polygon(vertices, xs, ys), expected)
+
+
+def test_unknown_backend_raises(json_desc):
+    with pytest.raises(ValueError):
+        PolygonScorer(compile_drawing(json_desc), backend="fortran")
+
+
+def random_drawing(n_polygons, seed=42):
+    rng = np.random.default_rng(seed)
+    polygons = {lab: {"x": [], "y": []} for lab in "abc"}
+    for i in range(n_polygons):
+        cx, cy = rng.uniform(0, 10, 2)
+        angles = np.sort(rng.uniform(0, 2 * np.pi, 8))
+        radius = rng.uniform(0.2, 2.0) * rng.uniform(0.5, 1.0, 8)
+        polygons["abc"[i % 3]]["x"].append(list(cx + radius * np.cos(angles)))
+        polygons["abc"[i % 3]]["y"].append(list(cy + radius * np.sin(angles)))
+    return [{"chart_id": "random", "x": "x", "y": "y", "polygons": polygons}]
+
+
+@pytest.mark.parametrize("backend_cls", [NumpyBackend, ShapelyBackend, NumbaBackend])
+def test_spatial_index_matches_linear_scan(backend_cls):
+    compiled = compile_drawing(random_drawing(200))
+    rng = np.random.default_rng(0)
+    X = np.column_stack([rng.uniform(-1, 11, 5000), rng.uniform(-1, 11, 5000)])
+    X[:3] = np.nan
+    linear = PolygonScorer(compiled, backend=backend_cls(index=False))
+    indexed = PolygonScorer(compiled, backend=backend_cls(index=True))
+    df = pd.DataFrame(X, columns=["x", "y"])
+    expected = linear.hits(df)
+    assert expected.sum() > 0
+    assert np.array_equal(indexed.hits(df), expected)
+
+
+def test_pairwise_kernel_matches_single_kernel():
+    rng = np.random.default_rng(1)
+    shapes = []
+    for n in [3, 4, 7, 25]:
+        angles = np.sort(rng.uniform(0, 2 * np.pi, n))
+        radius = rng.uniform(0.3, 1.0, n)
+        shapes.append(
+            np.column_stack([radius * np.cos(angles), radius * np.sin(angles)])
+        )
+    vertices = np.concatenate(shapes)
+    offsets = np.cumsum([0] + [len(s) for s in shapes])
+    polys = rng.integers(0, len(shapes), 3000)
+    xs, ys = rng.uniform(-1, 1, 3000), rng.uniform(-1, 1, 3000)
+    result = points_in_polygons(vertices, offsets, polys, xs, ys)
+    for i, shape in enumerate(shapes):
+        mask = polys == i
+        assert np.array_equal(
+            result[mask], points_in_polygon(shape, xs[mask], ys[mask])
+        )
+
+
+@pytest.mark.parametrize("grid_size", [1, 7, 64])
+def test_grid_mode_matches_direct(grid_size):
+    compiled = compile_drawing(random_drawing(60))
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame(
+        {"x": rng.uniform(-1, 11, 20000), "y": rng.uniform(-1, 11, 20000)}
+    )
+    # Points on vertices and edges must stay on the boundary, i.e. not inside.
+    poly = compiled.polygon(0)
+    corners = pd.DataFrame({"x": poly[:, 0], "y": poly[:, 1]})
+    middles = pd.DataFrame((poly + np.roll(poly, -1, axis=0)) / 2, columns=["x", "y"])
+    df = pd.concat([df, corners, middles], ignore_index=True)
+    direct = PolygonScorer(compiled, mode="direct").hits(df)
+    grid = PolygonScorer(compiled, mode="grid", grid_size=grid_size).hits(df)
+    assert np.array_equal(grid, direct)
+
+
+def rounded_drawing(n_polygons, seed):
+    """A random drawing with vertices on one decimal, like drawings made by hand."""
+    drawing = random_drawing(n_polygons, seed=seed)
+    for poly in drawing[0]["polygons"].values():
+        for axis in ["x", "y"]:
+            poly[axis] = [list(np.round(coords, 1)) for coords in poly[axis]]
+    return drawing
+
+
+def rounded_points(n_points, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "x": np.round(rng.uniform(-1, 11, n_points), 1),
+            "y": np.round(rng.uniform(-1, 11, n_points), 1),
+        }
+    )
+
+
+@pytest.mark.parametrize("backend", ["numpy", "shapely", "numba"])
+@pytest.mark.parametrize("seed", [5, 6, 8, 10])
+def test_grid_mode_matches_direct_near_edges(backend, seed):
+    # Points on one decimal often lie on an edge, where the backends may disagree.
+    compiled = compile_drawing(rounded_drawing(60, seed))
+    df = rounded_points(20000)
+    direct = PolygonScorer(compiled, backend=backend).hits(df)
+    grid = PolygonScorer(compiled, backend=backend, mode="grid").hits(df)
+    assert np.array_equal(grid, direct)
+
+
+def test_partition_mode_matches_direct():
+    compiled = compile_drawing(random_drawing(60))
+    rng = np.random.default_rng(4)
+    df = pd.DataFrame(
+        {"x": rng.uniform(-1, 11, 20000), "y": rng.uniform(-1, 11, 20000)}
+    )
+    # Vertices and edge midpoints lie on the edges of the partition itself.
+    poly = np.concatenate([compiled.polygon(i) for i in range(5)])
+    corners = pd.DataFrame({"x": poly[:, 0], "y": poly[:, 1]})
+    middles = pd.DataFrame((poly + np.roll(poly, -1, axis=0)) / 2, columns=["x", "y"])
+    df = pd.concat([df, corners, middles], ignore_index=True)
+    direct = PolygonScorer(compiled, mode="direct").hits(df)
+    partition = PolygonScorer(compiled, mode="partition").hits(df)
+    assert np.array_equal(partition, direct)
+
+
+def test_partition_mode_self_intersecting():
+    # A bowtie and a ring that winds around twice, the latter is inside nowhere.
+    json_desc = [
+        {
+            "chart_id": "weird",
+            "x": 0,
+            "y": 1,
+            "polygons": {
+                "a": {0: [[0, 2, 2, 0]], 1: [[0, 2, 0, 2]]},
+                "b": {0: [[0, 2, 1, 0, 2, 1]], 1: [[0, 0, 2, 0, 0, 2]]},
+            },
+        }
+    ]
+    compiled = compile_drawing(json_desc)
+    X = np.random.default_rng(5).uniform(-0.5, 2.5, (5000, 2))
+    direct = PolygonScorer(compiled, mode="direct").hits(X)
+    assert np.array_equal(PolygonScorer(compiled, mode="partition").hits(X), direct)
+
+
+def test_unknown_mode_raises(json_desc):
+    with pytest.raises(ValueError):
+        PolygonScorer(compile_drawing(json_desc), mode="magic")
+
+
+@pytest.mark.parametrize("batch_size", [1, 7, 1000])
+def test_batches_match_single_pass(batch_size):
+    compiled = compile_drawing(random_drawing(20))
+    X = pd.DataFrame(
+        np.random.default_rng(6).uniform(-1, 11, (500, 2)), columns=["x", "y"]
+    )
+    expected = PolygonScorer(compiled).hits(X)
+    scorer = PolygonScorer(compiled, batch_size=batch_size)
+    assert np.array_equal(scorer.hits(X), expected)
+    chunks = list(scorer.batches(X))
+    assert len(chunks) == int(np.ceil(500 / batch_size))
+    assert all(len(hits) <= batch_size for _, hits in chunks)
+    assert np.array_equal(np.concatenate([hits for _, hits in chunks]), expected)
+
+
+def test_invalid_batch_size_raises(json_desc):
+    with pytest.raises(ValueError):
+        PolygonScorer(compile_drawing(json_desc), batch_size=0)
+
+
+@pytest.mark.parametrize("prefer", ["threads", "processes"])
+@pytest.mark.parametrize("mode", ["direct", "grid", "partition"])
+def test_parallel_matches_single_job(prefer, mode):
+    compiled = compile_drawing(random_drawing(20))
+    rng = np.random.default_rng(7)
+    X = pd.DataFrame(rng.uniform(-1, 11, (2000, 2)), columns=["x", "y"])
+    expected = PolygonScorer(compiled, mode=mode).hits(X)
+    for batch_size in [None, 300]:
+        scorer = PolygonScorer(
+            compiled, mode=mode, batch_size=batch_size, n_jobs=2, prefer=prefer
+        )
+        assert np.array_equal(scorer.hits(X), expected)
+
+
+def test_effective_n_jobs():
+    assert effective_n_jobs(None) == 1
+    assert effective_n_jobs(3) == 3
+    assert effective_n_jobs(-1) == os.cpu_count()
+    with pytest.raises(ValueError):
+        effective_n_jobs(0)
+
+
+def test_unknown_prefer_raises(json_desc):
+    with pytest.raises(ValueError):
+        PolygonScorer(compile_drawing(json_desc), prefer="gpus")
+
+
+def test_numba_backend_falls_back_to_numpy(monkeypatch):
+    monkeypatch.setattr(backends, "HAS_NUMBA", False)
+    with pytest.warns(RuntimeWarning):
+        backend = backends.get_backend("numba")
+    assert isinstance(backend, NumpyBackend)
+
+
+@pytest.mark.parametrize("backend", ["numpy", "shapely", "numba"])
+@pytest.mark.parametrize("n_polygons", [6, 60])
+def test_reaches_matches_hits(backend, n_polygons):
+    compiled = compile_drawing(random_drawing(n_polygons))
+    rng = np.random.default_rng(8)
+    X = pd.DataFrame(rng.uniform(-1, 11, (3000, 2)), columns=["x", "y"])
+    X.iloc[:3] = np.nan
+    scorer = PolygonScorer(compiled, backend=backend)
+    counts = scorer.hits(X).sum(axis=1)
+    assert counts.max() >= 2
+    for threshold in [0, 1, 2, 3]:
+        assert np.array_equal(scorer.reaches(X, threshold), counts >= threshold)
+    order = scorer.cost_order()
+    assert sorted(i for _, idx in order for i in idx) == list(range(n_polygons))
+    assert (len(order) == n_polygons) == (n_polygons < 16)
+
+
+@pytest.mark.parametrize("mode", ["direct", "grid", "partition", "triangles"])
+def test_reaches_in_batches_parallel_and_cached(mode):
+    compiled = compile_drawing(random_drawing(20))
+    rng = np.random.default_rng(9)
+    X = pd.DataFrame(rng.uniform(-1, 11, (2000, 2)), columns=["x", "y"])
+    expected = PolygonScorer(compiled).hits(X).sum(axis=1) >= 2
+    for batch_size, n_jobs in [(None, 1), (300, 1), (300, 2), (None, 2)]:
+        scorer = PolygonScorer(
+            compiled, mode=mode, batch_size=batch_size, n_jobs=n_jobs
+        )
+        assert np.array_equal(scorer.reaches(X, 2), expected)
+    cache = HitCache()
+    scorer = PolygonScorer(compiled, mode=mode, cache=cache)
+    scorer.hits(X)
+    assert np.array_equal(scorer.reaches(X, 2), expected)
+
+
+@pytest.mark.parametrize("backend", ["numpy", "shapely"])
+def test_signed_distances(backend):
+    compiled = compile_drawing(random_drawing(20))
+    rng = np.random.default_rng(10)
+    X = pd.DataFrame(rng.uniform(-1, 11, (3000, 2)), columns=["x", "y"])
+    X.iloc[0] = np.nan
+    scorer = PolygonScorer(compiled, backend=backend)
+    dist, counts = scorer.signed_distances(X, return_counts=True)
+    assert np.array_equal(counts, scorer.hits(X).sum(axis=1))
+    assert np.array_equal(dist > 0, counts > 0)
+    assert dist[0] == -np.inf
+    # The distances are measured on the bounding box of all polygons, rescaled to [0, 1].
+    x0, y0 = compiled.bounds[:, :2].min(axis=0)
+    x1, y1 = compiled.bounds[:, 2:].max(axis=0)
+    geoms = [g.context for g in compiled.geometries]
+    for i in rng.choice(np.flatnonzero(counts == 0)[1:], 20):
+        px, py = (X.x[i] - x0) / (x1 - x0), (X.y[i] - y0) / (y1 - y0)
+        point = Point(px, py)
+        nearest = min(
+            point.distance(
+                Polygon((np.asarray(g.exterior.coords) - [x0, y0]) / [x1 - x0, y1 - y0])
+            )
+            for g in geoms
+        )
+        assert np.isclose(-dist[i], nearest)
@@ -0,0 +1,80 @@
+import json
+import pathlib
+from types import SimpleNamespace
+
+import pytest
+import numpy as np
+from sklego.datasets import load_penguins
+
+from hulearn.classification import InteractiveClassifier
+from hulearn.preprocessing import InteractivePreprocessor
+from hulearn.experimental.interactive import InteractiveCharts
+from hulearn.engine import compile_drawing
+from hulearn.engine.simplify import simplify_drawing, simplify_json
+
+
+def wobbly_drawing(n=200):
+    """A square with many near-collinear vertices along each side."""
+    t = np.linspace(0, 1, n, endpoint=False)
+    noise = 1e-4 * np.sin(t * 50)
+    xs = np.concatenate([t, 1 + noise, 1 - t, noise]) * 10
+    ys = np.concatenate([noise, t, 1 + noise, 1 - t]) * 10
+    return [
+        {
+            "chart_id": "wobbly",
+            "x": "x",
+            "y": "y",
+            "polygons": {
+                "a": {"x": [xs.tolist()], "y": [ys.tolist()]},
+                "b": {"x": [[0.0, 1.0, 1.0]], "y": [[0.0, 0.0, 1.0]]},
+            },
+        }
+    ]
+
+
+def test_simplify_drawing_removes_vertices():
+    compiled = compile_drawing(wobbly_drawing())
+    simplified = simplify_drawing(compiled, tolerance=0.01)
+    assert len(simplified) == len(compiled)
+    assert len(simplified.polygon(0)) == 4
+    assert np.array_equal(simplified.polygon(1), compiled.polygon(1))
+    assert simplified.classes == compiled.classes
+
+
+def test_simplify_json_keeps_format():
+    simple = simplify_json(wobbly_drawing(), tolerance=0.01)
+    assert simple[0]["chart_id"] == "wobbly"
+    assert len(simple[0]["polygons"]["a"]["x"][0]) == 4
+    assert simple[0]["polygons"]["b"] == wobbly_drawing()[0]["polygons"]["b"]
+    assert compile_drawing(simple).vertices.shape == (7, 2)
+
+
+def test_estimator_reports_simplification():
+    df = load_penguins(as_frame=True).dropna()
+    X, y = df.drop(columns=["species"]), df["species"]
+    path = "tests/test_classification/demo-data.json"
+    clf = InteractiveClassifier.from_json(path, simplify_tolerance=1e-9).fit(X, y)
+    assert clf.simplify_report_["rows_changed"] == 0
+    assert np.array_equal(
+        clf.predict(X), InteractiveClassifier.from_json(path).fit(X, y).predict(X)
+    )
+    clf.set_params(simplify_tolerance=50.0)
+    assert not hasattr(clf, "compiled_")
+    report = clf.fit(X, y).simplify_report_
+    before, after = report["vertices_before"], report["vertices_after"]
+    assert report["vertices_removed"] == before - after > 0
+    original = InteractiveClassifier.from_json(path).fit(X, y).predict(X)
+    assert report["rows_changed"] == (clf.predict(X) != original).sum()
+
+    tfm = InteractivePreprocessor.from_json(path, simplify_tolerance=50.0).fit(X)
+    assert tfm.simplify_report_["vertices_removed"] == report["vertices_removed"]
+
+
+@pytest.mark.parametrize("tolerance", [None, 0.01])
+def test_charts_to_json(tmp_path, tolerance):
+    charts = InteractiveCharts(load_penguins(as_frame=True), labels="species")
+    charts.charts = [SimpleNamespace(data=wobbly_drawing()[0])]
+    report = charts.to_json(tmp_path / "drawing.json", simplify_tolerance=tolerance)
+    written = json.loads(pathlib.Path(tmp_path / "drawing.json").read_text())
+    assert report["vertices_after"] == compile_drawing(written).vertices.shape[0]
+    assert (report["vertices_removed"] > 0) == (tolerance is not None)
@@ -0,0 +1,120 @@
+import pytest
+import numpy as np
+import pandas as pd
+from shapely.geometry.polygon import Polygon
+
+from hulearn.engine import compile_drawing, PolygonScorer
+from hulearn.engine.triangles import triangulate_ring, TriangleMesh
+
+
+def star(n_vertices, seed, center=(0.0, 0.0)):
+    rng = np.random.default_rng(seed)
+    angles = np.sort(rng.uniform(0, 2 * np.pi, n_vertices))
+    radius = rng.uniform(0.1, 1.0, n_vertices)
+    return np.column_stack(
+        [center[0] + radius * np.cos(angles), center[1] + radius * np.sin(angles)]
+    )
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("n_vertices", [100, 400])
+@pytest.mark.parametrize("clockwise", [False, True])
+def test_triangulation_covers_polygon(seed, n_vertices, clockwise):
+    ring = star(n_vertices, seed)
+    ring = ring[::-1] if clockwise else ring
+    triangles = triangulate_ring(ring)
+    assert triangles.shape == (len(ring) - 2, 3)
+    corners = ring[triangles]
+    area = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0]) / 2
+    assert (area > 0).all()
+    assert np.isclose(area.sum(), Polygon(ring).area)
+
+
+def test_triangulation_drops_duplicates_and_collinear_vertices():
+    ring = np.array([[0, 0], [1, 0], [1, 0], [2, 0], [2, 2], [0, 2]], dtype=float)
+    corners = ring[triangulate_ring(ring)]
+    area = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0]) / 2
+    assert (area > 0).all() and np.isclose(area.sum(), 4.0)
+    assert triangulate_ring(np.array([[0, 0], [1, 1], [2, 2]], dtype=float)) is None
+
+
+def concave_drawing(n_polygons, n_vertices):
+    polygons = {lab: {"x": [], "y": []} for lab in "ab"}
+    for i in range(n_polygons):
+        ring = star(n_vertices, seed=i, center=(i % 5, i // 5))
+        polygons["ab"[i % 2]]["x"].append(list(ring[:, 0]))
+        polygons["ab"[i % 2]]["y"].append(list(ring[:, 1]))
+    # A bowtie cannot be triangulated and is always tested exactly.
+    polygons["a"]["x"].append([0, 2, 2, 0])
+    polygons["a"]["y"].append([0, 2, 0, 2])
+    return [{"chart_id": "concave", "x": "x", "y": "y", "polygons": polygons}]
+
+
+@pytest.mark.parametrize("backend", ["numpy", "shapely"])
+def test_triangles_mode_matches_direct(backend):
+    compiled = compile_drawing(concave_drawing(20, 60))
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"x": rng.uniform(-1, 5, 20000), "y": rng.uniform(-1, 4, 20000)})
+    # Vertices and edge midpoints lie on the boundary and on the triangle edges.
+    poly = np.concatenate([compiled.polygon(i) for i in range(len(compiled))])
+    middles = (poly + np.roll(poly, -1, axis=0)) / 2
+    points = np.concatenate([poly, middles, [[np.nan, 0.0]]])
+    df = pd.concat([df, pd.DataFrame(points, columns=["x", "y"])], ignore_index=True)
+
+    direct = PolygonScorer(compiled, backend=backend)
+    triangles = PolygonScorer(compiled, backend=backend, mode="triangles")
+    assert np.array_equal(triangles.hits(df), direct.hits(df))
+    assert (triangles.memberships(df) != direct.memberships(df)).nnz == 0
+
+    mesh = compiled.memoize(("triangles", ("x", "y")), lambda: None)
+    assert isinstance(mesh, TriangleMesh)
+    bowtie = [i for i in range(len(compiled)) if len(compiled.polygon(i)) == 4]
+    assert mesh.exact_idx.tolist() == bowtie
+
+
+def drawing_of(rings):
+    polygons = {
+        "a": {"x": [list(r[:, 0]) for r in rings], "y": [list(r[:, 1]) for r in rings]}
+    }
+    return [{"chart_id": "c", "x": "x", "y": "y", "polygons": polygons}]
+
+
+@pytest.mark.parametrize("backend", ["numpy", "shapely", "numba"])
+def test_points_on_shared_triangle_edges(backend):
+    # Vertices that share an x or a y give horizontal and vertical triangle edges.
+    ring = np.array(
+        [
+            [4, 9.2],
+            [3.9, 9.9],
+            [3.6, 9.5],
+            [3.5, 9.6],
+            [2.7, 9.0],
+            [3.5, 8.5],
+            [3.6, 8.2],
+            [4.2, 8.9],
+        ]
+    )
+    rng = np.random.default_rng(0)
+    rings = [ring] + [
+        np.round(star(12, seed, rng.uniform(0, 3, 2)) * 2, 1) for seed in range(10)
+    ]
+    compiled = compile_drawing(drawing_of(rings))
+    # All points on a grid of one decimal, many of them on a vertex or an edge.
+    gx, gy = np.meshgrid(np.arange(-2, 10.01, 0.1), np.arange(-2, 10.01, 0.1))
+    df = pd.DataFrame({"x": np.round(gx.ravel(), 1), "y": np.round(gy.ravel(), 1)})
+    direct = PolygonScorer(compiled, backend=backend).hits(df)
+    scorer = PolygonScorer(compiled, backend=backend, mode="triangles")
+    assert np.array_equal(scorer.hits(df), direct)
+    assert scorer.hits(pd.DataFrame({"x": [3.6], "y": [8.8]}))[0, 0] == 1
+
+
+def test_triangles_mode_without_shapely_2(monkeypatch):
+    # Shapely 1.x has no module level `is_valid`, the mesh may not depend on it.
+    import shapely
+
+    monkeypatch.delattr(shapely, "is_valid", raising=False)
+    compiled = compile_drawing(concave_drawing(3, 30))
+    df = pd.DataFrame({"x": np.linspace(-1, 5, 500), "y": np.linspace(-1, 4, 500)})
+    direct = PolygonScorer(compiled, backend="numpy").hits(df)
+    triangles = PolygonScorer(compiled, backend="numpy", mode="triangles").hits(df)
+    assert np.array_equal(triangles, direct)
@@ -1,3 +1,4 @@
+import pytest
 import pandas as pd
 
 from hulearn.datasets import load_titanic
@@ -69,3 +70,35 @@ def test_smoke_casewhen():
     ]
 
     assert res.shape[0] == 8
+
+
+def test_casewhen_native_frames():
+    pa = pytest.importorskip("pyarrow")
+    pc = pytest.importorskip("pyarrow.compute")
+    df = load_titanic(as_frame=True)
+    table = pa.Table.from_pandas(df)
+
+    def rules(greater, less):
+        return (
+            CaseWhenRuler(default=0)
+            .add_rule(lambda d: greater(d["fare"], 100), 1, name="fare-rule")
+            .add_rule(lambda d: less(d["age"], 10), 2, name="child-rule")
+        )
+
+    expected = rules(lambda a, b: a > b, lambda a, b: a < b)
+    ruler = rules(pc.greater, pc.less)
+    assert ruler.predict(table) == expected.predict(df)
+    assert (ruler.transform(table).values == expected.transform(df).values).all()
+
+
+def test_casewhen_predict_one():
+    df = load_titanic(as_frame=True)
+    ruler = (
+        CaseWhenRuler(default=0)
+        .add_rule(lambda d: (d["pclass"] < 3.0) & (d["sex"] == "female"), 1)
+        .add_rule(lambda d: d["fare"] > 500, 0)
+        .add_rule(lambda d: (d["pclass"] < 3.0) & (d["age"] <= 15), 2)
+        .add_rule(lambda d: d["fare"] > 100, 3)
+    )
+    records = df.to_dict(orient="records")
+    assert [ruler.predict_one(r) for r in records] == ruler.predict(df)
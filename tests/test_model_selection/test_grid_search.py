@@ -0,0 +1,176 @@
+import json
+import pathlib
+
+import pytest
+import numpy as np
+import pandas as pd
+from sklearn.exceptions import FitFailedWarning
+from sklearn.model_selection import GridSearchCV
+
+from hulearn.datasets import load_titanic
+from hulearn.classification import FunctionClassifier, InteractiveClassifier
+from hulearn.regression import FunctionRegressor
+from hulearn.outlier import FunctionOutlierDetector
+from hulearn.model_selection import HumanGridSearchCV
+
+
+@pytest.fixture
+def titanic():
+    df = load_titanic(as_frame=True)
+    return df.drop(columns=["survived"]), df["survived"]
+
+
+def class_based(dataf, sex="male", pclass=1):
+    predicate = (dataf["sex"] == sex) & (dataf["pclass"] == pclass)
+    return np.array(predicate).astype(int)
+
+
+def fare_based(dataf, factor=1.0):
+    return dataf["fare"] * factor
+
+
+def fare_outlier(dataf, limit=100):
+    return np.where(dataf["fare"] > limit, -1, 1)
+
+
+def fare_margin(dataf, limit=100):
+    return limit - dataf["fare"]
+
+
+def assert_same_results(ours, theirs):
+    assert ours.best_params_ == theirs.best_params_
+    assert ours.best_index_ == theirs.best_index_
+    assert list(ours.cv_results_["params"]) == list(theirs.cv_results_["params"])
+    for key, value in theirs.cv_results_.items():
+        if "time" in key or key == "params":
+            continue
+        if key.startswith("param_"):
+            assert list(ours.cv_results_[key]) == list(value), key
+        else:
+            assert np.allclose(ours.cv_results_[key], value, equal_nan=True), key
+
+
+@pytest.mark.parametrize("return_train_score", [False, True])
+def test_classifier_matches_sklearn(titanic, return_train_score):
+    X, y = titanic
+    kwargs = dict(
+        param_grid={"pclass": [1, 2, 3], "sex": ["male", "female"]},
+        cv=5,
+        return_train_score=return_train_score,
+    )
+    ours = HumanGridSearchCV(FunctionClassifier(class_based), **kwargs).fit(X, y)
+    theirs = GridSearchCV(FunctionClassifier(class_based), **kwargs).fit(X, y)
+    assert_same_results(ours, theirs)
+    assert set(ours.cv_results_) == set(theirs.cv_results_)
+    assert ours.best_score_ == pytest.approx(theirs.best_score_)
+    assert np.array_equal(ours.predict(X), theirs.predict(X))
+    pd.DataFrame(ours.cv_results_)
+
+
+def test_regressor_multimetric_matches_sklearn(titanic):
+    X, y = titanic
+    kwargs = dict(
+        param_grid={"factor": [0.0, 0.01, 0.1]},
+        scoring=["neg_mean_absolute_error", "r2"],
+        refit="r2",
+        cv=3,
+    )
+    ours = HumanGridSearchCV(FunctionRegressor(fare_based), **kwargs).fit(X, y)
+    theirs = GridSearchCV(FunctionRegressor(fare_based), **kwargs).fit(X, y)
+    assert_same_results(ours, theirs)
+    assert "rank_test_neg_mean_absolute_error" in ours.cv_results_
+
+
+def test_outlier_matches_sklearn(titanic):
+    X, _ = titanic
+    y = np.where(X["fare"] > 200, -1, 1)
+    kwargs = dict(
+        param_grid={"limit": [50, 100, 200]},
+        scoring={"acc": "accuracy", "f1": "f1"},
+        refit="f1",
+        cv=4,
+    )
+    mod = FunctionOutlierDetector(fare_outlier, score_func=fare_margin)
+    ours = HumanGridSearchCV(mod, **kwargs).fit(X, y)
+    theirs = GridSearchCV(mod, **kwargs).fit(X, y)
+    assert_same_results(ours, theirs)
+
+
+CALLS = []
+
+
+def counting(dataf, sex="male"):
+    CALLS.append(len(dataf))
+    return np.array(dataf["sex"] == sex).astype(int)
+
+
+def test_function_runs_once_per_candidate(titanic):
+    X, y = titanic
+    CALLS.clear()
+    mod = FunctionClassifier(counting)
+    grid = HumanGridSearchCV(mod, param_grid={"sex": ["male", "female"]}, cv=5)
+    grid.fit(X, y)
+    # One prediction on all rows per candidate, plus the check in the refit.
+    assert CALLS == [len(X)] * 3
+
+    CALLS.clear()
+    GridSearchCV(mod, param_grid={"sex": ["male", "female"]}, cv=5).fit(X, y)
+    assert len(CALLS) == 2 * 2 * 5 + 1
+
+
+def test_refit_false_and_refit_callable(titanic):
+    X, y = titanic
+    params = {"pclass": [1, 2, 3]}
+    grid = HumanGridSearchCV(FunctionClassifier(class_based), params, refit=False)
+    assert not hasattr(grid.fit(X, y), "best_estimator_")
+    assert grid.best_index_ == np.argmax(grid.cv_results_["mean_test_score"])
+
+    grid = HumanGridSearchCV(
+        FunctionClassifier(class_based), params, refit=lambda results: 2
+    ).fit(X, y)
+    assert grid.best_params_ == {"pclass": 3}
+    assert grid.best_estimator_.get_params()["pclass"] == 3
+
+
+def test_multimetric_needs_valid_refit(titanic):
+    X, y = titanic
+    grid = HumanGridSearchCV(
+        FunctionClassifier(class_based),
+        {"pclass": [1, 2]},
+        scoring=["accuracy", "f1"],
+        refit="precision",
+    )
+    with pytest.raises(ValueError):
+        grid.fit(X, y)
+
+
+def missing_column(dataf, limit=1):
+    return np.array(dataf["nope"] > limit).astype(int)
+
+
+def test_error_score(titanic):
+    X, y = titanic
+    grid = HumanGridSearchCV(
+        FunctionClassifier(missing_column), {"limit": [1, 2]}, refit=False
+    )
+    with pytest.warns(FitFailedWarning):
+        grid.fit(X, y)
+    assert np.isnan(grid.cv_results_["mean_test_score"]).all()
+
+    grid.set_params(error_score="raise")
+    with pytest.raises(KeyError):
+        grid.fit(X, y)
+
+
+def test_other_estimators_defer_to_sklearn():
+    json_desc = json.loads(
+        pathlib.Path("tests/test_classification/demo-data.json").read_text()
+    )
+    from sklego.datasets import load_penguins
+
+    df = load_penguins(as_frame=True).dropna()
+    X, y = df.drop(columns=["species"]), df["species"]
+    kwargs = dict(param_grid={"smoothing": [0.001, 1.0]}, cv=3)
+    ours = HumanGridSearchCV(InteractiveClassifier(json_desc), **kwargs).fit(X, y)
+    theirs = GridSearchCV(InteractiveClassifier(json_desc), **kwargs).fit(X, y)
+    assert_same_results(ours, theirs)
@@ -0,0 +1,78 @@
+import json
+import pathlib
+
+import pytest
+import numpy as np
+from sklearn.model_selection import validation_curve as sklearn_validation_curve
+from sklego.datasets import load_penguins
+
+from hulearn.classification import InteractiveClassifier
+from hulearn.outlier import InteractiveOutlierDetector
+from hulearn.model_selection import validation_curve
+
+
+@pytest.fixture
+def json_desc():
+    return json.loads(
+        pathlib.Path("tests/test_classification/demo-data.json").read_text()
+    )
+
+
+@pytest.fixture
+def penguins():
+    df = load_penguins(as_frame=True).dropna()
+    return df.drop(columns=["species"]), df["species"]
+
+
+@pytest.mark.parametrize("scoring", [None, "accuracy", "neg_log_loss"])
+def test_smoothing_sweep_matches_sklearn(json_desc, penguins, scoring):
+    X, y = penguins
+    kwargs = dict(param_name="smoothing", param_range=[0.001, 0.1, 1.0, 10.0], cv=3)
+    train, test = validation_curve(
+        InteractiveClassifier(json_desc), X, y, scoring=scoring, **kwargs
+    )
+    expected_train, expected_test = sklearn_validation_curve(
+        InteractiveClassifier(json_desc), X, y, scoring=scoring, **kwargs
+    )
+    assert train.shape == (4, 3)
+    assert np.allclose(train, expected_train)
+    assert np.allclose(test, expected_test)
+
+
+def test_threshold_sweep_matches_sklearn(json_desc, penguins):
+    X, _ = penguins
+    y = np.where(X["bill_length_mm"] > 45, -1, 1)
+    kwargs = dict(param_name="threshold", param_range=[0, 1, 2, 3], cv=3)
+    train, test = validation_curve(
+        InteractiveOutlierDetector(json_desc), X, y, scoring="accuracy", **kwargs
+    )
+    expected_train, expected_test = sklearn_validation_curve(
+        InteractiveOutlierDetector(json_desc), X, y, scoring="accuracy", **kwargs
+    )
+    assert np.allclose(train, expected_train)
+    assert np.allclose(test, expected_test)
+
+
+def test_other_params_defer_to_sklearn(json_desc, penguins):
+    X, y = penguins
+    train, test = validation_curve(
+        InteractiveClassifier(json_desc),
+        X,
+        y,
+        param_name="mode",
+        param_range=["direct", "grid"],
+        cv=3,
+    )
+    assert np.allclose(test[0], test[1])
+
+
+def test_outlier_sweep_needs_scoring(json_desc, penguins):
+    X, y = penguins
+    with pytest.raises(ValueError):
+        validation_curve(
+            InteractiveOutlierDetector(json_desc),
+            X,
+            y,
+            param_name="threshold",
+            param_range=[1, 2],
+        )
@@ -83,3 +83,50 @@ def test_smoke_with_pandas():
         param_grid=params,
     ).fit(X, y)
     pd.DataFrame(grid.cv_results_)
+
+
+def fare_outlier(X, limit=100):
+    return np.where(X["fare"] > limit, -1, 1)
+
+
+def fare_margin(X, limit=100):
+    return (limit - X["fare"]).to_numpy()
+
+
+def test_score_samples_with_score_func():
+    df = load_titanic(as_frame=True)
+    mod = FunctionOutlierDetector(fare_outlier, score_func=fare_margin, limit=50)
+    mod.fit(df)
+    scores = mod.score_samples(df)
+    assert np.array_equal(scores, 50 - df["fare"].to_numpy())
+    assert np.array_equal(mod.decision_function(df) < 0, mod.predict(df) == -1)
+    assert mod.get_params()["score_func"] is fare_margin
+    mod.set_params(score_func=None)
+    assert np.array_equal(mod.score_samples(df), mod.predict(df).astype(float))
+
+
+def record_rows(X, seen):
+    seen.append(len(X))
+    return np.ones(len(X))
+
+
+@pytest.mark.parametrize("fit_check,rows", [(None, [1000, 100]), ("none", [])])
+def test_fit_check_rows(fit_check, rows):
+    X = np.random.normal(0, 1, (1000, 2))
+    seen = []
+    mod = FunctionOutlierDetector(record_rows, fit_check=fit_check, seen=seen)
+    mod.fit(X).partial_fit(X)
+    assert seen == rows
+    assert mod.set_params(fit_check="full").get_params()["fit_check"] == "full"
+
+
+def fare_flag(X, limit=100):
+    return X["fare"] > limit
+
+
+def test_boolean_func_marks_outliers():
+    df = load_titanic(as_frame=True)
+    mod = FunctionOutlierDetector(fare_flag, limit=50).fit(df)
+    assert np.array_equal(mod.predict(df), df["fare"] > 50)
+    assert np.array_equal(mod.score_samples(df), np.where(df["fare"] > 50, -1.0, 1.0))
+    assert np.array_equal(mod.decision_function(df) < 0, df["fare"] > 50)
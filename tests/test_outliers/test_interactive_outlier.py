@@ -1,5 +1,6 @@
 import pytest
 import numpy as np
+import pandas as pd
 from sklearn.model_selection import GridSearchCV
 from sklego.datasets import load_penguins
 from sklearn.pipeline import Pipeline
@@ -132,3 +133,60 @@ def test_ignore_bad_data():
 
     clf = InteractiveOutlierDetector(json_desc=data)
     assert len(list(clf.poly_data)) == 0
+
+
+def test_batch_size_predict():
+    df = load_penguins(as_frame=True).dropna()
+    X = df.drop(columns=["species"])
+    path = "tests/test_classification/demo-data.json"
+    clf = InteractiveOutlierDetector.from_json(path).fit(X)
+    batched = InteractiveOutlierDetector.from_json(path, batch_size=64).fit(X)
+    assert np.array_equal(batched.predict(X), clf.predict(X))
+
+
+@pytest.mark.parametrize("threshold", [1, 2])
+def test_predict_one_matches_predict(threshold):
+    df = load_penguins(as_frame=True).dropna()
+    X = df.drop(columns=["species"])
+    path = "tests/test_classification/demo-data.json"
+    clf = InteractiveOutlierDetector.from_json(path, threshold=threshold).fit(X)
+    preds = clf.predict(X)
+    assert [clf.predict_one(r) for r in X.to_dict(orient="records")] == list(preds)
+
+
+@pytest.mark.parametrize("threshold", [0, 1, 2])
+@pytest.mark.parametrize("mode", ["direct", "grid"])
+def test_decision_function_agrees_with_predict(threshold, mode):
+    df = load_penguins(as_frame=True).dropna()
+    X = df.drop(columns=["species"])
+    path = "tests/test_classification/demo-data.json"
+    clf = InteractiveOutlierDetector.from_json(path, threshold=threshold, mode=mode)
+    clf.fit(X)
+    scores, decision = clf.score_samples(X), clf.decision_function(X)
+    assert scores.dtype == float and scores.shape == (len(X),)
+    assert np.allclose(scores - clf.offset_, decision)
+    assert np.array_equal(np.where(decision < 0, -1, 1), clf.predict(X))
+    counts = clf.score(X).sum(axis=1)
+    assert np.array_equal(np.floor(scores + 0.5), counts)
+    assert len(np.unique(scores)) > len(np.unique(counts))
+
+
+def test_signed_distance_ranks_rows():
+    data = [
+        {
+            "chart_id": "square",
+            "x": "a",
+            "y": "b",
+            "polygons": {"in": {"a": [[0, 4, 4, 0]], "b": [[0, 0, 4, 4]]}},
+        }
+    ]
+    X = pd.DataFrame(
+        {"a": [2.0, 1.0, 5.0, 8.0, np.nan], "b": [2.0, 2.0, 2.0, 2.0, 2.0]}
+    )
+    clf = InteractiveOutlierDetector(data, backend="numpy").fit(X)
+    scores = clf.score_samples(X)
+    # The center lies deepest, then closer to the edge, then ever further outside.
+    assert (np.diff(scores[:4]) < 0).all()
+    assert np.isclose(scores[0], 1 + np.tanh(0.5) / 2)
+    assert np.isclose(scores[2], -np.tanh(0.25) / 2)
+    assert scores[4] == -0.5
@@ -58,3 +58,17 @@ def test_works_with_gridsearch(random_xy_dataset_regr):
     clf = FunctionRegressor(func=predict)
     grid = GridSearchCV(clf, cv=5, param_grid={"func": [predict, predict_variant]})
     grid.fit(X, y).predict(X)
+
+
+def record_rows(X, seen):
+    seen.append(len(X))
+    return np.zeros(len(X))
+
+
+@pytest.mark.parametrize("fit_check,rows", [(None, [1000, 100]), ("none", [])])
+def test_fit_check_rows(fit_check, rows):
+    X, y = np.random.normal(0, 1, (1000, 2)), np.random.normal(0, 1, 1000)
+    seen = []
+    mod = FunctionRegressor(record_rows, fit_check=fit_check, seen=seen)
+    mod.fit(X, y).partial_fit(X, y)
+    assert seen == rows
@@ -0,0 +1,136 @@
+import io
+import pickle
+import subprocess
+import sys
+
+import pytest
+import numpy as np
+import pandas as pd
+from sklego.datasets import load_penguins
+
+from hulearn.datasets import load_titanic
+from hulearn.classification import FunctionClassifier, InteractiveClassifier
+from hulearn.scoring import score_file, load_model, drawn_columns
+
+DRAWING = "tests/test_classification/demo-data.json"
+
+
+def class_based(dataf, pclass=1):
+    return np.array(dataf["pclass"] == pclass).astype(int)
+
+
+def missing_column(dataf):
+    return dataf["not-a-column"]
+
+
+@pytest.fixture
+def penguins(tmp_path):
+    path = tmp_path / "penguins.csv"
+    load_penguins(as_frame=True).dropna().to_csv(path, index=False)
+    return path
+
+
+@pytest.fixture(params=["csv", "parquet"])
+def penguins_with_nan(tmp_path, request):
+    df = load_penguins(as_frame=True)
+    path = tmp_path / f"penguins.{request.param}"
+    if request.param == "csv":
+        df.to_csv(path, index=False)
+    else:
+        pytest.importorskip("pyarrow")
+        df.to_parquet(path, index=False)
+    return path, df
+
+
+@pytest.mark.parametrize("n_jobs", [1, 2])
+def test_drawn_model_matches_predict_proba(penguins, tmp_path, n_jobs):
+    out = tmp_path / "proba.csv"
+    report = score_file(
+        DRAWING, penguins, out, proba=True, batch_size=50, n_jobs=n_jobs
+    )
+    df = pd.read_csv(penguins)
+    clf = InteractiveClassifier.from_json(DRAWING).fit(df, None)
+    result = pd.read_csv(out)
+    assert list(result.columns) == list(clf.classes_)
+    assert report["rows"] == len(df) and report["batches"] == 7
+    assert np.allclose(result.to_numpy(), clf.predict_proba(df))
+
+
+def test_drawn_model_only_reads_its_columns():
+    columns = drawn_columns(load_model(DRAWING))
+    assert set(columns) < set(load_penguins(as_frame=True).columns)
+
+
+def test_binary_model(penguins, tmp_path):
+    InteractiveClassifier.from_json(DRAWING).to_binary(tmp_path / "model.hul")
+    score_file(tmp_path / "model.hul", penguins, tmp_path / "a.csv")
+    score_file(DRAWING, penguins, tmp_path / "b.csv")
+    assert pd.read_csv(tmp_path / "a.csv").equals(pd.read_csv(tmp_path / "b.csv"))
+
+
+def test_pickled_function_model_parquet(tmp_path):
+    pytest.importorskip("pyarrow")
+    df = load_titanic(as_frame=True)
+    df.to_parquet(tmp_path / "titanic.parquet")
+    clf = FunctionClassifier(class_based, pclass=2).fit(df, df["survived"])
+    with open(tmp_path / "model.pkl", "wb") as f:
+        pickle.dump(clf, f)
+    progress = io.StringIO()
+    score_file(
+        tmp_path / "model.pkl",
+        tmp_path / "titanic.parquet",
+        tmp_path / "preds.parquet",
+        batch_size=100,
+        progress=progress,
+    )
+    result = pd.read_parquet(tmp_path / "preds.parquet")
+    assert np.array_equal(result["prediction"], clf.predict(df))
+    assert "rows/s" in progress.getvalue()
+
+
+def test_cli(penguins, tmp_path):
+    out = tmp_path / "preds.csv"
+    cmd = [sys.executable, "-m", "hulearn", "score", DRAWING, str(penguins), str(out)]
+    proc = subprocess.run(cmd + ["--batch-size", "100"], capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr
+    assert "scored 333 rows" in proc.stderr
+    assert len(pd.read_csv(out)) == 333
+
+
+@pytest.mark.parametrize("proba", [False, True])
+def test_drawn_model_with_missing_values(penguins_with_nan, tmp_path, proba):
+    path, df = penguins_with_nan
+    assert df[drawn_columns(load_model(DRAWING))].isna().any().any()
+    out = tmp_path / "scores.csv"
+    report = score_file(DRAWING, path, out, proba=proba, batch_size=50)
+    clf = InteractiveClassifier.from_json(DRAWING).fit(df, None)
+    result = pd.read_csv(out)
+    assert report["rows"] == len(df)
+    if proba:
+        assert np.allclose(result.to_numpy(), clf.predict_proba(df))
+    else:
+        assert np.array_equal(result["prediction"], clf.predict(df))
+
+
+@pytest.mark.parametrize("suffix", ["csv", "parquet"])
+def test_header_only_input(tmp_path, suffix):
+    if suffix == "parquet":
+        pytest.importorskip("pyarrow")
+    path = tmp_path / "empty.csv"
+    load_penguins(as_frame=True).head(0).to_csv(path, index=False)
+    out = tmp_path / f"scores.{suffix}"
+    report = score_file(DRAWING, path, out, proba=True)
+    result = pd.read_csv(out) if suffix == "csv" else pd.read_parquet(out)
+    assert report["rows"] == 0
+    assert result.empty
+    assert list(result.columns) == list(load_model(DRAWING).fit(None, None).classes_)
+
+
+def test_failing_model_raises_its_own_error(tmp_path):
+    df = load_titanic(as_frame=True)
+    df.to_csv(tmp_path / "titanic.csv", index=False)
+    clf = FunctionClassifier(missing_column, fit_check="none").fit(df, df["survived"])
+    with open(tmp_path / "model.pkl", "wb") as f:
+        pickle.dump(clf, f)
+    with pytest.raises(KeyError, match="not-a-column"):
+        score_file(tmp_path / "model.pkl", tmp_path / "titanic.csv", tmp_path / "a.csv")
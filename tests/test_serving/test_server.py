@@ -0,0 +1,81 @@
+import asyncio
+import json
+
+import numpy as np
+from sklego.datasets import load_penguins
+
+from hulearn.datasets import load_titanic
+from hulearn.classification import FunctionClassifier, InteractiveClassifier
+from hulearn.serving import ModelServer
+
+DRAWING = "tests/test_classification/demo-data.json"
+
+
+async def request(port, method, path, payload=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = b"" if payload is None else json.dumps(payload).encode()
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+    )
+    response = await reader.read()
+    writer.close()
+    head, _, data = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(data)
+
+
+def penguin_records():
+    df = load_penguins(as_frame=True).dropna().drop(columns=["species"])
+    return df.to_dict(orient="records"), df
+
+
+def test_micro_batches_match_predict_proba():
+    records, df = penguin_records()
+    expected = InteractiveClassifier.from_json(DRAWING).fit(df, None).predict_proba(df)
+
+    async def scenario():
+        server = ModelServer(DRAWING, port=0, max_batch_size=64, max_wait_ms=20)
+        async with server:
+            calls = [
+                request(server.port, "POST", "/predict_proba", rec) for rec in records
+            ]
+            responses = await asyncio.gather(*calls)
+            _, metrics = await request(server.port, "GET", "/metrics")
+        return responses, metrics
+
+    responses, metrics = asyncio.run(scenario())
+    assert all(status == 200 for status, _ in responses)
+    proba = np.array([body["probabilities"][0] for _, body in responses])
+    assert np.allclose(proba, expected)
+    assert metrics["requests"] == len(records)
+    # Concurrent requests are coalesced, batches never exceed the maximum size.
+    assert metrics["batches"] < len(records) / 4
+    assert metrics["mean_batch_size"] <= 64
+    assert 0 < metrics["latency_p50_ms"] <= metrics["latency_p99_ms"]
+
+
+def fare_based(dataf, threshold=10):
+    return np.array(dataf["fare"].astype(float) > threshold).astype(int)
+
+
+def test_function_model_and_errors():
+    df = load_titanic(as_frame=True)
+    clf = FunctionClassifier(fare_based, threshold=20).fit(df, df["survived"])
+    records = df.head(5).to_dict(orient="records")
+
+    async def scenario():
+        async with ModelServer(clf, port=0) as server:
+            port = server.port
+            good, bad, missing, unknown = await asyncio.gather(
+                request(port, "POST", "/predict", records),
+                request(port, "POST", "/predict", {"fare": "free"}),
+                request(port, "POST", "/predict", "nope"),
+                request(port, "GET", "/nope"),
+            )
+        return good, bad, missing, unknown
+
+    good, bad, missing, unknown = asyncio.run(scenario())
+    assert good == (200, {"predictions": fare_based(df.head(5), 20).tolist()})
+    # A failing request in a batch does not take the other requests down with it.
+    assert bad[0] == 500
+    assert missing[0] == 400 and unknown[0] == 404
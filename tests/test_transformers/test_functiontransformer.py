@@ -61,3 +61,20 @@ def test_works_with_partial_fit(random_xy_dataset_clf):
     X, y = random_xy_dataset_clf
     pipe = PipeTransformer(func=double, factor=2)
     assert np.all(np.isclose(pipe.partial_fit(X, y).transform(X), X * 2))
+
+
+def record_rows(X, seen):
+    seen.append(len(X))
+    return X
+
+
+@pytest.mark.parametrize(
+    "fit_check,rows", [(None, [1000, 100]), ("sample", [100, 100])]
+)
+def test_fit_check_rows(fit_check, rows):
+    X = np.random.normal(0, 1, (1000, 2))
+    seen = []
+    mod = PipeTransformer(record_rows, fit_check=fit_check, seen=seen)
+    mod.fit(X).partial_fit(X)
+    assert seen == rows
+    assert mod.ncol_ == 2
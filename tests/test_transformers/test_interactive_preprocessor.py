@@ -1,4 +1,6 @@
 import pytest
+import numpy as np
+from scipy import sparse
 
 from sklego.datasets import load_penguins
 from sklearn.pipeline import Pipeline, FeatureUnion
@@ -111,3 +113,81 @@ def test_ignore_bad_data():
 
     clf = InteractivePreprocessor(json_desc=data)
     assert len(list(clf.poly_data)) == 0
+
+
+@pytest.mark.parametrize("mode", ["grid", "partition", "triangles"])
+def test_mode_matches_direct(mode):
+    df = load_penguins(as_frame=True).dropna()
+    path = "tests/test_classification/demo-data.json"
+    direct = InteractivePreprocessor.from_json(path).fit(df).transform(df)
+    other = InteractivePreprocessor.from_json(path, mode=mode).fit(df).transform(df)
+    assert (direct == other).all()
+
+
+def test_transform_iter():
+    df = load_penguins(as_frame=True).dropna()
+    path = "tests/test_classification/demo-data.json"
+    tfm = InteractivePreprocessor.from_json(path, batch_size=100).fit(df)
+    chunks = list(tfm.transform_iter(df))
+    assert len(chunks) == int(np.ceil(len(df) / 100))
+    assert (np.concatenate(chunks) == tfm.transform(df)).all()
+
+
+def test_polygon_output_is_sparse_and_sums_to_label_counts():
+    df = load_penguins(as_frame=True).dropna()
+    path = "tests/test_classification/demo-data.json"
+    counts = InteractivePreprocessor.from_json(path).fit(df).transform(df)
+    tfm = InteractivePreprocessor.from_json(path, output="polygons").fit(df)
+    members = tfm.transform(df)
+    assert sparse.isspmatrix_csr(members)
+    assert members.shape == (len(df), len(tfm.compiled_))
+    assert set(np.unique(members.data)) <= {1}
+    per_label = np.column_stack(
+        [
+            members[:, tfm.compiled_.labels == i].sum(axis=1).A1
+            for i in range(len(tfm.classes_))
+        ]
+    )
+    assert (per_label == counts).all()
+
+
+def test_polygon_output_in_batches():
+    df = load_penguins(as_frame=True).dropna()
+    path = "tests/test_classification/demo-data.json"
+    tfm = InteractivePreprocessor.from_json(path, output="polygons").fit(df)
+    expected = tfm.transform(df).toarray()
+    tfm.set_params(batch_size=100)
+    assert (tfm.transform(df).toarray() == expected).all()
+    chunks = list(tfm.transform_iter(df))
+    assert (sparse.vstack(chunks).toarray() == expected).all()
+
+
+def test_get_feature_names_out():
+    df = load_penguins(as_frame=True).dropna()
+    path = "tests/test_classification/demo-data.json"
+    tfm = InteractivePreprocessor.from_json(path).fit(df)
+    assert list(tfm.get_feature_names_out()) == tfm.classes_
+    tfm.set_params(output="polygons")
+    names = tfm.get_feature_names_out()
+    assert len(names) == len(set(names)) == len(tfm.compiled_)
+    assert names[0] == f"{tfm.compiled_.chart_ids[0]}_Adelie_0"
+    piped = tfm.pandas_pipe(df)
+    assert list(piped.columns[-len(names) :]) == list(names)
+
+
+def test_unknown_output_raises():
+    df = load_penguins(as_frame=True).dropna()
+    path = "tests/test_classification/demo-data.json"
+    with pytest.raises(ValueError):
+        InteractivePreprocessor.from_json(path, output="pixels").fit(df).transform(df)
+
+
+@pytest.mark.parametrize("output", ["labels", "polygons"])
+def test_transform_one_matches_transform(output):
+    df = load_penguins(as_frame=True).dropna()
+    path = "tests/test_classification/demo-data.json"
+    tfm = InteractivePreprocessor.from_json(path, output=output).fit(df)
+    expected = tfm.transform(df)
+    expected = expected.toarray() if output == "polygons" else expected
+    rows = [tfm.transform_one(r) for r in df.to_dict(orient="records")]
+    assert np.array_equal(np.stack(rows), expected)